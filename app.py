@@ -4,11 +4,10 @@ Versión simplificada y funcional
 """
 from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
 from werkzeug.security import check_password_hash, generate_password_hash
-from pymongo import MongoClient, DESCENDING
-from pymongo.errors import ConnectionFailure
-from datetime import datetime
 import os
 import logging
+from config.settings import Config
+from app.extensions import mongodb, get_db_manager, get_job_manager
 
 # Configuración
 app = Flask(__name__,
@@ -17,62 +16,30 @@ app = Flask(__name__,
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 app.config['DEBUG'] = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
 
-# MongoDB
-MONGODB_URI = os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/')
-DB_NAME = 'ofertas_laborales'
+# MongoDB: un único MongoDBManager (y MongoClient con pool) por proceso
+mongodb.init_app(app, Config)
 
 # Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Conexión a MongoDB
-try:
-    client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
-    client.admin.command('ping')
-    db = client[DB_NAME]
-    ofertas_collection = db['ofertas']
-    usuarios_collection = db['usuarios']
-    logger.info("✓ Conexión a MongoDB exitosa")
-    mongo_connected = True
-except Exception as e:
-    logger.error(f"✗ Error conectando a MongoDB: {e}")
-    mongo_connected = False
-    db = None
-    ofertas_collection = None
-    usuarios_collection = None
-
-# Crear índices
-if mongo_connected:
-    try:
-        ofertas_collection.create_index("id", unique=True)
-        ofertas_collection.create_index([("created_at", DESCENDING)])
-        usuarios_collection.create_index("username", unique=True)
-    except:
-        pass
+
+def mongo_connected() -> bool:
+    """Indica si el MongoDBManager compartido tiene conexión"""
+    return mongodb.manager._connected
+
 
 # Inicializar usuario admin
-if mongo_connected:
+if mongo_connected():
     try:
-        if not usuarios_collection.find_one({'username': 'admin'}):
-            usuarios_collection.insert_one({
-                'username': 'admin',
-                'password_hash': generate_password_hash('admin123'),
-                'email': 'admin@ofertas.com',
-                'created_at': datetime.now()
-            })
+        db_manager = mongodb.manager
+        if not db_manager.get_user_by_username('admin'):
+            db_manager.create_user('admin', generate_password_hash('admin123'), 'admin@ofertas.com')
             logger.info("✓ Usuario admin creado (admin/admin123)")
-    except:
+    except Exception:
         pass
 
 
-# Helper para verificar conexión
-def get_collections():
-    """Retorna las colecciones o None si no hay conexión"""
-    if not mongo_connected:
-        return None, None
-    return ofertas_collection, usuarios_collection
-
-
 # Decorador para requerir login
 def login_required(f):
     from functools import wraps
@@ -103,7 +70,7 @@ def login():
         password = request.form['password']
         
         # Modo sin conexión
-        if not mongo_connected:
+        if not mongo_connected():
             if username == 'admin' and password == 'admin123':
                 session['user_id'] = 'offline-admin'
                 session['username'] = 'admin'
@@ -113,14 +80,12 @@ def login():
             return render_template('login.html')
         
         # Modo normal
-        ofertas_coll, usuarios_coll = get_collections()
-        if usuarios_coll is not None:
-            user = usuarios_coll.find_one({'username': username})
-            if user and check_password_hash(user['password_hash'], password):
-                session['user_id'] = str(user['_id'])
-                session['username'] = user['username']
-                flash('Inicio de sesión exitoso', 'success')
-                return redirect(url_for('dashboard'))
+        user = get_db_manager().get_user_by_username(username)
+        if user and check_password_hash(user['password_hash'], password):
+            session['user_id'] = str(user['_id'])
+            session['username'] = user['username']
+            flash('Inicio de sesión exitoso', 'success')
+            return redirect(url_for('dashboard'))
         
         flash('Usuario o contraseña incorrectos', 'error')
     
@@ -139,11 +104,8 @@ def logout():
 @login_required
 def dashboard():
     """Dashboard principal"""
-    # Usar MongoDBManager que incluye soporte para datos mock
-    from app.services.database_service import MongoDBManager
-    from config.settings import Config
-    
-    db_manager = MongoDBManager(Config.MONGODB_URI)
+    # Usar MongoDBManager compartido que incluye soporte para datos mock
+    db_manager = get_db_manager()
     
     # Obtener ofertas y estadísticas (usará datos mock si la BD está vacía)
     ofertas = db_manager.get_ofertas(limit=10)
@@ -162,10 +124,7 @@ def dashboard():
 @login_required
 def listar_ofertas():
     """Lista de ofertas con filtros"""
-    from app.services.database_service import MongoDBManager
-    from config.settings import Config
-    
-    db_manager = MongoDBManager(Config.MONGODB_URI)
+    db_manager = get_db_manager()
     
     # Filtros
     filtros = {}
@@ -182,30 +141,26 @@ def listar_ofertas():
     if request.args.get('modalidad'):
         filtros['modalidad'] = request.args.get('modalidad')
     
-    # Paginación
-    page = int(request.args.get('page', 1))
-    limit = 20
-    offset = (page - 1) * limit
-    
-    # Obtener ofertas usando MongoDBManager (incluye datos de simulación)
-    ofertas = db_manager.get_ofertas(filtros=filtros, limit=limit, offset=offset)
+    # Paginación por cursor: cada página cuesta lo mismo sin importar su profundidad
+    cursor = request.args.get('cursor')
+    pagina = db_manager.get_ofertas_page(filtros=filtros, limit=Config.OFERTAS_PER_PAGE, cursor=cursor)
+    ofertas = pagina['ofertas']
     
     # Asegurar que todas las ofertas tengan un campo 'id'
     for oferta in ofertas:
         if 'id' not in oferta:
             oferta['id'] = oferta.get('_id', str(oferta.get('id', '')))
     
-    return render_template('ofertas.html', ofertas=ofertas, filtros=filtros, page=page)
+    return render_template('ofertas.html', ofertas=ofertas, filtros=filtros,
+                         next_cursor=pagina['next_cursor'],
+                         prev_cursor=pagina['prev_cursor'])
 
 
 @app.route('/ofertas/<oferta_id>')
 @login_required
 def ver_oferta(oferta_id):
     """Ver detalle de una oferta"""
-    from app.services.database_service import MongoDBManager
-    from config.settings import Config
-    
-    db_manager = MongoDBManager(Config.MONGODB_URI)
+    db_manager = get_db_manager()
     
     # Intentar obtener la oferta por ID
     oferta = db_manager.get_oferta_by_id(oferta_id)
@@ -237,14 +192,17 @@ def ver_oferta(oferta_id):
 @login_required
 def estadisticas():
     """Página de estadísticas"""
-    # Usar MongoDBManager que incluye soporte para datos mock
-    from app.services.database_service import MongoDBManager
-    from config.settings import Config
+    # Usar MongoDBManager compartido que incluye soporte para datos mock
+    db_manager = get_db_manager()
     
-    db_manager = MongoDBManager(Config.MONGODB_URI)
+    # Filtros opcionales: las estadísticas se calculan sobre el subconjunto filtrado
+    filtros = {}
+    for campo in ('busqueda', 'empresa', 'nivel_academico', 'modalidad'):
+        if request.args.get(campo):
+            filtros[campo] = request.args.get(campo)
     
-    # Obtener estadísticas (usará datos mock si la BD está vacía)
-    stats = db_manager.get_estadisticas()
+    # Obtener estadísticas (una sola agregación; usará datos mock si la BD está vacía)
+    stats = db_manager.get_estadisticas(filtros)
     
     # Extraer las estadísticas con los nombres que el template espera
     total_ofertas = stats.get('total_ofertas', 0)
@@ -258,14 +216,26 @@ def estadisticas():
                          niveles=niveles,
                          modalidades=modalidades,
                          fuentes=fuentes,
-                         top_empresas=top_empresas)
+                         top_empresas=top_empresas,
+                         filtros=filtros)
+
+
+@app.route('/api/estado')
+@login_required
+def api_estado():
+    """Estado de la conexión a MongoDB y de la caché de consultas (monitoreo)"""
+    db_manager = get_db_manager()
+    return jsonify({
+        'conexion': db_manager.get_estado_conexion(),
+        'cache': db_manager.get_estado_cache()
+    })
 
 
 @app.route('/extraer', methods=['POST'])
 @login_required
 def extraer_ofertas():
-    """Extraer ofertas - versión simplificada y robusta"""
-    if not mongo_connected:
+    """Extraer ofertas en segundo plano: encola un trabajo y retorna su ID de inmediato"""
+    if not mongo_connected():
         return jsonify({
             'success': False, 
             'error': 'MongoDB no está disponible',
@@ -278,15 +248,9 @@ def extraer_ofertas():
         }), 400
     
     try:
-        import traceback
-        from app.services.scraping_service import ScrapingService
-        from app.services.database_service import MongoDBManager
-        
-        logger.info("Iniciando extracción de ofertas...")
-        
-        # Crear instancia de MongoDBManager
+        # Obtener el MongoDBManager compartido
         try:
-            db_manager = MongoDBManager(MONGODB_URI)
+            db_manager = get_db_manager()
             if not db_manager._connected:
                 return jsonify({
                     'success': False,
@@ -294,56 +258,31 @@ def extraer_ofertas():
                     'mensaje': 'Verifica que MongoDB esté corriendo en localhost:27017'
                 }), 500
         except Exception as db_error:
-            logger.error(f"Error creando MongoDBManager: {db_error}")
+            logger.error(f"Error obteniendo MongoDBManager: {db_error}")
             return jsonify({
                 'success': False,
                 'error': f'Error de conexión a MongoDB: {str(db_error)}',
                 'mensaje': 'Verifica tu configuración de MongoDB'
             }), 500
         
-        # Crear servicio de scraping
-        try:
-            scraping_service = ScrapingService(db_manager)
-        except Exception as scraping_init_error:
-            logger.error(f"Error inicializando ScrapingService: {scraping_init_error}")
-            logger.error(traceback.format_exc())
+        # Encolar el trabajo (o reutilizar el que ya está en curso) y responder de inmediato
+        job, creado = get_job_manager().submit(usuario=session.get('username'))
+        if job is None:
             return jsonify({
                 'success': False,
-                'error': f'Error inicializando servicio de scraping: {str(scraping_init_error)}'
-            }), 500
-        
-        # Ejecutar scraping
-        try:
-            logger.info("Ejecutando scraping...")
-            stats = scraping_service.run_scraping()
-            logger.info(f"Scraping completado. Stats: {stats}")
-        except Exception as scraping_error:
-            logger.error(f"Error durante el scraping: {scraping_error}")
-            logger.error(traceback.format_exc())
-            return jsonify({
-                'success': False,
-                'error': f'Error durante la extracción: {str(scraping_error)}',
-                'traceback': traceback.format_exc() if app.config['DEBUG'] else None
-            }), 500
+                'error': 'No se pudo registrar el trabajo de extracción'
+            }), 503
         
-        # Retornar resultados
+        logger.info(f"Extracción {'encolada' if creado else 'ya en curso'}: {job['_id']}")
         return jsonify({
             'success': True,
-            'nuevas_ofertas': stats.get('nuevas', 0),
-            'actualizadas': stats.get('actualizadas', 0),
-            'errores': stats.get('errores', 0),
-            'total_procesadas': stats.get('total_encontradas', 0),
-            'por_fuente': stats.get('por_fuente', {}),
-            'mensaje': f'Extracción completada: {stats.get("nuevas", 0)} nuevas ofertas'
-        })
+            'job_id': job['_id'],
+            'estado': job['estado'],
+            'coalescido': not creado,
+            'url_estado': url_for('estado_extraccion', job_id=job['_id']),
+            'mensaje': 'Extracción iniciada' if creado else 'Ya hay una extracción en curso'
+        }), 202
         
-    except ImportError as import_error:
-        logger.error(f"Error de importación: {import_error}")
-        return jsonify({
-            'success': False,
-            'error': f'Módulo no encontrado: {str(import_error)}',
-            'mensaje': 'Verifica que todos los archivos del servicio estén presentes'
-        }), 500
     except Exception as e:
         logger.error(f"Error inesperado en extracción: {e}")
         import traceback
@@ -355,6 +294,21 @@ def extraer_ofertas():
         }), 500
 
 
+@app.route('/extraer/<job_id>')
+@login_required
+def estado_extraccion(job_id):
+    """Estado y avance por portal de un trabajo de extracción"""
+    from app.services.scraping_jobs import serialize_job
+    
+    if not mongo_connected():
+        return jsonify({'success': False, 'error': 'MongoDB no está disponible'}), 400
+    
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Trabajo de extracción no encontrado'}), 404
+    return jsonify(serialize_job(job))
+
+
 # Manejador de errores global para asegurar respuestas JSON
 @app.errorhandler(500)
 def handle_500_error(e):
@@ -5,7 +5,8 @@ from flask import Flask, redirect, url_for
 from werkzeug.security import generate_password_hash
 import logging
 from config.settings import Config
-from app.services.database_service import MongoDBManager
+from app.extensions import mongodb
+from app.services.migrations import MigrationRunner
 from app.controllers.auth import auth_bp
 from app.controllers.ofertas import ofertas_bp
 from app.controllers.dashboard import dashboard_bp
@@ -34,6 +35,9 @@ def create_app(config_class=Config):
     )
     logger = logging.getLogger(__name__)
     
+    # MongoDBManager compartido (un MongoClient con pool por proceso)
+    mongodb.init_app(app, config_class)
+    
     # Registrar Blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(ofertas_bp)
@@ -50,20 +54,20 @@ def create_app(config_class=Config):
     
     # Inicializar base de datos
     with app.app_context():
-        initialize_database(config_class, logger)
+        initialize_database(mongodb, logger)
     
     return app
 
 
-def initialize_database(config_class, logger):
+def initialize_database(extension, logger):
     """
     Inicializa la base de datos MongoDB al arrancar la aplicación
     Args:
-        config_class: Clase de configuración
+        extension: Extensión MongoDB registrada en la aplicación
         logger: Logger para mensajes
     """
     try:
-        db_manager = MongoDBManager(config_class.MONGODB_URI)
+        db_manager = extension.manager
 
         # Verificar conexión real antes de continuar
         if not getattr(db_manager, "_connected", True):
@@ -75,6 +79,14 @@ def initialize_database(config_class, logger):
 
         logger.info("Conectado a MongoDB exitosamente")
 
+        # Los índices no se crean al arrancar: solo se avisa si faltan migraciones
+        pending = MigrationRunner(db_manager.db).pending()
+        if pending:
+            logger.warning(
+                f"Hay {len(pending)} migraciones pendientes. "
+                "Ejecuta: python manage.py db migrate"
+            )
+
         # Crear usuario admin por defecto si no existe
         admin_user = db_manager.get_user_by_username('admin')
         if not admin_user:
@@ -3,17 +3,11 @@ Controlador de autenticación
 """
 from flask import Blueprint, render_template, request, session, redirect, url_for, flash
 from werkzeug.security import check_password_hash
-from app.services.database_service import MongoDBManager
-from config.settings import Config
+from app.extensions import get_db_manager
 
 auth_bp = Blueprint('auth', __name__)
 
 
-def get_db_manager():
-    """Obtiene la instancia del gestor de base de datos"""
-    return MongoDBManager(Config.MONGODB_URI)
-
-
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
     """Página de login"""
@@ -1,19 +1,13 @@
 """
 Controlador del dashboard y estadísticas
 """
-from flask import Blueprint, render_template
-from app.services.database_service import MongoDBManager
+from flask import Blueprint, render_template, request, jsonify
+from app.extensions import get_db_manager
 from app.controllers.auth import login_required
-from config.settings import Config
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
 
-def get_db_manager():
-    """Obtiene la instancia del gestor de base de datos"""
-    return MongoDBManager(Config.MONGODB_URI)
-
-
 @dashboard_bp.route('/')
 @dashboard_bp.route('/dashboard')
 @login_required
@@ -40,8 +34,14 @@ def estadisticas():
     """Página de estadísticas usando agregaciones de MongoDB"""
     db_manager = get_db_manager()
     
-    # Obtener estadísticas usando agregaciones eficientes de MongoDB
-    stats = db_manager.get_estadisticas()
+    # Filtros opcionales: las estadísticas se calculan sobre el subconjunto filtrado
+    filtros = {}
+    for campo in ('busqueda', 'empresa', 'nivel_academico', 'modalidad'):
+        if request.args.get(campo):
+            filtros[campo] = request.args.get(campo)
+    
+    # Obtener estadísticas con una sola agregación $facet
+    stats = db_manager.get_estadisticas(filtros)
     
     niveles = stats.get('por_nivel', {})
     modalidades = stats.get('por_modalidad', {})
@@ -54,5 +54,16 @@ def estadisticas():
                          modalidades=modalidades,
                          fuentes=fuentes,
                          total_ofertas=total_ofertas,
-                         top_empresas=top_empresas)
+                         top_empresas=top_empresas,
+                         filtros=filtros)
 
+
+@dashboard_bp.route('/api/estado')
+@login_required
+def api_estado():
+    """Estado de la conexión a MongoDB y de la caché de consultas (monitoreo)"""
+    db_manager = get_db_manager()
+    return jsonify({
+        'conexion': db_manager.get_estado_conexion(),
+        'cache': db_manager.get_estado_cache()
+    })
@@ -1,19 +1,14 @@
 """
 Controlador de ofertas laborales
 """
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
-from app.services.database_service import MongoDBManager
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash, session
+from app.extensions import get_db_manager, get_job_manager
 from app.controllers.auth import login_required
 from config.settings import Config
 
 ofertas_bp = Blueprint('ofertas', __name__)
 
 
-def get_db_manager():
-    """Obtiene la instancia del gestor de base de datos"""
-    return MongoDBManager(Config.MONGODB_URI)
-
-
 @ofertas_bp.route('/ofertas')
 @login_required
 def listar_ofertas():
@@ -31,14 +26,15 @@ def listar_ofertas():
     if request.args.get('modalidad'):
         filtros['modalidad'] = request.args.get('modalidad')
     
-    # Paginación
-    page = int(request.args.get('page', 1))
-    limit = Config.OFERTAS_PER_PAGE
-    offset = (page - 1) * limit
-    
-    ofertas = db_manager.get_ofertas(filtros, limit, offset)
+    # Paginación por cursor
+    cursor = request.args.get('cursor')
+    pagina = db_manager.get_ofertas_page(filtros, Config.OFERTAS_PER_PAGE, cursor)
     
-    return render_template('ofertas.html', ofertas=ofertas, filtros=filtros, page=page)
+    return render_template('ofertas.html',
+                         ofertas=pagina['ofertas'],
+                         filtros=filtros,
+                         next_cursor=pagina['next_cursor'],
+                         prev_cursor=pagina['prev_cursor'])
 
 
 @ofertas_bp.route('/ofertas/<oferta_id>')
@@ -71,51 +67,47 @@ def api_ofertas():
     if request.args.get('modalidad'):
         filtros['modalidad'] = request.args.get('modalidad')
     
-    page = int(request.args.get('page', 1))
-    limit = int(request.args.get('limit', Config.OFERTAS_PER_PAGE))
-    offset = (page - 1) * limit
+    # Límite acotado para evitar consultas arbitrariamente grandes
+    limit = request.args.get('limit', Config.OFERTAS_PER_PAGE, type=int) or Config.OFERTAS_PER_PAGE
+    limit = max(1, min(limit, Config.API_MAX_LIMIT))
+    cursor = request.args.get('cursor')
     
-    ofertas = db_manager.get_ofertas(filtros, limit, offset)
+    pagina = db_manager.get_ofertas_page(filtros, limit, cursor)
     
     return jsonify({
-        'ofertas': ofertas,
-        'page': page,
-        'limit': limit
+        'ofertas': pagina['ofertas'],
+        'limit': limit,
+        'next_cursor': pagina['next_cursor'],
+        'prev_cursor': pagina['prev_cursor']
     })
 
 
 @ofertas_bp.route('/extraer', methods=['POST'])
 @login_required
 def extraer_ofertas():
-    """Extraer nuevas ofertas laborales usando el servicio de scraping"""
-    from app.services.scraping_service import ScrapingService
+    """
+    Lanza la extracción de ofertas en segundo plano y responde de inmediato con el ID
+    del trabajo; si ya hay una extracción en curso se retorna ese mismo trabajo
+    """
     import logging
     
     logger = logging.getLogger(__name__)
     
     try:
-        logger.info("Iniciando extracción de ofertas para Tacna con servicio de scraping...")
-        
-        db_manager = get_db_manager()
-        scraping_service = ScrapingService(db_manager)
-        
         # Obtener portales a extraer (opcional)
         portals = request.json.get('portals', None) if request.is_json else None
         
-        # Ejecutar servicio de scraping
-        stats = scraping_service.run_scraping(portals)
-        
-        logger.info(f"Extracción completada: {stats}")
+        job, creado = get_job_manager().submit(portals, usuario=session.get('username'))
+        if job is None:
+            return jsonify({'success': False, 'error': 'No se pudo registrar el trabajo de extracción'}), 503
         
         return jsonify({
             'success': True,
-            'nuevas_ofertas': stats.get('nuevas', 0),
-            'actualizadas': stats.get('actualizadas', 0),
-            'errores': stats.get('errores', 0),
-            'total_procesadas': stats.get('total_encontradas', 0),
-            'por_fuente': stats.get('por_fuente', {}),
-            'servicio_separado': True
-        })
+            'job_id': job['_id'],
+            'estado': job['estado'],
+            'coalescido': not creado,
+            'url_estado': url_for('ofertas.estado_extraccion', job_id=job['_id'])
+        }), 202
         
     except Exception as e:
         logger.error(f"Error en extracción: {e}")
@@ -123,3 +115,15 @@ def extraer_ofertas():
         logger.error(f"Traceback completo: {traceback.format_exc()}")
         return jsonify({'error': str(e)}), 500
 
+
+@ofertas_bp.route('/extraer/<job_id>')
+@login_required
+def estado_extraccion(job_id):
+    """Estado y avance por portal de un trabajo de extracción"""
+    from app.services.scraping_jobs import serialize_job
+    
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Trabajo de extracción no encontrado'}), 404
+    return jsonify(serialize_job(job))
+
@@ -0,0 +1,79 @@
+"""
+Extensiones de Flask compartidas por la aplicación
+"""
+import os
+import threading
+from flask import current_app
+from config.settings import Config
+from app.services.database_service import MongoDBManager, mongo_client_options
+from app.services.scraping_jobs import ScrapingJobManager
+
+
+class MongoDBExtension:
+    """
+    Extensión Flask que expone un único MongoDBManager por proceso.
+    El manager (y su MongoClient con pool de conexiones) se crea de forma
+    perezosa en el primer uso, es decir, después del fork de cada worker.
+    """
+
+    def __init__(self, app=None, config_class=Config):
+        self.config_class = config_class
+        self._manager = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, config_class)
+
+    def init_app(self, app, config_class=None):
+        """
+        Registra la extensión en la aplicación
+        Args:
+            app: Instancia de Flask
+            config_class: Clase de configuración (por defecto la del constructor)
+        """
+        if config_class is not None:
+            self.config_class = config_class
+        app.extensions['mongodb'] = self
+
+    @property
+    def manager(self) -> MongoDBManager:
+        """Retorna el MongoDBManager del proceso actual, creándolo si es necesario"""
+        pid = os.getpid()
+        if self._manager is None or self._pid != pid:
+            with self._lock:
+                if self._manager is None or self._pid != pid:
+                    # Un MongoClient heredado del proceso padre no es seguro tras el fork
+                    self._manager = MongoDBManager(
+                        self.config_class.MONGODB_URI,
+                        self.config_class.MONGODB_DATABASE,
+                        **mongo_client_options(self.config_class)
+                    )
+                    self._pid = pid
+        return self._manager
+
+
+mongodb = MongoDBExtension()
+
+
+def get_db_manager() -> MongoDBManager:
+    """Obtiene el gestor de base de datos compartido de la aplicación actual"""
+    return current_app.extensions['mongodb'].manager
+
+
+_jobs_lock = threading.Lock()
+
+
+def get_job_manager() -> ScrapingJobManager:
+    """
+    Obtiene el gestor de trabajos de extracción de la aplicación actual.
+    Se crea uno por proceso junto con su MongoDBManager, ya que los hilos de
+    los trabajos no sobreviven al fork de los workers
+    """
+    db_manager = get_db_manager()
+    manager = current_app.extensions.get('scraping_jobs')
+    if manager is None or manager.db_manager is not db_manager:
+        with _jobs_lock:
+            manager = current_app.extensions.get('scraping_jobs')
+            if manager is None or manager.db_manager is not db_manager:
+                manager = current_app.extensions['scraping_jobs'] = ScrapingJobManager(db_manager)
+    return manager
@@ -0,0 +1,145 @@
+"""
+Circuit breaker para la salud de la conexión a MongoDB
+Mantiene el estado de la conexión con un heartbeat en segundo plano para que
+las consultas no tengan que hacer un ping antes de cada operación
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class ConnectionHealth:
+    """
+    Máquina de estados closed / open / half-open
+
+    - closed: la conexión está sana y las consultas se ejecutan normalmente
+    - open: la conexión falló; las consultas usan el modo sin conexión de inmediato
+    - half_open: el heartbeat está probando si la conexión se recuperó
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, probe: Callable[[], None], probe_interval: float = 10.0,
+                 failure_threshold: int = 1, name: str = 'mongodb',
+                 on_success: Callable[[], None] = None):
+        """
+        Args:
+            probe: Función que lanza una excepción si la conexión no está disponible
+            probe_interval: Segundos entre heartbeats
+            failure_threshold: Fallos consecutivos necesarios para abrir el circuito
+            name: Nombre del hilo de heartbeat (para logs)
+            on_success: Función que se ejecuta tras cada prueba exitosa; sus errores
+                        se registran pero no cuentan como fallo de conexión
+        """
+        self.logger = logging.getLogger(__name__)
+        self._probe = probe
+        self._on_success = on_success
+        self.probe_interval = probe_interval
+        self.failure_threshold = max(1, failure_threshold)
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._state = self.OPEN
+        self._consecutive_failures = 0
+        self._last_error: Optional[str] = None
+        self._last_probe_at: Optional[float] = None
+        self._changed_at = time.time()
+
+    @property
+    def state(self) -> str:
+        """Estado actual del circuito"""
+        return self._state
+
+    def is_available(self) -> bool:
+        """Indica si las consultas pueden ir a la base de datos (sin E/S)"""
+        return self._state == self.CLOSED
+
+    def _set_state(self, new_state: str):
+        if new_state != self._state:
+            self.logger.info(f"Conexión {self.name}: {self._state} -> {new_state}")
+            self._state = new_state
+            self._changed_at = time.time()
+
+    def record_success(self):
+        """Registra una operación exitosa y cierra el circuito"""
+        with self._lock:
+            self._consecutive_failures = 0
+            self._last_error = None
+            self._set_state(self.CLOSED)
+
+    def record_failure(self, error: Exception = None):
+        """
+        Registra un fallo de conexión; abre el circuito al alcanzar el umbral
+        Args:
+            error: Excepción que provocó el fallo (opcional)
+        """
+        with self._lock:
+            self._consecutive_failures += 1
+            if error is not None:
+                self._last_error = str(error)
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._set_state(self.OPEN)
+
+    def probe_now(self) -> bool:
+        """
+        Ejecuta una prueba de conexión de forma síncrona
+        Returns:
+            True si la conexión está disponible
+        """
+        with self._lock:
+            if self._state == self.OPEN:
+                self._set_state(self.HALF_OPEN)
+        self._last_probe_at = time.time()
+        try:
+            self._probe()
+        except Exception as e:
+            self.record_failure(e)
+            return False
+        self.record_success()
+        if self._on_success is not None:
+            try:
+                self._on_success()
+            except Exception as e:
+                self.logger.warning(f"Error tras la prueba de {self.name}: {e}")
+        return True
+
+    def start(self):
+        """Inicia el heartbeat en segundo plano (idempotente)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"{self.name}-heartbeat", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el heartbeat"""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.probe_interval):
+            try:
+                self.probe_now()
+            except Exception as e:
+                self.logger.error(f"Error en heartbeat de {self.name}: {e}")
+
+    def status(self) -> Dict:
+        """Retorna el estado del circuito para monitoreo"""
+        return {
+            'estado': self._state,
+            'fallos_consecutivos': self._consecutive_failures,
+            'ultimo_error': self._last_error,
+            'ultimo_heartbeat': self._last_probe_at,
+            'cambio_estado': self._changed_at,
+            'intervalo_heartbeat': self.probe_interval
+        }
@@ -2,95 +2,274 @@
 Gestor de base de datos MongoDB para el sistema de ofertas laborales
 """
 
-from pymongo import MongoClient, ASCENDING, DESCENDING
-from pymongo.errors import DuplicateKeyError, ConnectionFailure
+from pymongo import MongoClient, ASCENDING, DESCENDING, UpdateOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError, ConnectionFailure, BulkWriteError
+import base64
+import binascii
+import hashlib
+import json
 import logging
-from datetime import datetime
+import re
+import time
+from collections import Counter
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
 from bson import ObjectId
 from app.services.mock_data import MockData
+from app.services.connection_health import ConnectionHealth
+from app.services.detail_enricher import CAMPOS_ENRIQUECIDOS
+from app.services.query_cache import QueryCache
+from app.services.stats_counters import StatsCounters, PROYECCION_DIMENSIONES, aggregate_estadisticas
+from app.utils.helpers import normalize_text, build_search_fields
+from config.settings import Config
+
+# Campos internos que no se devuelven en los listados
+PROYECCION_OFERTA = {'busqueda_principal': 0, 'busqueda_detalle': 0, 'hash_contenido': 0,
+                     'hash_contenedor': 0}
+
+
+def mongo_client_options(config_class=Config) -> Dict[str, Any]:
+    """
+    Construye las opciones del MongoClient a partir de la configuración
+    Args:
+        config_class: Clase de configuración a usar
+    Returns:
+        Diccionario de opciones para MongoClient
+    """
+    options = {
+        'maxPoolSize': config_class.MONGODB_MAX_POOL_SIZE,
+        'minPoolSize': config_class.MONGODB_MIN_POOL_SIZE,
+        'maxIdleTimeMS': config_class.MONGODB_MAX_IDLE_TIME_MS,
+        'serverSelectionTimeoutMS': config_class.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        'connectTimeoutMS': config_class.MONGODB_CONNECT_TIMEOUT_MS,
+        'socketTimeoutMS': config_class.MONGODB_SOCKET_TIMEOUT_MS,
+    }
+    compressors = [c.strip() for c in config_class.MONGODB_COMPRESSORS.split(',') if c.strip()]
+    if compressors:
+        options['compressors'] = compressors
+    return options
+
+
+def encode_cursor(posicion: Dict) -> str:
+    """
+    Codifica una posición de paginación como token opaco (base64 url-safe)
+    Args:
+        posicion: Diccionario con created_at ('c') o relevancia ('s'), _id ('i') y
+                  dirección ('d'), o con el desplazamiento ('o') en modo simulación
+    Returns:
+        Token de cursor
+    """
+    data = dict(posicion)
+    if isinstance(data.get('c'), datetime):
+        data['c'] = data['c'].isoformat()
+    if isinstance(data.get('i'), ObjectId):
+        data['i'] = {'$oid': str(data['i'])}
+    raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str) -> Optional[Dict]:
+    """
+    Decodifica un token de cursor
+    Args:
+        token: Token generado por encode_cursor
+    Returns:
+        Diccionario con la posición o None si el token no es válido
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        data = json.loads(raw.decode('utf-8'))
+        if not isinstance(data, dict):
+            return None
+        if 'o' in data and not isinstance(data['o'], int):
+            return None
+        if 'c' in data:
+            data['c'] = datetime.fromisoformat(data['c']) if data['c'] else None
+        if 's' in data and not isinstance(data['s'], (int, float)):
+            return None
+        if 'c' in data or 's' in data:
+            if isinstance(data.get('i'), dict):
+                data['i'] = ObjectId(data['i']['$oid'])
+            if data.get('d') not in ('n', 'p'):
+                return None
+        return data
+    except (ValueError, TypeError, KeyError, binascii.Error, UnicodeDecodeError):
+        return None
+
 
 class MongoDBManager:
-    def __init__(self, connection_string: str = None):
+    def __init__(self, connection_string: str = None, database_name: str = None, **client_options):
         """
         Inicializa la conexión a MongoDB
         Args:
-            connection_string: URI de conexión a MongoDB (por defecto usa localhost)
+            connection_string: URI de conexión a MongoDB (por defecto usa Config.MONGODB_URI)
+            database_name: Nombre de la base de datos (por defecto usa Config.MONGODB_DATABASE)
+            client_options: Opciones del MongoClient (por defecto se toman de Config)
         """
         self.logger = logging.getLogger(__name__)
         
-        # Configuración por defecto para MongoDB local
         if not connection_string:
-            connection_string = "mongodb://localhost:27017/"
+            connection_string = Config.MONGODB_URI
+        if not database_name:
+            database_name = Config.MONGODB_DATABASE
+        options = mongo_client_options()
+        options.update(client_options)
+        
+        self.client = None
+        self.db = None
+        self.ofertas_collection = None
+        self.usuarios_collection = None
+        self.logs_collection = None
+        self.breakers_collection = None
+        self.jobs_collection = None
+        self.stats_counters = None
+        
+        # Caché de listados y conteos; se invalida al guardar o eliminar ofertas
+        self.query_cache = QueryCache(Config.QUERY_CACHE_SIZE, Config.QUERY_CACHE_TTL)
+        self._generacion_sync_at = 0.0
+        
+        # Indica si la colección de ofertas tiene datos (None = desconocido);
+        # lo actualizan el heartbeat y las escrituras, no cada consulta
+        self._tiene_datos: Optional[bool] = None
+        
+        # Estado de la conexión: el heartbeat reemplaza el ping antes de cada consulta
+        self._health = ConnectionHealth(
+            probe=self._ping,
+            probe_interval=Config.MONGODB_HEALTH_PROBE_INTERVAL,
+            failure_threshold=Config.MONGODB_HEALTH_FAILURE_THRESHOLD,
+            on_success=self._refrescar_tiene_datos
+        )
         
         try:
-            self.client = MongoClient(connection_string, serverSelectionTimeoutMS=5000)
-            # Verificar conexión
-            self.client.admin.command('ping')
-            self.logger.info("Conexión exitosa a MongoDB")
+            # MongoClient no bloquea: las colecciones quedan listas aunque el servidor
+            # esté caído, para que el heartbeat pueda recuperar la conexión
+            self.client = MongoClient(connection_string, **options)
             
             # Base de datos principal
-            self.db = self.client['ofertas_laborales']
+            self.db = self.client[database_name]
             
             # Colecciones
             self.ofertas_collection = self.db['ofertas']
             self.usuarios_collection = self.db['usuarios']
             self.logs_collection = self.db['logs_extraccion']
+            # Estado del circuit breaker de cada portal de scraping (_id = clave del portal)
+            self.breakers_collection = self.db['portal_breakers']
+            # Trabajos de extracción lanzados desde la web (POST /extraer)
+            self.jobs_collection = self.db['scraping_jobs']
             
-            # Crear índices para optimizar consultas
-            self._create_indexes()
-            
-            self._connected = True
-            
-        except (ConnectionFailure, Exception) as e:
-            self.logger.error(f"Error conectando a MongoDB: {e}")
-            self.logger.warning("La aplicación continuará pero algunas funcionalidades no estarán disponibles")
-            self._connected = False
-            # Crear objetos None para evitar errores
+            # Estadísticas materializadas, mantenidas al insertar y eliminar ofertas
+            self.stats_counters = StatsCounters(self.db['stats'])
+        except Exception as e:
+            self.logger.error(f"Error creando cliente de MongoDB: {e}")
             self.client = None
-            self.db = None
-            self.ofertas_collection = None
-            self.usuarios_collection = None
-            self.logs_collection = None
+        
+        if self.client is not None:
+            # Verificar conexión
+            # Los índices se gestionan con migraciones (python manage.py db migrate)
+            if self._health.probe_now():
+                self.logger.info("Conexión exitosa a MongoDB")
+            else:
+                self.logger.error(f"Error conectando a MongoDB: {self._health.status()['ultimo_error']}")
+                self.logger.warning("La aplicación continuará pero algunas funcionalidades no estarán disponibles")
+            self._health.start()
+    
+    @property
+    def _connected(self) -> bool:
+        """Indica si la conexión está disponible según el circuit breaker"""
+        return self.client is not None and self._health.is_available()
+    
+    def _ping(self):
+        """Prueba de conexión usada por el heartbeat"""
+        self.client.admin.command('ping')
     
-    def _create_indexes(self):
-        """Crea índices para optimizar las consultas"""
+    def _refrescar_tiene_datos(self):
+        """
+        Actualiza el indicador de datos con estimated_document_count (metadatos, sin recorrer
+        la colección); se ejecuta tras cada heartbeat exitoso. Si el conteo falla (permisos,
+        tiempo de espera) se conserva el último valor conocido
+        """
+        if Config.MOCK_DATA_MODE != 'auto':
+            return
         try:
-            # Índice único para el ID de oferta
-            self.ofertas_collection.create_index([("id", ASCENDING)], unique=True)
-            
-            # Índices para búsquedas frecuentes
-            self.ofertas_collection.create_index([("empresa", ASCENDING)])
-            self.ofertas_collection.create_index([("nivel_academico", ASCENDING)])
-            self.ofertas_collection.create_index([("modalidad", ASCENDING)])
-            self.ofertas_collection.create_index([("fuente", ASCENDING)])
-            self.ofertas_collection.create_index([("fecha_publicacion", DESCENDING)])
-            self.ofertas_collection.create_index([("created_at", DESCENDING)])
-            
-            # Índice de texto para búsquedas
-            self.ofertas_collection.create_index([
-                ("titulo_oferta", "text"),
-                ("puesto", "text"),
-                ("conocimientos_clave", "text"),
-                ("responsabilidades_breve", "text")
-            ])
-            
-            # Índice único para username en usuarios
-            self.usuarios_collection.create_index([("username", ASCENDING)], unique=True)
-            
-            self.logger.info("Índices creados exitosamente")
+            self._tiene_datos = self.ofertas_collection.estimated_document_count() > 0
         except Exception as e:
-            self.logger.error(f"Error creando índices: {e}")
+            self.logger.warning(f"No se pudo comprobar si hay ofertas: {e}")
+            self._handle_error(e)
     
-    def _check_connection(self) -> bool:
-        """Verifica si hay conexión a MongoDB"""
-        if not self._connected or not self.client:
+    def _base_vacia(self) -> bool:
+        """
+        Indica si se deben usar datos de simulación porque la base de datos está vacía
+        Solo aplica con MOCK_DATA_MODE='auto'; con 'offline' la simulación se usa
+        únicamente cuando MongoDB no está disponible
+        """
+        if Config.MOCK_DATA_MODE != 'auto':
             return False
-        try:
-            self.client.admin.command('ping')
+        if self._tiene_datos is None:
+            self._refrescar_tiene_datos()
+        # Sin un conteo exitoso todavía no se asume que la base esté vacía
+        return self._tiene_datos is False
+    
+    def _handle_error(self, error: Exception) -> bool:
+        """
+        Abre el circuito si el error es de conexión
+        Returns:
+            True si el error es de conexión (se puede usar el modo sin conexión)
+        """
+        if isinstance(error, ConnectionFailure):
+            self._health.record_failure(error)
             return True
-        except:
-            return False
+        return False
+    
+    def get_estado_conexion(self) -> Dict:
+        """
+        Obtiene el estado del circuit breaker de la conexión
+        Returns:
+            Diccionario con el estado para monitoreo
+        """
+        return self._health.status()
+    
+    def get_estado_cache(self) -> Dict:
+        """
+        Obtiene los contadores de la caché de consultas
+        Returns:
+            Diccionario con aciertos, fallos y entradas para monitoreo
+        """
+        return self.query_cache.stats()
+    
+    def _invalidar_cache(self, hay_inserciones: bool = False):
+        """
+        Incrementa la generación de datos: invalida la caché local de inmediato y
+        la de otros procesos en su próxima sincronización
+        Args:
+            hay_inserciones: True si se guardaron ofertas (la colección ya no está vacía);
+                             en caso contrario (eliminaciones) el indicador se recalcula
+        """
+        self._tiene_datos = True if hay_inserciones else None
+        self.query_cache.bump_generation()
+        try:
+            self.db['stats'].update_one({'_id': 'generacion'}, {'$inc': {'valor': 1}}, upsert=True)
+        except Exception as e:
+            self.logger.error(f"Error actualizando la generación de datos: {e}")
+            self._handle_error(e)
+    
+    def _cache_get(self, clave):
+        """
+        Busca una consulta en la caché, sincronizando antes la generación compartida
+        Returns:
+            Tupla (encontrado, valor)
+        """
+        if not self.query_cache.enabled:
+            return False, None
+        ahora = time.monotonic()
+        if ahora - self._generacion_sync_at >= Config.QUERY_CACHE_SYNC_INTERVAL:
+            self._generacion_sync_at = ahora
+            doc = self.db['stats'].find_one({'_id': 'generacion'})
+            self.query_cache.sync_generation(doc['valor'] if doc else 0)
+        return self.query_cache.get(clave)
+    
+    def _check_connection(self) -> bool:
+        """Verifica si hay conexión a MongoDB (sin E/S, según el circuit breaker)"""
+        return self._connected
     
     def insert_oferta(self, oferta_data: Dict) -> bool:
         """
@@ -105,33 +284,250 @@ class MongoDBManager:
             return False
         
         try:
-            # Añadir timestamps
+            # Añadir timestamps y campos normalizados para el índice de texto
             oferta_data['updated_at'] = datetime.now()
+            oferta_data.update(build_search_fields(oferta_data))
+            
+            # Sin la página de detalle, fecha_publicacion (el día en que se vio) solo se
+            # escribe al insertar, como en upsert_ofertas_bulk
+            al_insertar = {'created_at': datetime.now()}
+            if not oferta_data.get('enriquecida') and 'fecha_publicacion' in oferta_data:
+                al_insertar['fecha_publicacion'] = oferta_data.pop('fecha_publicacion')
             
-            # Intentar insertar o actualizar si ya existe
-            result = self.ofertas_collection.update_one(
+            # Intentar insertar o actualizar si ya existe (se lee la versión anterior
+            # para actualizar los contadores de estadísticas)
+            anterior = self.ofertas_collection.find_one_and_update(
                 {'id': oferta_data['id']},
                 {
                     '$set': oferta_data,
-                    '$setOnInsert': {'created_at': datetime.now()}
+                    '$setOnInsert': al_insertar
                 },
-                upsert=True
+                projection=PROYECCION_DIMENSIONES,
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
             )
             
-            if result.upserted_id:
+            if anterior is None:
                 self.logger.info(f"Oferta insertada: {oferta_data['id']}")
             else:
                 self.logger.info(f"Oferta actualizada: {oferta_data['id']}")
             
+            self._actualizar_contadores(StatsCounters.delta(anterior, oferta_data))
+            self._invalidar_cache(hay_inserciones=True)
             return True
             
         except Exception as e:
             self.logger.error(f"Error insertando/actualizando oferta: {e}")
+            self._handle_error(e)
             return False
     
+    def _actualizar_contadores(self, cambios):
+        """
+        Aplica incrementos a las estadísticas materializadas
+        Un fallo aquí no invalida la escritura de ofertas: el desvío se corrige
+        con `python manage.py stats rebuild`
+        """
+        try:
+            self.stats_counters.apply(cambios)
+        except Exception as e:
+            self.logger.error(f"Error actualizando contadores de estadísticas: {e}")
+            self._handle_error(e)
+    
+    def _categorias_existentes(self, ids: List[str]) -> Dict[str, Dict]:
+        """Obtiene nivel, modalidad, fuente y empresa actuales de las ofertas indicadas"""
+        cursor = self.ofertas_collection.find({'id': {'$in': ids}}, dict(PROYECCION_DIMENSIONES, id=1))
+        return {doc['id']: doc for doc in cursor}
+    
+    @staticmethod
+    def _hash_contenido(oferta_data: Dict) -> str:
+        """
+        Calcula un hash estable del contenido de una oferta (sin timestamps)
+        Solo considera los campos del listado: los que completa la página de detalle
+        no cuentan, así una oferta enriquecida no figura como actualizada
+        """
+        contenido = {
+            k: v for k, v in oferta_data.items()
+            if k not in ('_id', 'created_at', 'updated_at', 'hash_contenido', 'hash_contenedor',
+                         'last_seen', 'busqueda_principal', 'busqueda_detalle')
+            and k not in CAMPOS_ENRIQUECIDOS
+        }
+        return hashlib.md5(
+            json.dumps(contenido, sort_keys=True, default=str, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()
+    
+    def _build_upsert(self, oferta_data: Dict, now: datetime) -> UpdateOne:
+        """
+        Construye la operación de upsert de una oferta
+        Usa un pipeline de actualización para que updated_at solo cambie cuando
+        cambia el contenido; así modified_count cuenta solo ofertas realmente actualizadas
+        """
+        hash_contenido = self._hash_contenido(oferta_data)
+        # hash_contenedor y last_seen los escribe touch_ofertas: un cambio solo en el
+        # HTML del listado no cuenta como oferta actualizada
+        campos = {
+            k: {'$literal': v} for k, v in oferta_data.items()
+            if k not in ('_id', 'created_at', 'updated_at', 'hash_contenedor', 'last_seen')
+        }
+        campos['hash_contenido'] = hash_contenido
+        # Sin la página de detalle, fecha_publicacion es el día en que se vio la oferta por
+        # primera vez: se escribe solo al insertarla, así volver a verla otro día no la
+        # cuenta como actualizada (la fecha real del detalle sí la reemplaza)
+        if 'fecha_publicacion' in campos and not oferta_data.get('enriquecida'):
+            campos['fecha_publicacion'] = {'$ifNull': ['$fecha_publicacion', campos['fecha_publicacion']]}
+        # Campos normalizados (sin tildes) que usa el índice de texto en español
+        for campo, valor in build_search_fields(oferta_data).items():
+            campos[campo] = {'$literal': valor}
+        
+        return UpdateOne(
+            {'id': oferta_data['id']},
+            [
+                {'$set': {
+                    'updated_at': {'$cond': [
+                        {'$eq': ['$hash_contenido', hash_contenido]}, '$updated_at', now
+                    ]},
+                    'created_at': {'$ifNull': ['$created_at', now]}
+                }},
+                {'$set': campos}
+            ],
+            upsert=True
+        )
+    
+    def upsert_ofertas_bulk(self, ofertas: List[Dict], batch_size: int = None) -> Dict:
+        """
+        Inserta o actualiza ofertas en lotes con bulk_write no ordenado
+        Args:
+            ofertas: Lista de ofertas (cada una con campo 'id')
+            batch_size: Tamaño de cada lote (por defecto Config.BULK_BATCH_SIZE)
+        Returns:
+            Diccionario con conteos exactos: nuevas, actualizadas, sin_cambios, errores
+        """
+        resultado = {'nuevas': 0, 'actualizadas': 0, 'sin_cambios': 0, 'errores': 0}
+        if not ofertas:
+            return resultado
+        
+        if not self._check_connection():
+            self.logger.warning("No hay conexión a MongoDB. No se pueden guardar ofertas.")
+            resultado['errores'] = len(ofertas)
+            return resultado
+        
+        batch_size = batch_size or Config.BULK_BATCH_SIZE
+        
+        # Una sola operación por ID (la última gana) para que los conteos sean exactos
+        unicas = {}
+        for oferta in ofertas:
+            if oferta.get('id'):
+                unicas[oferta['id']] = oferta
+            else:
+                resultado['errores'] += 1
+        
+        now = datetime.now()
+        pendientes = list(unicas.values())
+        operaciones = [self._build_upsert(oferta, now) for oferta in pendientes]
+        
+        for inicio in range(0, len(operaciones), batch_size):
+            lote = operaciones[inicio:inicio + batch_size]
+            ofertas_lote = pendientes[inicio:inicio + batch_size]
+            fallidas = set()
+            try:
+                # Categorías previas del lote para los contadores de estadísticas
+                anteriores = self._categorias_existentes([o['id'] for o in ofertas_lote])
+                details = self.ofertas_collection.bulk_write(lote, ordered=False).bulk_api_result
+            except BulkWriteError as e:
+                # Con ordered=False el resto del lote se aplica; solo fallan writeErrors
+                details = e.details
+                fallidas = {error['index'] for error in details.get('writeErrors', [])}
+                resultado['errores'] += len(details.get('writeErrors', []))
+                self.logger.error(f"Errores en lote de ofertas ({inicio}-{inicio + len(lote)}): "
+                                  f"{len(details.get('writeErrors', []))}")
+            except Exception as e:
+                self.logger.error(f"Error guardando lote de ofertas ({inicio}-{inicio + len(lote)}): {e}")
+                resultado['errores'] += len(lote)
+                if self._handle_error(e):
+                    # Sin conexión: los lotes restantes también fallarían
+                    resultado['errores'] += len(operaciones) - inicio - len(lote)
+                    break
+                continue
+            
+            resultado['nuevas'] += details.get('nUpserted', 0)
+            resultado['actualizadas'] += details.get('nModified', 0)
+            resultado['sin_cambios'] += details.get('nMatched', 0) - details.get('nModified', 0)
+            
+            cambios = Counter()
+            for indice, oferta in enumerate(ofertas_lote):
+                if indice not in fallidas:
+                    cambios.update(StatsCounters.delta(anteriores.get(oferta['id']), oferta))
+            self._actualizar_contadores(cambios)
+        
+        if resultado['nuevas'] or resultado['actualizadas']:
+            self._invalidar_cache(hay_inserciones=True)
+        
+        self.logger.info(
+            f"Guardado masivo: {resultado['nuevas']} nuevas, {resultado['actualizadas']} actualizadas, "
+            f"{resultado['sin_cambios']} sin cambios, {resultado['errores']} errores"
+        )
+        return resultado
+    
+    def _mock_ofertas_filtradas(self, filtros: Dict = None) -> List[Dict]:
+        """Obtiene las ofertas de simulación filtradas y ordenadas (más recientes primero)"""
+        try:
+            mock_ofertas = MockData.get_mock_ofertas()
+            # Las fechas están en formato ISO string, así que podemos ordenarlas directamente
+            mock_ofertas.sort(key=lambda x: (x.get('created_at', ''), x.get('_id', '')), reverse=True)
+            return MockData.filter_ofertas(mock_ofertas, filtros)
+        except Exception as e:
+            self.logger.error(f"Error obteniendo datos mock: {e}", exc_info=True)
+            return []
+    
+    @staticmethod
+    def _build_query(filtros: Dict = None) -> tuple[Dict, bool]:
+        """
+        Construye la consulta de MongoDB a partir de los filtros
+        Es la única fuente de la consulta para listados, conteos y estadísticas
+        Args:
+            filtros: Diccionario con los filtros
+        Returns:
+            Tupla (consulta, usa_busqueda_de_texto)
+        """
+        query = {}
+        
+        if filtros:
+            # Filtro por empresa
+            if filtros.get('empresa') and str(filtros['empresa']).strip():
+                query['empresa'] = {'$regex': re.escape(str(filtros['empresa']).strip()), '$options': 'i'}
+            
+            # Filtro por nivel académico
+            if filtros.get('nivel_academico'):
+                query['nivel_academico'] = filtros['nivel_academico']
+            
+            # Filtro por modalidad
+            if filtros.get('modalidad'):
+                query['modalidad'] = filtros['modalidad']
+            
+            # Búsqueda de texto con el índice en español sobre los campos sin tildes
+            busqueda = normalize_text(filtros.get('busqueda'))
+            if busqueda:
+                query['$text'] = {
+                    '$search': busqueda,
+                    '$language': 'spanish',
+                    '$diacriticSensitive': False
+                }
+        
+        return query, '$text' in query
+    
+    @staticmethod
+    def _serialize_oferta(doc: Dict) -> Dict:
+        """Convierte ObjectId y fechas a string para serialización JSON"""
+        doc['_id'] = str(doc['_id'])
+        if isinstance(doc.get('created_at'), datetime):
+            doc['created_at'] = doc['created_at'].isoformat()
+        if isinstance(doc.get('updated_at'), datetime):
+            doc['updated_at'] = doc['updated_at'].isoformat()
+        return doc
+    
     def get_ofertas(self, filtros: Dict = None, limit: int = 50, offset: int = 0) -> List[Dict]:
         """
         Obtiene ofertas con filtros opcionales
+        Para recorrer páginas profundas usar get_ofertas_page (paginación por cursor)
         Args:
             filtros: Diccionario con los filtros a aplicar
             limit: Número máximo de resultados
@@ -141,19 +537,10 @@ class MongoDBManager:
         """
         # Función auxiliar para obtener y ordenar datos mock
         def get_mock_ofertas_ordenadas():
-            try:
-                mock_ofertas = MockData.get_mock_ofertas()
-                self.logger.info(f"Obtenidas {len(mock_ofertas)} ofertas mock")
-                # Ordenar por fecha de creación (más recientes primero)
-                # Las fechas están en formato ISO string, así que podemos ordenarlas directamente
-                mock_ofertas.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-                filtered = MockData.filter_ofertas(mock_ofertas, filtros)
-                result = filtered[offset:offset + limit]
-                self.logger.info(f"Retornando {len(result)} ofertas mock (offset={offset}, limit={limit})")
-                return result
-            except Exception as e:
-                self.logger.error(f"Error obteniendo datos mock: {e}", exc_info=True)
-                return []
+            filtered = self._mock_ofertas_filtradas(filtros)
+            result = filtered[offset:offset + limit]
+            self.logger.info(f"Retornando {len(result)} ofertas mock (offset={offset}, limit={limit})")
+            return result
         
         if not self._check_connection():
             # Usar datos de simulación cuando MongoDB no está disponible
@@ -161,58 +548,141 @@ class MongoDBManager:
             return get_mock_ofertas_ordenadas()
         
         try:
-            # Verificar si hay ofertas en la base de datos
-            total = self.ofertas_collection.count_documents({})
-            self.logger.info(f"Total de ofertas en BD: {total}")
-            if total == 0:
-                # Si no hay ofertas, usar datos de simulación
+            # Si no hay ofertas, usar datos de simulación (indicador en memoria, sin contar)
+            if self._base_vacia():
                 self.logger.info("Base de datos vacía, usando datos de simulación")
                 return get_mock_ofertas_ordenadas()
             
-            query = {}
-            
-            if filtros:
-                # Filtro por empresa
-                if filtros.get('empresa'):
-                    query['empresa'] = {'$regex': filtros['empresa'], '$options': 'i'}
-                
-                # Filtro por nivel académico
-                if filtros.get('nivel_academico'):
-                    query['nivel_academico'] = filtros['nivel_academico']
-                
-                # Filtro por modalidad
-                if filtros.get('modalidad'):
-                    query['modalidad'] = filtros['modalidad']
-                
-                # Búsqueda de texto (buscar en título, empresa, puesto)
-                if filtros.get('busqueda'):
-                    busqueda = filtros['busqueda']
-                    query['$or'] = [
-                        {'titulo_oferta': {'$regex': busqueda, '$options': 'i'}},
-                        {'empresa': {'$regex': busqueda, '$options': 'i'}},
-                        {'puesto': {'$regex': busqueda, '$options': 'i'}}
-                    ]
-            
-            # Ejecutar consulta con paginación
-            cursor = self.ofertas_collection.find(query).sort('created_at', DESCENDING).skip(offset).limit(limit)
-            
-            # Convertir ObjectId a string para serialización JSON
-            ofertas = []
-            for doc in cursor:
-                doc['_id'] = str(doc['_id'])
-                # Convertir fechas a string si son datetime
-                if isinstance(doc.get('created_at'), datetime):
-                    doc['created_at'] = doc['created_at'].isoformat()
-                if isinstance(doc.get('updated_at'), datetime):
-                    doc['updated_at'] = doc['updated_at'].isoformat()
-                ofertas.append(doc)
+            clave = QueryCache.make_key('ofertas', filtros, limit=limit, offset=offset)
+            encontrado, ofertas = self._cache_get(clave)
+            if encontrado:
+                return ofertas
+            
+            query, es_texto = self._build_query(filtros)
             
+            # Ejecutar consulta con paginación (por relevancia si hay búsqueda de texto)
+            if es_texto:
+                proyeccion = dict(PROYECCION_OFERTA, relevancia={'$meta': 'textScore'})
+                orden = [('relevancia', {'$meta': 'textScore'}), ('_id', DESCENDING)]
+            else:
+                proyeccion = PROYECCION_OFERTA
+                orden = [('created_at', DESCENDING), ('_id', DESCENDING)]
+            cursor = self.ofertas_collection.find(query, proyeccion).sort(orden).skip(offset).limit(limit)
+            
+            ofertas = [self._serialize_oferta(doc) for doc in cursor]
+            self.query_cache.set(clave, ofertas)
             return ofertas
             
         except Exception as e:
             self.logger.error(f"Error obteniendo ofertas: {e}")
+            if self._handle_error(e):
+                return get_mock_ofertas_ordenadas()
             return []
     
+    def get_ofertas_page(self, filtros: Dict = None, limit: int = 20, cursor: str = None) -> Dict:
+        """
+        Obtiene una página de ofertas con paginación por cursor (keyset)
+        El costo de cada página es el mismo sin importar su profundidad
+        Args:
+            filtros: Diccionario con los filtros a aplicar
+            limit: Número máximo de resultados
+            cursor: Token opaco devuelto como next_cursor/prev_cursor (None = primera página)
+        Returns:
+            Diccionario con 'ofertas', 'next_cursor' y 'prev_cursor'
+        """
+        posicion = decode_cursor(cursor) if cursor else None
+        
+        def get_mock_page():
+            # En modo simulación el cursor guarda la posición en la lista
+            filtered = self._mock_ofertas_filtradas(filtros)
+            offset = 0
+            if posicion and 'o' in posicion:
+                offset = max(0, int(posicion['o']))
+            ofertas = filtered[offset:offset + limit]
+            return {
+                'ofertas': ofertas,
+                'next_cursor': encode_cursor({'o': offset + limit}) if offset + limit < len(filtered) else None,
+                'prev_cursor': encode_cursor({'o': max(0, offset - limit)}) if offset > 0 else None
+            }
+        
+        if not self._check_connection():
+            self.logger.info("MongoDB no disponible, usando datos de simulación")
+            return get_mock_page()
+        
+        try:
+            if self._base_vacia():
+                self.logger.info("Base de datos vacía, usando datos de simulación")
+                return get_mock_page()
+            
+            clave = QueryCache.make_key('pagina', filtros, limit=limit, cursor=cursor)
+            encontrado, pagina = self._cache_get(clave)
+            if encontrado:
+                return pagina
+            
+            query, es_texto = self._build_query(filtros)
+            
+            # Con búsqueda de texto se ordena por relevancia (textScore); si no, por fecha
+            campo_orden, campo_cursor = ('relevancia', 's') if es_texto else ('created_at', 'c')
+            if posicion and campo_cursor not in posicion:
+                posicion = None
+            atras = bool(posicion) and posicion.get('d') == 'p'
+            
+            limite = None
+            if posicion:
+                # (campo_orden, _id) estrictamente después/antes del cursor en el orden descendente
+                op = '$gt' if atras else '$lt'
+                limite = {'$or': [
+                    {campo_orden: {op: posicion[campo_cursor]}},
+                    {campo_orden: posicion[campo_cursor], '_id': {op: posicion['i']}}
+                ]}
+            
+            orden = ASCENDING if atras else DESCENDING
+            if es_texto:
+                pipeline = [
+                    {'$match': query},
+                    {'$addFields': {'relevancia': {'$meta': 'textScore'}}}
+                ]
+                if limite:
+                    pipeline.append({'$match': limite})
+                pipeline += [
+                    {'$sort': {'relevancia': orden, '_id': orden}},
+                    {'$limit': limit + 1},
+                    {'$project': PROYECCION_OFERTA}
+                ]
+                docs = list(self.ofertas_collection.aggregate(pipeline))
+            else:
+                if limite:
+                    query = {'$and': [query, limite]} if query else limite
+                docs = list(self.ofertas_collection.find(query, PROYECCION_OFERTA).sort(
+                    [('created_at', orden), ('_id', orden)]
+                ).limit(limit + 1))
+            
+            hay_mas = len(docs) > limit
+            docs = docs[:limit]
+            if atras:
+                docs.reverse()
+            
+            next_cursor = prev_cursor = None
+            if docs:
+                if (hay_mas and not atras) or (atras and posicion):
+                    next_cursor = encode_cursor({'d': 'n', campo_cursor: docs[-1].get(campo_orden), 'i': docs[-1]['_id']})
+                if (hay_mas and atras) or (not atras and posicion):
+                    prev_cursor = encode_cursor({'d': 'p', campo_cursor: docs[0].get(campo_orden), 'i': docs[0]['_id']})
+            
+            pagina = {
+                'ofertas': [self._serialize_oferta(doc) for doc in docs],
+                'next_cursor': next_cursor,
+                'prev_cursor': prev_cursor
+            }
+            self.query_cache.set(clave, pagina)
+            return pagina
+            
+        except Exception as e:
+            self.logger.error(f"Error obteniendo página de ofertas: {e}")
+            if self._handle_error(e):
+                return get_mock_page()
+            return {'ofertas': [], 'next_cursor': None, 'prev_cursor': None}
+    
     def get_oferta_by_id(self, oferta_id: str) -> Optional[Dict]:
         """
         Obtiene una oferta específica por su ID
@@ -245,8 +715,216 @@ class MongoDBManager:
             
         except Exception as e:
             self.logger.error(f"Error obteniendo oferta: {e}")
+            self._handle_error(e)
+            return None
+    
+    def get_existing_ids(self, ids: List[str]) -> set:
+        """
+        Obtiene cuáles de los IDs indicados ya están guardados
+        Args:
+            ids: IDs de ofertas
+        Returns:
+            Conjunto de IDs existentes (vacío si no hay conexión)
+        """
+        if not ids or not self._check_connection():
+            return set()
+        
+        try:
+            cursor = self.ofertas_collection.find({'id': {'$in': list(ids)}}, {'id': 1, '_id': 0})
+            return {doc['id'] for doc in cursor}
+        except Exception as e:
+            self.logger.error(f"Error consultando IDs existentes: {e}")
+            self._handle_error(e)
+            return set()
+    
+    def get_enriched_ids(self, ids: List[str]) -> set:
+        """
+        Obtiene cuáles de los IDs indicados ya se enriquecieron con su página de detalle
+        Args:
+            ids: IDs de ofertas
+        Returns:
+            Conjunto de IDs enriquecidos (vacío si no hay conexión)
+        """
+        if not ids or not self._check_connection():
+            return set()
+        
+        try:
+            cursor = self.ofertas_collection.find(
+                {'id': {'$in': list(ids)}, 'enriquecida': True}, {'id': 1, '_id': 0}
+            )
+            return {doc['id'] for doc in cursor}
+        except Exception as e:
+            self.logger.error(f"Error consultando ofertas enriquecidas: {e}")
+            self._handle_error(e)
+            return set()
+    
+    def get_seen_pairs(self, fuente: str) -> List[tuple]:
+        """
+        Obtiene los IDs guardados de un portal con el hash de su contenedor HTML
+        (consulta cubierta por el índice fuente_1_id_1_hash_contenedor_1)
+        Args:
+            fuente: Nombre del portal
+        Returns:
+            Lista de tuplas (id, hash_contenedor o None); vacía si no hay conexión
+        """
+        if not self._check_connection():
+            return []
+        
+        try:
+            cursor = self.ofertas_collection.find(
+                {'fuente': fuente}, {'id': 1, 'hash_contenedor': 1, '_id': 0}
+            )
+            return [(doc.get('id'), doc.get('hash_contenedor')) for doc in cursor]
+        except Exception as e:
+            self.logger.error(f"Error consultando ofertas conocidas de {fuente}: {e}")
+            self._handle_error(e)
+            return []
+    
+    def touch_ofertas(self, ids: List[str], hashes: Dict[str, str] = None,
+                      batch_size: int = None) -> int:
+        """
+        Marca ofertas como vistas en la última extracción (actualiza last_seen y,
+        si se indica, el hash del contenedor HTML de cada una)
+        Args:
+            ids: IDs de ofertas vistas
+            hashes: Hash del contenedor por ID de las ofertas extraídas (opcional)
+            batch_size: Tamaño de cada lote (por defecto Config.BULK_BATCH_SIZE)
+        Returns:
+            Número de ofertas marcadas
+        """
+        if not ids or not self._check_connection():
+            return 0
+        
+        batch_size = batch_size or Config.BULK_BATCH_SIZE
+        hashes = hashes or {}
+        ids = list(dict.fromkeys(ids))
+        now = datetime.now()
+        marcadas = 0
+        try:
+            # Las ofertas sin hash nuevo se marcan con un update_many por lote
+            solo_vistas = [i for i in ids if not hashes.get(i)]
+            for inicio in range(0, len(solo_vistas), batch_size):
+                result = self.ofertas_collection.update_many(
+                    {'id': {'$in': solo_vistas[inicio:inicio + batch_size]}},
+                    {'$set': {'last_seen': now}}
+                )
+                marcadas += result.matched_count
+            
+            operaciones = [
+                UpdateOne({'id': i}, {'$set': {'last_seen': now, 'hash_contenedor': hashes[i]}})
+                for i in ids if hashes.get(i)
+            ]
+            for inicio in range(0, len(operaciones), batch_size):
+                result = self.ofertas_collection.bulk_write(operaciones[inicio:inicio + batch_size],
+                                                            ordered=False)
+                marcadas += result.matched_count
+        except Exception as e:
+            self.logger.error(f"Error actualizando last_seen: {e}")
+            self._handle_error(e)
+        return marcadas
+    
+    def get_portal_breakers(self) -> Dict[str, Dict]:
+        """
+        Obtiene el estado guardado del circuit breaker de cada portal
+        Returns:
+            Diccionario {portal: estado} (vacío si no hay conexión)
+        """
+        if not self._check_connection():
+            return {}
+        
+        try:
+            return {doc.pop('_id'): doc for doc in self.breakers_collection.find()}
+        except Exception as e:
+            self.logger.error(f"Error consultando el estado de los portales: {e}")
+            self._handle_error(e)
+            return {}
+    
+    def save_portal_breaker(self, portal: str, estado: Dict) -> bool:
+        """
+        Guarda el estado del circuit breaker de un portal
+        Args:
+            portal: Clave del portal
+            estado: Campos del estado (fallos_consecutivos, abierto_hasta, ultimo_error, ...)
+        Returns:
+            True si se guardó correctamente
+        """
+        if not self._check_connection():
+            return False
+        
+        try:
+            self.breakers_collection.replace_one(
+                {'_id': portal}, {**estado, 'updated_at': datetime.now()}, upsert=True
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"Error guardando el estado del portal {portal}: {e}")
+            self._handle_error(e)
+            return False
+    
+    def create_scraping_job(self, job: Dict) -> bool:
+        """
+        Registra un trabajo de extracción activo
+        Args:
+            job: Documento del trabajo (con _id y activo=True)
+        Returns:
+            True si se creó; False si ya hay otro activo (índice activo_1_unico) o no hay conexión
+        """
+        if not self._check_connection():
+            return False
+        
+        try:
+            self.jobs_collection.insert_one(job)
+            return True
+        except DuplicateKeyError:
+            return False
+        except Exception as e:
+            self.logger.error(f"Error creando trabajo de extracción: {e}")
+            self._handle_error(e)
+            return False
+    
+    def get_scraping_job(self, job_id: str = None) -> Optional[Dict]:
+        """
+        Obtiene un trabajo de extracción
+        Args:
+            job_id: ID del trabajo; si es None, el trabajo activo (si lo hay)
+        Returns:
+            Documento del trabajo o None
+        """
+        if not self._check_connection():
+            return None
+        
+        try:
+            query = {'_id': job_id} if job_id else {'activo': True}
+            return self.jobs_collection.find_one(query)
+        except Exception as e:
+            self.logger.error(f"Error consultando trabajo de extracción: {e}")
+            self._handle_error(e)
             return None
     
+    def update_scraping_job(self, job_id: str, campos: Dict, finalizar: bool = False) -> bool:
+        """
+        Actualiza el estado y el progreso de un trabajo de extracción
+        Args:
+            job_id: ID del trabajo
+            campos: Campos a actualizar
+            finalizar: Quitar la marca de trabajo activo (permite lanzar otro)
+        Returns:
+            True si se actualizó correctamente
+        """
+        if not self._check_connection():
+            return False
+        
+        update = {'$set': {**campos, 'updated_at': datetime.now()}}
+        if finalizar:
+            update['$unset'] = {'activo': ''}
+        try:
+            self.jobs_collection.update_one({'_id': job_id}, update)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error actualizando trabajo de extracción {job_id}: {e}")
+            self._handle_error(e)
+            return False
+    
     def count_ofertas(self, filtros: Dict = None) -> int:
         """
         Cuenta el número de ofertas que cumplen con los filtros
@@ -262,83 +940,85 @@ class MongoDBManager:
             return len(filtered)
         
         try:
-            query = {}
+            clave = QueryCache.make_key('conteo', filtros)
+            encontrado, total = self._cache_get(clave)
+            if encontrado:
+                return total
             
-            if filtros:
-                if filtros.get('empresa'):
-                    query['empresa'] = {'$regex': filtros['empresa'], '$options': 'i'}
-                if filtros.get('nivel_academico'):
-                    query['nivel_academico'] = filtros['nivel_academico']
-                if filtros.get('modalidad'):
-                    query['modalidad'] = filtros['modalidad']
-                if filtros.get('busqueda'):
-                    query['$text'] = {'$search': filtros['busqueda']}
-            
-            return self.ofertas_collection.count_documents(query)
+            query, _ = self._build_query(filtros)
+            total = self.ofertas_collection.count_documents(query)
+            self.query_cache.set(clave, total)
+            return total
             
         except Exception as e:
             self.logger.error(f"Error contando ofertas: {e}")
+            if self._handle_error(e):
+                return len(MockData.filter_ofertas(MockData.get_mock_ofertas(), filtros))
             return 0
     
-    def get_estadisticas(self) -> Dict:
+    def _aggregate_estadisticas(self, query: Dict = None, top_empresas: int = 10) -> Dict:
+        """
+        Calcula todas las estadísticas en un único recorrido con $facet
+        Args:
+            query: Consulta para limitar las estadísticas a un subconjunto
+            top_empresas: Número de empresas a incluir (None = todas)
+        Returns:
+            Diccionario con estadísticas
+        """
+        return aggregate_estadisticas(self.ofertas_collection, query, top_empresas)
+    
+    def _mock_estadisticas(self, filtros: Dict = None) -> Dict:
+        """Estadísticas de simulación, calculadas sobre el subconjunto filtrado si hay filtros"""
+        if not filtros:
+            return MockData.get_mock_estadisticas()
+        return MockData.compute_estadisticas(self._mock_ofertas_filtradas(filtros))
+    
+    def get_estadisticas(self, filtros: Dict = None) -> Dict:
         """
-        Obtiene estadísticas generales de las ofertas
+        Obtiene estadísticas de las ofertas en una sola agregación
+        Args:
+            filtros: Filtros opcionales (mismos que get_ofertas) para limitar las estadísticas
         Returns:
             Diccionario con estadísticas
         """
         if not self._check_connection():
             # Usar datos de simulación cuando MongoDB no está disponible
             self.logger.info("MongoDB no disponible, usando estadísticas de simulación")
-            stats = MockData.get_mock_estadisticas()
-            self.logger.info(f"Estadísticas mock: {stats}")
-            return stats
+            return self._mock_estadisticas(filtros)
         
         try:
-            # Total de ofertas
-            total_ofertas = self.ofertas_collection.count_documents({})
-            self.logger.info(f"Total de ofertas en BD para estadísticas: {total_ofertas}")
+            stats = None
+            if not filtros:
+                # Sin filtros se leen los contadores materializados (un solo documento)
+                stats = self.stats_counters.read()
+            if stats is None:
+                query, _ = self._build_query(filtros)
+                stats = self._aggregate_estadisticas(query)
+            self.logger.info(f"Total de ofertas en BD para estadísticas: {stats['total_ofertas']}")
             
             # Si no hay ofertas, usar datos de simulación
-            if total_ofertas == 0:
+            if stats['total_ofertas'] == 0 and not filtros and Config.MOCK_DATA_MODE == 'auto':
                 self.logger.info("Base de datos vacía, usando estadísticas de simulación")
-                stats = MockData.get_mock_estadisticas()
-                self.logger.info(f"Estadísticas mock: {stats}")
-                return stats
-            
-            # Ofertas por nivel académico
-            niveles = list(self.ofertas_collection.aggregate([
-                {'$group': {'_id': '$nivel_academico', 'count': {'$sum': 1}}}
-            ]))
-            
-            # Ofertas por modalidad
-            modalidades = list(self.ofertas_collection.aggregate([
-                {'$group': {'_id': '$modalidad', 'count': {'$sum': 1}}}
-            ]))
-            
-            # Ofertas por fuente
-            fuentes = list(self.ofertas_collection.aggregate([
-                {'$group': {'_id': '$fuente', 'count': {'$sum': 1}}}
-            ]))
-            
-            # Ofertas por empresa (top 10)
-            empresas = list(self.ofertas_collection.aggregate([
-                {'$group': {'_id': '$empresa', 'count': {'$sum': 1}}},
-                {'$sort': {'count': -1}},
-                {'$limit': 10}
-            ]))
+                return self._mock_estadisticas()
             
-            return {
-                'total_ofertas': total_ofertas,
-                'por_nivel': {item['_id']: item['count'] for item in niveles},
-                'por_modalidad': {item['_id']: item['count'] for item in modalidades},
-                'por_fuente': {item['_id']: item['count'] for item in fuentes},
-                'top_empresas': {item['_id']: item['count'] for item in empresas}
-            }
+            return stats
             
         except Exception as e:
             self.logger.error(f"Error obteniendo estadísticas: {e}")
+            if self._handle_error(e):
+                return self._mock_estadisticas(filtros)
             return {}
     
+    def rebuild_estadisticas(self) -> Dict:
+        """
+        Recalcula las estadísticas materializadas desde la colección de ofertas
+        Returns:
+            Estadísticas recalculadas (con todas las empresas)
+        """
+        stats = self.stats_counters.rebuild(self.ofertas_collection)
+        self.logger.info(f"Estadísticas materializadas recalculadas: {stats['total_ofertas']} ofertas")
+        return stats
+    
     def create_user(self, username: str, password_hash: str, email: str = None) -> bool:
         """
         Crea un nuevo usuario
@@ -370,6 +1050,7 @@ class MongoDBManager:
             return False
         except Exception as e:
             self.logger.error(f"Error creando usuario: {e}")
+            self._handle_error(e)
             return False
     
     def get_user_by_username(self, username: str) -> Optional[Dict]:
@@ -401,6 +1082,7 @@ class MongoDBManager:
             
         except Exception as e:
             self.logger.error(f"Error obteniendo usuario: {e}")
+            self._handle_error(e)
             return None
     
     def insert_log_extraccion(self, log_data: Dict) -> bool:
@@ -453,8 +1135,14 @@ class MongoDBManager:
             True si se eliminó correctamente
         """
         try:
-            result = self.ofertas_collection.delete_one({'id': oferta_id})
-            return result.deleted_count > 0
+            eliminada = self.ofertas_collection.find_one_and_delete(
+                {'id': oferta_id}, projection=PROYECCION_DIMENSIONES
+            )
+            if eliminada is None:
+                return False
+            self._actualizar_contadores(StatsCounters.delta(eliminada, None))
+            self._invalidar_cache()
+            return True
             
         except Exception as e:
             self.logger.error(f"Error eliminando oferta: {e}")
@@ -469,12 +1157,16 @@ class MongoDBManager:
             Número de ofertas eliminadas
         """
         try:
-            from datetime import timedelta
-            cutoff_date = datetime.now() - timedelta(days=days)
+            query = {'created_at': {'$lt': datetime.now() - timedelta(days=days)}}
+            
+            # Conteos de lo que se va a eliminar, para descontarlos de las estadísticas
+            eliminadas = self._aggregate_estadisticas(query, top_empresas=None)
+            if eliminadas['total_ofertas'] == 0:
+                return 0
             
-            result = self.ofertas_collection.delete_many({
-                'created_at': {'$lt': cutoff_date}
-            })
+            result = self.ofertas_collection.delete_many(query)
+            self._actualizar_contadores(StatsCounters.delta_from_estadisticas(eliminadas, signo=-1))
+            self._invalidar_cache()
             
             self.logger.info(f"Eliminadas {result.deleted_count} ofertas antiguas")
             return result.deleted_count
@@ -485,6 +1177,7 @@ class MongoDBManager:
     
     def close(self):
         """Cierra la conexión a MongoDB"""
+        self._health.stop()
         try:
             self.client.close()
             self.logger.info("Conexión a MongoDB cerrada")
@@ -0,0 +1,203 @@
+"""
+Enriquecimiento de ofertas con su página de detalle
+Segunda etapa opcional del scraping: descarga la página url_oferta de las ofertas
+que aún no se enriquecieron y reemplaza los valores provisionales del listado
+(fecha de publicación, contacto, documentos requeridos y descripción completa).
+Las ofertas enriquecidas quedan marcadas con enriquecida=True y no se vuelven a
+descargar; así el costo depende de las ofertas nuevas y no del total guardado
+"""
+import json
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from app.services.html_parser import parse_html
+from config.settings import Config
+
+# Campos que completa la página de detalle; el listado no los sobrescribe
+# en ofertas ya enriquecidas
+CAMPOS_ENRIQUECIDOS = ('fecha_publicacion', 'fecha_cierre', 'fecha_estimacion', 'contacto',
+                       'documentos_requeridos', 'descripcion', 'enriquecida')
+
+DESCRIPCION_SELECTORES = [
+    '[itemprop="description"]', '#job-description', '#jobDescriptionText',
+    '.job-description', '.description', 'div.box_detail', '[class*="description"]',
+    '[class*="descripcion"]', 'article'
+]
+
+DOCUMENTOS = [
+    (r'\b(cv|curr[ií]cul(um|o)( vitae)?|hoja de vida)\b', 'CV actualizado'),
+    (r'\bcarta de presentaci[oó]n\b', 'carta de presentación'),
+    (r'\bcertificados? de (estudios|trabajo)\b', 'certificados'),
+    (r'\bt[ií]tulo (profesional|t[eé]cnico)\b', 'título profesional'),
+    (r'\bcolegiatura\b', 'colegiatura'),
+    (r'\bportafolio\b', 'portafolio'),
+    (r'\b(dni|documento de identidad)\b', 'DNI'),
+    (r'\bantecedentes (policiales|penales)\b', 'antecedentes'),
+]
+
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+TELEFONO_RE = re.compile(r'(?<!\d)(?:\+?51[\s-]?)?9\d{2}[\s-]?\d{3}[\s-]?\d{3}(?!\d)')
+HACE_RE = re.compile(r'hace\s+(\d+|un|una)\s+(minuto|hora|d[ií]a|semana|mes)', re.IGNORECASE)
+
+
+class DetailEnricher:
+    """Descarga y analiza páginas de detalle de ofertas con concurrencia limitada"""
+
+    def __init__(self, fetcher, concurrency: int = None, max_ofertas: int = None):
+        """
+        Args:
+            fetcher: Motor de descarga (AsyncFetcher)
+            concurrency: Páginas de detalle descargadas a la vez (por defecto Config.SCRAPING_ENRICH_CONCURRENCY)
+            max_ofertas: Ofertas enriquecidas como máximo por ejecución (por defecto Config.SCRAPING_ENRICH_MAX)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.fetcher = fetcher
+        self.concurrency = max(1, concurrency or Config.SCRAPING_ENRICH_CONCURRENCY)
+        self.max_ofertas = max_ofertas if max_ofertas is not None else Config.SCRAPING_ENRICH_MAX
+
+    def enrich(self, ofertas: List[Dict], max_ofertas: int = None) -> int:
+        """
+        Enriquece en el lugar las ofertas indicadas
+        Args:
+            ofertas: Ofertas nuevas o aún no enriquecidas
+            max_ofertas: Máximo para esta llamada (por defecto self.max_ofertas)
+        Returns:
+            Número de ofertas enriquecidas
+        """
+        pendientes = [o for o in ofertas if o.get('url_oferta', '').startswith('http')]
+        max_ofertas = self.max_ofertas if max_ofertas is None else max_ofertas
+        if len(pendientes) > max_ofertas:
+            self.logger.info(f"Se enriquecerán {max_ofertas} de {len(pendientes)} ofertas "
+                             f"(el resto en la próxima ejecución)")
+            pendientes = pendientes[:max_ofertas]
+
+        # Varias ofertas pueden compartir URL; cada página se descarga una sola vez
+        paginas: Dict[str, Optional[Dict]] = {}
+        urls = list(dict.fromkeys(o['url_oferta'] for o in pendientes))
+        for inicio in range(0, len(urls), self.concurrency):
+            ventana = urls[inicio:inicio + self.concurrency]
+            for url, result in zip(ventana, self.fetcher.fetch_many_sync(ventana)):
+                if result is None or result.status >= 400:
+                    paginas[url] = None
+                    continue
+                try:
+                    paginas[url] = self.parse_detail(result.content)
+                except Exception as e:
+                    self.logger.error(f"Error analizando el detalle de {url}: {e}")
+                    paginas[url] = None
+
+        enriquecidas = 0
+        for oferta in pendientes:
+            detalle = paginas.get(oferta['url_oferta'])
+            if detalle is None:
+                continue
+            oferta.update(detalle)
+            oferta['enriquecida'] = True
+            enriquecidas += 1
+
+        self.logger.info(f"Detalle: {enriquecidas}/{len(pendientes)} ofertas enriquecidas")
+        return enriquecidas
+
+    def parse_detail(self, content: bytes, hoy: datetime = None) -> Dict:
+        """
+        Extrae los campos de una página de detalle
+        Args:
+            content: HTML de la página
+            hoy: Fecha de referencia para fechas relativas ("hace 3 días")
+        Returns:
+            Diccionario solo con los campos encontrados
+        """
+        hoy = hoy or datetime.now()
+        soup = parse_html(content)
+        posting = self._job_posting(soup)
+        detalle = {}
+
+        # Descripción completa: JSON-LD JobPosting o el bloque de descripción
+        descripcion = ''
+        if posting.get('description'):
+            descripcion = BeautifulSoup(str(posting['description']), 'html.parser').get_text(' ', strip=True)
+        if not descripcion:
+            for selector in DESCRIPCION_SELECTORES:
+                elem = soup.select_one(selector)
+                if elem:
+                    descripcion = elem.get_text(' ', strip=True)
+                    if len(descripcion) > 50:
+                        break
+        if descripcion:
+            detalle['descripcion'] = descripcion[:5000]
+
+        # Fechas
+        publicacion = self._parse_fecha(posting.get('datePosted'))
+        if not publicacion:
+            time_elem = soup.select_one('time[datetime]')
+            meta = soup.select_one('meta[property="article:published_time"]')
+            publicacion = self._parse_fecha(time_elem.get('datetime') if time_elem else None) or \
+                self._parse_fecha(meta.get('content') if meta else None)
+        if publicacion:
+            detalle['fecha_publicacion'] = publicacion
+            detalle['fecha_estimacion'] = False
+        else:
+            relativa = self._fecha_relativa(soup.get_text(' ', strip=True), hoy)
+            if relativa:
+                detalle['fecha_publicacion'] = relativa
+                detalle['fecha_estimacion'] = True
+        cierre = self._parse_fecha(posting.get('validThrough'))
+        if cierre:
+            detalle['fecha_cierre'] = cierre
+
+        # Contacto y documentos a partir del texto de la oferta
+        texto = descripcion or soup.get_text(' ', strip=True)
+        contactos = list(dict.fromkeys(EMAIL_RE.findall(texto) + TELEFONO_RE.findall(texto)))
+        if contactos:
+            detalle['contacto'] = ', '.join(contactos[:3])
+        documentos = [nombre for patron, nombre in DOCUMENTOS if re.search(patron, texto, re.IGNORECASE)]
+        if documentos:
+            detalle['documentos_requeridos'] = ', '.join(documentos)
+
+        return detalle
+
+    @staticmethod
+    def _job_posting(soup: BeautifulSoup) -> Dict:
+        """Busca el objeto JobPosting de schema.org en los bloques JSON-LD"""
+        for script in soup.select('script[type="application/ld+json"]'):
+            try:
+                data = json.loads(script.string or '')
+            except (ValueError, TypeError):
+                continue
+            if isinstance(data, dict):
+                candidatos = data.get('@graph', [data])
+            else:
+                candidatos = data if isinstance(data, list) else []
+            for item in candidatos:
+                if isinstance(item, dict) and item.get('@type') == 'JobPosting':
+                    return item
+        return {}
+
+    @staticmethod
+    def _parse_fecha(valor) -> Optional[str]:
+        """Convierte una fecha ISO (o dd/mm/aaaa) a YYYY-MM-DD"""
+        if not valor:
+            return None
+        valor = str(valor).strip()
+        match = re.match(r'(\d{4})-(\d{2})-(\d{2})', valor)
+        if match:
+            return '-'.join(match.groups())
+        match = re.match(r'(\d{1,2})/(\d{1,2})/(\d{4})', valor)
+        if match:
+            dia, mes, anio = match.groups()
+            return f"{anio}-{int(mes):02d}-{int(dia):02d}"
+        return None
+
+    @staticmethod
+    def _fecha_relativa(texto: str, hoy: datetime) -> Optional[str]:
+        """Interpreta textos como "Hace 3 días" y retorna la fecha estimada"""
+        match = HACE_RE.search(texto)
+        if not match:
+            return None
+        cantidad = 1 if match.group(1).lower() in ('un', 'una') else int(match.group(1))
+        dias = {'minuto': 0, 'hora': 0, 'semana': 7, 'mes': 30}.get(match.group(2).lower(), 1) * cantidad
+        return (hoy - timedelta(days=dias)).strftime('%Y-%m-%d')
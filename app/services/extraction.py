@@ -0,0 +1,138 @@
+"""
+Extracción de atributos de una oferta a partir de su texto
+Las expresiones regulares se compilan una sola vez al importar el módulo y el texto
+de la oferta se normaliza (minúsculas) una sola vez; a partir de él se derivan nivel
+académico, experiencia, modalidad, jornada y conocimientos clave
+"""
+import re
+from typing import Dict
+
+from app.services.keyword_matcher import default_matcher
+
+TACNA_RE = re.compile(
+    r'\btacna\b|\btacneñ[oa]s?\b|provincia de tacna|departamento de tacna'
+    r'|región tacna|tacna,|, tacna|tacna\s*perú'
+)
+
+SALARIO_RANGO_RE = re.compile(r'(?:s/|soles?|pen)?(\d+\.?\d*)(?:[-–—])(?:s/|soles?|pen)?(\d+\.?\d*)', re.IGNORECASE)
+SALARIO_UNICO_RE = re.compile(r'(?:s/|soles?|pen)(\d+\.?\d*)', re.IGNORECASE)
+SALARIO_DESDE_RE = re.compile(r'desde\s*(?:s/|soles?|pen)?(\d+\.?\d*)', re.IGNORECASE)
+SALARIO_HASTA_RE = re.compile(r'hasta\s*(?:s/|soles?|pen)?(\d+\.?\d*)', re.IGNORECASE)
+
+# En orden de prioridad: gana el primer patrón que coincide
+EXPERIENCIA_RES = (
+    re.compile(r'(\d+)\s*(?:a[ñn]os?|years?)\s*(?:de\s*)?(?:experiencia|exp)'),
+    re.compile(r'experiencia\s*(?:de\s*)?(\d+)\s*(?:a[ñn]os?|years?)'),
+    re.compile(r'mínimo\s*(\d+)\s*(?:a[ñn]os?|years?)'),
+)
+
+NIVELES = (
+    ('Practicante', ('practicante', 'prácticas', 'pasantía', 'estudiante', 'pre-profesional')),
+    ('Profesional', ('universitario', 'título', 'licenciado', 'profesional', 'técnico superior',
+                     'egresado universitario')),
+    ('Bachiller', ('bachiller', 'bachillerato', 'secundaria completa', 'egresado')),
+)
+MODALIDADES = (
+    ('Remoto', ('remoto', 'remote', 'home office', 'teletrabajo')),
+    ('Híbrido', ('híbrido', 'hybrid', 'mixto')),
+    ('Presencial', ('presencial', 'oficina', 'on-site')),
+)
+JORNADAS = (
+    ('Tiempo completo', ('tiempo completo', 'full time', 'jornada completa')),
+    ('Medio tiempo', ('medio tiempo', 'part time', 'parcial')),
+    ('Por horas', ('por horas', 'freelance', 'temporal')),
+)
+
+
+def _clasificar(text_lower: str, reglas, por_defecto: str) -> str:
+    """Retorna la primera categoría con alguna palabra presente en el texto"""
+    for categoria, palabras in reglas:
+        if any(palabra in text_lower for palabra in palabras):
+            return categoria
+    return por_defecto
+
+
+def is_tacna_location(text: str) -> bool:
+    """Verifica si la ubicación menciona Tacna"""
+    if not text:
+        return False
+    return TACNA_RE.search(text.lower()) is not None
+
+
+def extract_salary(text: str) -> str:
+    """Extrae información de salario del texto"""
+    if not text:
+        return "No especificado"
+
+    text_clean = text.replace(' ', '').replace(',', '')
+
+    # Buscar rangos (1000-1500, S/1000-1500)
+    range_match = SALARIO_RANGO_RE.search(text_clean)
+    if range_match:
+        val1 = float(range_match.group(1))
+        val2 = float(range_match.group(2))
+        return f"S/ {min(val1, val2):,.2f} - S/ {max(val1, val2):,.2f}"
+
+    # Buscar valor único
+    single_match = SALARIO_UNICO_RE.search(text_clean)
+    if single_match:
+        return f"S/ {float(single_match.group(1)):,.2f}"
+
+    # Buscar "desde" o "hasta"
+    desde_match = SALARIO_DESDE_RE.search(text)
+    hasta_match = SALARIO_HASTA_RE.search(text)
+
+    if desde_match and hasta_match:
+        return f"S/ {float(desde_match.group(1)):,.2f} - S/ {float(hasta_match.group(1)):,.2f}"
+    elif desde_match:
+        return f"Desde S/ {float(desde_match.group(1)):,.2f}"
+    elif hasta_match:
+        return f"Hasta S/ {float(hasta_match.group(1)):,.2f}"
+
+    return "No especificado"
+
+
+def extract_experience(text_lower: str) -> int:
+    """Extrae años de experiencia requeridos (texto en minúsculas)"""
+    for pattern in EXPERIENCIA_RES:
+        match = pattern.search(text_lower)
+        if match:
+            return int(match.group(1))
+    return 0
+
+
+def normalize_academic_level(text_lower: str) -> str:
+    """Normaliza el nivel académico (texto en minúsculas)"""
+    return _clasificar(text_lower, NIVELES, "Bachiller")
+
+
+def extract_modalidad(text_lower: str) -> str:
+    """Extrae la modalidad de trabajo (texto en minúsculas)"""
+    return _clasificar(text_lower, MODALIDADES, "Presencial")
+
+
+def extract_jornada(text_lower: str) -> str:
+    """Extrae el tipo de jornada (texto en minúsculas)"""
+    return _clasificar(text_lower, JORNADAS, "Tiempo completo")
+
+
+def derive_features(descripcion: str, titulo: str) -> Dict:
+    """
+    Deriva los atributos de la oferta normalizando el texto una sola vez
+    Args:
+        descripcion: Descripción o fragmento de la oferta
+        titulo: Título de la oferta
+    Returns:
+        Diccionario con nivel_academico, experiencia_minima_anios, conocimientos_clave,
+        modalidad y jornada
+    """
+    # La jornada solo se busca en la descripción
+    descripcion_lower = descripcion.lower()
+    texto = f"{descripcion_lower} {titulo.lower()}"
+    return {
+        'nivel_academico': normalize_academic_level(texto),
+        'experiencia_minima_anios': extract_experience(texto),
+        'conocimientos_clave': default_matcher().extract(texto, lowered=True),
+        'modalidad': extract_modalidad(texto),
+        'jornada': extract_jornada(descripcion_lower),
+    }
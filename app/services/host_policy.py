@@ -0,0 +1,249 @@
+"""
+Política de cortesía por host para el scraping
+Limita las solicitudes simultáneas a un mismo host y regula su ritmo con un token
+bucket por host que se adapta a las respuestas (AIMD): cada respuesta correcta sube
+la tasa un paso fijo y cada 429/403 la reduce a la mitad y pausa el host durante el
+Retry-After indicado por el servidor. Las esperas de un host no bloquean a los demás
+y las tasas aprendidas se guardan en un archivo JSON para la próxima ejecución
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Respuestas que indican que el host nos está limitando
+STATUS_LIMITADO = (403, 429)
+
+# Pausa por defecto (segundos) cuando el servidor no envía Retry-After
+PAUSA_POR_DEFECTO = {403: (15, 25), 429: (30, 60)}
+
+
+def parse_retry_after(valor: Optional[str], ahora: float = None) -> Optional[float]:
+    """
+    Interpreta la cabecera Retry-After
+    Args:
+        valor: Segundos ("120") o fecha HTTP ("Wed, 21 Oct 2026 07:28:00 GMT")
+        ahora: Hora actual (epoch) para las fechas; por defecto time.time()
+    Returns:
+        Segundos a esperar (0 o más) o None si no hay un valor válido
+    """
+    if not valor:
+        return None
+    valor = valor.strip()
+    if valor.isdigit():
+        return float(valor)
+    try:
+        fecha = parsedate_to_datetime(valor)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if fecha is None:
+        return None
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return max(0.0, fecha.timestamp() - (ahora if ahora is not None else time.time()))
+
+
+class _HostState:
+    """Semáforo y token bucket de un host"""
+
+    def __init__(self, max_concurrent: int, rate: float, burst: int):
+        self.semaphore = threading.Semaphore(max_concurrent)
+        self.async_semaphore = asyncio.Semaphore(max_concurrent)
+        self.lock = threading.Lock()
+        self.rate = rate
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        # Hora (monotonic) hasta la que el host está en pausa por un 429/403
+        self.cooldown_until = 0.0
+
+
+class HostPolicy:
+    """Concurrencia máxima y tasa adaptativa de solicitudes por host"""
+
+    def __init__(self, max_per_host: int = 1, min_delay: float = 2.0, max_delay: float = 5.0,
+                 burst: int = 1, rate_step: float = 0.05, min_rate: float = 1 / 60,
+                 path: str = None):
+        """
+        Args:
+            max_per_host: Solicitudes simultáneas permitidas por host
+            min_delay: Segundos mínimos entre solicitudes al mismo host (la tasa nunca supera 1/min_delay)
+            max_delay: Segundos entre solicitudes a un host nuevo (tasa inicial 1/max_delay)
+            burst: Solicitudes que un host puede acumular sin esperar
+            rate_step: Solicitudes/segundo que sube la tasa con cada respuesta correcta
+            min_rate: Tasa mínima tras reducciones sucesivas (solicitudes/segundo)
+            path: Archivo JSON de las tasas aprendidas (None las mantiene solo en memoria)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_per_host = max(1, max_per_host)
+        self.min_delay = min_delay
+        self.max_delay = max(min_delay, max_delay)
+        self.max_rate = 1 / self.min_delay if self.min_delay > 0 else float('inf')
+        self.initial_rate = min(self.max_rate, 1 / self.max_delay) if self.max_delay > 0 else self.max_rate
+        self.burst = max(1, burst)
+        self.rate_step = rate_step
+        self.min_rate = min(min_rate, self.initial_rate)
+        self.path = path
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _HostState] = {}
+        # Tasas y pausas guardadas: {host: {'rate': float, 'cooldown_until': epoch}}
+        self._guardado: Dict[str, Dict] = {}
+        self._load()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """Retorna el host de una URL en minúsculas"""
+        return urlparse(url).netloc.lower()
+
+    # ========================================
+    # PERSISTENCIA
+    # ========================================
+    def _load(self):
+        """Carga las tasas aprendidas (un archivo dañado se ignora)"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._guardado = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"No se pudieron cargar las tasas por host: {e}")
+            self._guardado = {}
+
+    def save(self):
+        """Guarda la tasa y la pausa pendiente de cada host (escritura atómica)"""
+        if not self.path:
+            return
+        ahora, ahora_mono = time.time(), time.monotonic()
+        with self._lock:
+            datos = dict(self._guardado)
+            for host, state in self._hosts.items():
+                with state.lock:
+                    datos[host] = {
+                        'rate': round(state.rate, 6),
+                        'cooldown_until': round(ahora + max(0.0, state.cooldown_until - ahora_mono), 3),
+                        'updated_at': datetime.now().isoformat(timespec='seconds')
+                    }
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(datos, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            self.logger.warning(f"No se pudieron guardar las tasas por host: {e}")
+
+    def rates(self) -> Dict[str, Dict]:
+        """Tasa actual (solicitudes/segundo) y segundos de pausa restantes de cada host"""
+        ahora_mono = time.monotonic()
+        with self._lock:
+            estados = dict(self._hosts)
+        resultado = {}
+        for host, state in estados.items():
+            with state.lock:
+                resultado[host] = {'rate': state.rate, 'cooldown': max(0.0, state.cooldown_until - ahora_mono)}
+        return resultado
+
+    # ========================================
+    # TOKEN BUCKET
+    # ========================================
+    def _state(self, host: str) -> _HostState:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _HostState(self.max_per_host, self.initial_rate, self.burst)
+                guardado = self._guardado.get(host)
+                if guardado:
+                    # La tasa aprendida se conserva; la pausa solo si aún no vence
+                    state.rate = min(self.max_rate, max(self.min_rate, float(guardado.get('rate', state.rate))))
+                    restante = float(guardado.get('cooldown_until', 0)) - time.time()
+                    if restante > 0:
+                        state.cooldown_until = state.updated = time.monotonic() + restante
+                        state.tokens = 1.0
+            return state
+
+    def _reserve(self, state: _HostState) -> float:
+        """Toma un token del host y retorna los segundos a esperar para usarlo"""
+        with state.lock:
+            now = time.monotonic()
+            if now > state.updated:
+                state.tokens = min(self.burst, state.tokens + (now - state.updated) * state.rate)
+                state.updated = now
+            # Cada solicitud toma su token; un saldo negativo es la espera de las que siguen.
+            # Durante una pausa el bucket empieza a llenarse recién cuando termina
+            state.tokens -= 1
+            wait = -state.tokens / state.rate if state.tokens < 0 else 0.0
+            return max(0.0, state.updated - now) + wait
+
+    def cooldown(self, url: str) -> float:
+        """Segundos que faltan para que termine la pausa del host de la URL"""
+        state = self._state(self.host_of(url))
+        with state.lock:
+            return max(0.0, state.cooldown_until - time.monotonic())
+
+    def feedback(self, url: str, status: int, retry_after: str = None) -> float:
+        """
+        Ajusta la tasa del host según la respuesta (AIMD)
+        Args:
+            url: URL solicitada
+            status: Código HTTP de la respuesta
+            retry_after: Cabecera Retry-After de la respuesta (si la hay)
+        Returns:
+            Segundos de pausa del host (0 si la respuesta no lo limitó)
+        """
+        state = self._state(self.host_of(url))
+        with state.lock:
+            if status not in STATUS_LIMITADO:
+                if status < 400:
+                    # Aumento aditivo hasta la tasa máxima
+                    state.rate = min(self.max_rate, state.rate + self.rate_step)
+                return 0.0
+
+            # Disminución multiplicativa y pausa del host (Retry-After o la pausa por defecto)
+            state.rate = max(self.min_rate, state.rate / 2)
+            pausa = parse_retry_after(retry_after)
+            if pausa is None:
+                pausa = random.uniform(*PAUSA_POR_DEFECTO[status])
+            now = time.monotonic()
+            state.cooldown_until = max(state.cooldown_until, now + pausa)
+            # Al terminar la pausa el host tiene un solo token (sin ráfaga acumulada)
+            state.tokens = 1.0
+            state.updated = state.cooldown_until
+            restante = state.cooldown_until - now
+        self.logger.warning(f"{self.host_of(url)} respondió {status}: tasa reducida a "
+                            f"{state.rate * 60:.1f} solicitudes/min, pausa de {restante:.0f}s")
+        return restante
+
+    @contextmanager
+    def slot(self, url: str):
+        """
+        Reserva un turno para solicitar la URL respetando la política de su host
+        Args:
+            url: URL a solicitar
+        """
+        state = self._state(self.host_of(url))
+        with state.semaphore:
+            wait = self._reserve(state)
+            if wait > 0:
+                time.sleep(wait)
+            yield
+
+    @asynccontextmanager
+    async def aslot(self, url: str):
+        """
+        Versión asíncrona de slot: espera sin bloquear el event loop
+        (los semáforos asíncronos deben usarse siempre desde el mismo loop)
+        Args:
+            url: URL a solicitar
+        """
+        state = self._state(self.host_of(url))
+        async with state.async_semaphore:
+            wait = self._reserve(state)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield
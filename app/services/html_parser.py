@@ -0,0 +1,69 @@
+"""
+Backend de parseo HTML para el scraping
+Elige el tree builder de BeautifulSoup más rápido que esté instalado (lxml) y
+usa html.parser de la biblioteca estándar si no lo está. La extracción sigue
+trabajando sobre BeautifulSoup, de modo que los selectores CSS y los campos
+extraídos no dependen del backend
+"""
+import logging
+from typing import List, Optional
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from config.settings import Config
+
+# Backends en orden de preferencia (el primero instalado se usa en modo 'auto')
+BACKENDS = ('lxml', 'html.parser')
+
+logger = logging.getLogger(__name__)
+_resuelto: Optional[str] = None
+
+
+def available_backends() -> List[str]:
+    """Retorna los backends instalados en orden de preferencia"""
+    disponibles = []
+    for backend in BACKENDS:
+        try:
+            BeautifulSoup('<p></p>', backend)
+        except FeatureNotFound:
+            continue
+        disponibles.append(backend)
+    return disponibles
+
+
+def resolve_backend(preferido: str = None) -> str:
+    """
+    Determina el backend a usar
+    Args:
+        preferido: Backend pedido ('auto', 'lxml' o 'html.parser'; por defecto Config.HTML_PARSER)
+    Returns:
+        Nombre del backend instalado
+    """
+    preferido = (preferido or Config.HTML_PARSER or 'auto').lower()
+    disponibles = available_backends()
+    if preferido != 'auto':
+        if preferido in disponibles:
+            return preferido
+        logger.warning(f"Parser HTML '{preferido}' no disponible, se usa {disponibles[0]}")
+    return disponibles[0]
+
+
+def default_backend() -> str:
+    """Backend configurado (se resuelve una vez por proceso)"""
+    global _resuelto
+    if _resuelto is None:
+        _resuelto = resolve_backend()
+        logger.info(f"Parser HTML: {_resuelto}")
+    return _resuelto
+
+
+def parse_html(content, backend: str = None) -> BeautifulSoup:
+    """
+    Parsea un documento HTML
+    Args:
+        content: HTML en bytes o texto
+        backend: Backend a usar (por defecto el configurado)
+    Returns:
+        Documento BeautifulSoup
+    """
+    return BeautifulSoup(content, backend or default_backend())
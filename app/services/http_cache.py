@@ -0,0 +1,116 @@
+"""
+Caché HTTP persistente en disco para las páginas de listados
+Guarda por URL los validadores (ETag / Last-Modified) y el hash del contenido,
+para enviar solicitudes condicionales y omitir el parseo de páginas sin cambios.
+No guarda el cuerpo de las páginas (una página sin cambios no se vuelve a parsear).
+Usa SQLite (biblioteca estándar) y descarta las entradas menos usadas al
+superar el número de entradas configurado
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class HttpCache:
+    """Caché de validadores HTTP y hashes de contenido por URL"""
+
+    def __init__(self, path: str, max_entries: int = 2000):
+        """
+        Args:
+            path: Archivo SQLite de la caché
+            max_entries: Número máximo de URLs guardadas
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS http_cache_accessed ON http_cache (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        """Hash del cuerpo de una respuesta"""
+        return hashlib.sha256(content).hexdigest()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Obtiene la entrada de una URL y la marca como usada
+        Returns:
+            Diccionario con etag, last_modified y content_hash, o None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_hash FROM http_cache WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE http_cache SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        return {'etag': row[0], 'last_modified': row[1], 'content_hash': row[2]}
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """
+        Cabeceras de solicitud condicional para una entrada
+        Args:
+            entry: Entrada obtenida con get
+        """
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url: str, content_hash: str, etag: str = None, last_modified: str = None):
+        """
+        Guarda o reemplaza la entrada de una URL
+        Args:
+            url: URL descargada
+            content_hash: Hash del cuerpo (content_hash)
+            etag: Cabecera ETag
+            last_modified: Cabecera Last-Modified
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO http_cache
+                   (url, etag, last_modified, content_hash, stored_at, accessed_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (url, etag, last_modified, content_hash, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Descarta las entradas menos usadas hasta cumplir los límites (con el lock tomado)"""
+        count = self._conn.execute("SELECT COUNT(*) FROM http_cache").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM http_cache WHERE url IN "
+                "(SELECT url FROM http_cache ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        """Elimina todas las entradas"""
+        with self._lock:
+            self._conn.execute("DELETE FROM http_cache")
+            self._conn.commit()
+
+    def close(self):
+        """Cierra el archivo de la caché"""
+        with self._lock:
+            self._conn.close()
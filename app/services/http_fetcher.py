@@ -0,0 +1,272 @@
+"""
+Motor de descarga HTTP asíncrono para el scraping
+Usa aiohttp con pools de conexiones por host, keep-alive y caché de DNS. El event
+loop corre en un hilo propio, de modo que el código síncrono (ScrapingService)
+puede usarlo con fetch_sync/fetch_many_sync mientras un solo proceso mantiene
+muchas descargas en curso
+"""
+import asyncio
+import concurrent.futures
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional
+
+import aiohttp
+from multidict import CIMultiDict
+
+from app.services.host_policy import STATUS_LIMITADO, HostPolicy
+from config.settings import Config
+
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Firefox/120.0',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+]
+
+# Cabeceras fijas de la sesión (el User-Agent se rota por solicitud; aiohttp
+# agrega Accept-Encoding según los descompresores disponibles)
+DEFAULT_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
+    'DNT': '1',
+    'Upgrade-Insecure-Requests': '1',
+    'Referer': 'https://www.google.com/'
+}
+
+
+@dataclass
+class FetchResult:
+    """Respuesta HTTP descargada (sin parsear)"""
+    url: str
+    status: int
+    content: bytes
+    # Sin distinguir mayúsculas (los servidores pueden enviar 'content-type' o 'etag')
+    headers: Mapping[str, str] = field(default_factory=CIMultiDict)
+    elapsed: float = 0.0
+    # True si el servidor respondió 304 o el contenido no cambió desde la última descarga
+    not_modified: bool = False
+
+
+class AsyncFetcher:
+    """Descargas HTTP concurrentes sobre una sesión aiohttp compartida"""
+
+    def __init__(self, timeout: float = None, retries: int = None, host_policy: HostPolicy = None,
+                 max_connections: int = None, max_connections_per_host: int = None,
+                 dns_cache_ttl: int = None, max_cooldown: float = None):
+        """
+        Args:
+            timeout: Segundos máximos por solicitud (por defecto Config.REQUEST_TIMEOUT)
+            retries: Intentos por URL (por defecto Config.MAX_RETRIES)
+            host_policy: Cortesía por host (por defecto la configurada en Config)
+            max_connections: Conexiones totales del pool (por defecto Config.HTTP_MAX_CONNECTIONS)
+            max_connections_per_host: Conexiones por host (por defecto Config.HTTP_MAX_CONNECTIONS_PER_HOST)
+            dns_cache_ttl: Segundos de caché de DNS (por defecto Config.HTTP_DNS_CACHE_TTL)
+            max_cooldown: Pausa máxima de un host que se espera; con una mayor la URL se omite
+                          (por defecto Config.SCRAPING_HOST_MAX_COOLDOWN)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.timeout = timeout or Config.REQUEST_TIMEOUT
+        self.retries = max(1, retries or Config.MAX_RETRIES)
+        self.host_policy = host_policy or HostPolicy(
+            Config.SCRAPING_HOST_CONCURRENCY,
+            Config.SCRAPING_HOST_DELAY_MIN,
+            Config.SCRAPING_HOST_DELAY_MAX,
+            burst=Config.SCRAPING_HOST_BURST,
+            rate_step=Config.SCRAPING_HOST_RATE_STEP,
+            path=Config.SCRAPING_HOST_RATES_PATH or None
+        )
+        self.max_cooldown = max_cooldown if max_cooldown is not None else Config.SCRAPING_HOST_MAX_COOLDOWN
+        self.max_connections = max_connections or Config.HTTP_MAX_CONNECTIONS
+        self.max_connections_per_host = max_connections_per_host or Config.HTTP_MAX_CONNECTIONS_PER_HOST
+        self.dns_cache_ttl = dns_cache_ttl if dns_cache_ttl is not None else Config.HTTP_DNS_CACHE_TTL
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = threading.Lock()
+
+    # ========================================
+    # EVENT LOOP EN SEGUNDO PLANO
+    # ========================================
+    def start(self):
+        """Inicia el event loop en un hilo propio (idempotente)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run_loop, name='http-fetcher', daemon=True)
+            self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def close(self):
+        """Cierra la sesión HTTP y detiene el event loop"""
+        with self._lock:
+            if self._loop is None:
+                return
+            if self._session is not None:
+                asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result(timeout=5)
+                self._session = None
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+    def _run(self, coro, timeout: float = None):
+        """
+        Ejecuta una corrutina en el loop del fetcher y espera su resultado
+        Args:
+            coro: Corrutina a ejecutar
+            timeout: Segundos máximos de espera; al vencer se cancela la corrutina
+                     (y sus descargas en curso) y se lanza TimeoutError
+        """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Descarga cancelada tras {timeout:.1f}s")
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Crea la sesión en el loop del fetcher (una por proceso, con pool por host)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=self.dns_cache_ttl > 0,
+                keepalive_timeout=30
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=DEFAULT_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    # ========================================
+    # DESCARGAS
+    # ========================================
+    async def fetch(self, url: str, headers: Dict[str, str] = None) -> Optional[FetchResult]:
+        """
+        Descarga una URL con reintentos
+        Args:
+            url: URL a descargar
+            headers: Cabeceras adicionales
+        Returns:
+            FetchResult o None si falla después de todos los intentos
+        """
+        session = await self._get_session()
+        for attempt in range(self.retries):
+            # Un host en pausa larga (p. ej. Retry-After de una ejecución anterior) no se espera
+            pausa = self.host_policy.cooldown(url)
+            if pausa > self.max_cooldown:
+                self.logger.warning(f"{HostPolicy.host_of(url)} en pausa {pausa:.0f}s más; se omite {url}")
+                return None
+            try:
+                request_headers = {'User-Agent': random.choice(USER_AGENTS)}
+                request_headers.update(headers or {})
+
+                # Turno del host: limita solicitudes simultáneas y espacia su inicio
+                async with self.host_policy.aslot(url):
+                    self.logger.info(f"Realizando request a: {url} (Intento {attempt + 1}/{self.retries})")
+                    start = time.monotonic()
+                    async with session.get(url, headers=request_headers, allow_redirects=True) as response:
+                        content = await response.read()
+                        result = FetchResult(
+                            url=str(response.url),
+                            status=response.status,
+                            content=content,
+                            headers=CIMultiDict(response.headers),
+                            elapsed=time.monotonic() - start
+                        )
+
+                # La tasa del host se ajusta con cada respuesta; un 403/429 lo pone en pausa
+                # y el siguiente intento espera su turno en aslot sin frenar a los demás hosts
+                self.host_policy.feedback(url, result.status, result.headers.get('Retry-After'))
+                if result.status in STATUS_LIMITADO:
+                    self.logger.error(f"Error HTTP {result.status}: {url}")
+                    continue
+                elif result.status >= 400:
+                    self.logger.error(f"Error HTTP {result.status}: {url}")
+                elif result.status == 304:
+                    self.logger.info(f"✓ {url} sin cambios (304)")
+                    result.not_modified = True
+                    return result
+                else:
+                    self.logger.info(f"✓ Request exitoso a {url} ({len(content)} bytes, {result.elapsed:.2f}s)")
+                    return result
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.logger.error(f"Error de conexión: {e!r}")
+
+            # Espera entre reintentos
+            if attempt < self.retries - 1:
+                wait_time = random.uniform(5 * (attempt + 1), 10 * (attempt + 1))
+                self.logger.info(f"Esperando {wait_time:.1f}s antes del siguiente intento...")
+                await asyncio.sleep(wait_time)
+
+        self.logger.error(f"✗ Falló la descarga de {url} después de {self.retries} intentos")
+        return None
+
+    async def fetch_many(self, urls: List[str],
+                         headers: List[Dict[str, str]] = None) -> List[Optional[FetchResult]]:
+        """
+        Descarga varias URLs a la vez (la cortesía por host regula cada host)
+        Args:
+            urls: URLs a descargar
+            headers: Cabeceras adicionales de cada URL (opcional, mismo orden)
+        Returns:
+            Resultados en el mismo orden que las URLs
+        """
+        headers = headers or [None] * len(urls)
+        return list(await asyncio.gather(*(self.fetch(url, h) for url, h in zip(urls, headers))))
+
+    def fetch_sync(self, url: str, headers: Dict[str, str] = None) -> Optional[FetchResult]:
+        """Versión síncrona de fetch (segura desde cualquier hilo)"""
+        return self._run(self.fetch(url, headers))
+
+    def fetch_many_sync(self, urls: List[str], headers: List[Dict[str, str]] = None,
+                        timeout: float = None) -> List[Optional[FetchResult]]:
+        """
+        Versión síncrona de fetch_many (segura desde cualquier hilo)
+        Args:
+            timeout: Segundos máximos para todo el grupo; al vencer se cancelan las
+                     descargas pendientes y su resultado es None
+        """
+        if timeout is None:
+            return self._run(self.fetch_many(urls, headers))
+        try:
+            return self._run(self.fetch_many(urls, headers), max(0.0, timeout))
+        except TimeoutError as e:
+            self.logger.warning(f"{e}: {len(urls)} URLs sin descargar")
+            return [None] * len(urls)
+
+
+_shared_fetcher: Optional[AsyncFetcher] = None
+_shared_pid: Optional[int] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_fetcher() -> AsyncFetcher:
+    """
+    Retorna el AsyncFetcher del proceso actual (el pool de conexiones se reutiliza
+    entre ejecuciones de scraping; tras un fork se crea uno nuevo)
+    """
+    global _shared_fetcher, _shared_pid
+    pid = os.getpid()
+    if _shared_fetcher is None or _shared_pid != pid:
+        with _shared_lock:
+            if _shared_fetcher is None or _shared_pid != pid:
+                _shared_fetcher = AsyncFetcher()
+                _shared_pid = pid
+    return _shared_fetcher
@@ -0,0 +1,124 @@
+"""
+Detección de conocimientos clave en una sola pasada
+El vocabulario se compila una vez en una expresión regular con forma de trie
+(las alternativas de cada nodo solo comparten prefijo), de modo que agregar cientos
+de términos no multiplica las búsquedas por oferta. Da los mismos resultados que
+buscar cada término por separado con \\b...\\b, incluidos los términos solapados
+("sql" dentro de "sql server", "office" dentro de "microsoft office")
+"""
+import logging
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from config.settings import Config
+
+_WORD = re.compile(r'\w')
+
+
+def _trie_pattern(nodo: Dict) -> str:
+    """Convierte un nodo del trie en regex (la rama más larga se prueba primero)"""
+    fin = '' in nodo
+    ramas = [re.escape(c) + _trie_pattern(hijo) for c, hijo in sorted(nodo.items()) if c != '']
+    if not ramas:
+        return ''
+    cuerpo = ramas[0] if len(ramas) == 1 else '(?:' + '|'.join(ramas) + ')'
+    if fin:
+        # Opcional codicioso: intenta el término más largo y retrocede al prefijo
+        cuerpo = '(?:' + cuerpo + ')?'
+    return cuerpo
+
+
+class KeywordMatcher:
+    """Vocabulario compilado en una sola expresión regular"""
+
+    def __init__(self, vocabulario: Iterable[str]):
+        """
+        Args:
+            vocabulario: Términos a detectar (se comparan en minúsculas)
+        """
+        self.vocabulario: List[str] = list(dict.fromkeys(
+            t.strip().lower() for t in vocabulario if t and t.strip()
+        ))
+        self._orden = {termino: i for i, termino in enumerate(self.vocabulario)}
+
+        trie: Dict = {}
+        for termino in self.vocabulario:
+            nodo = trie
+            for c in termino:
+                nodo = nodo.setdefault(c, {})
+            nodo[''] = True
+        # Lookahead de ancho cero: se evalúa en cada posición, así que también se
+        # encuentran los términos que empiezan dentro de otro
+        self._regex = re.compile(r'(?=\b(' + _trie_pattern(trie) + r')\b)') if self.vocabulario else None
+
+        # Términos que también coinciden cuando coincide uno más largo en la misma
+        # posición: sus prefijos del vocabulario que terminan en límite de palabra
+        self._prefijos: Dict[str, List[str]] = {}
+        for termino in self.vocabulario:
+            self._prefijos[termino] = [
+                otro for otro in self.vocabulario
+                if len(otro) < len(termino) and termino.startswith(otro)
+                and bool(_WORD.match(termino[len(otro) - 1])) != bool(_WORD.match(termino[len(otro)]))
+            ]
+
+    def find_all(self, text: str, lowered: bool = False) -> Set[str]:
+        """
+        Retorna todos los términos del vocabulario presentes en el texto
+        Args:
+            text: Texto a revisar
+            lowered: El texto ya está en minúsculas
+        """
+        if not text or self._regex is None:
+            return set()
+        encontrados = set()
+        for match in self._regex.finditer(text if lowered else text.lower()):
+            termino = match.group(1)
+            encontrados.add(termino)
+            encontrados.update(self._prefijos[termino])
+        return encontrados
+
+    def extract(self, text: str, max_keywords: int = 10, lowered: bool = False) -> str:
+        """
+        Extrae los conocimientos clave de un texto
+        Args:
+            text: Texto de la oferta
+            max_keywords: Máximo de términos (se conservan los primeros del vocabulario)
+            lowered: El texto ya está en minúsculas
+        Returns:
+            Términos separados por coma en orden alfabético
+        """
+        encontrados = sorted(self.find_all(text, lowered), key=self._orden.__getitem__)[:max_keywords]
+        return ', '.join(sorted(encontrados))
+
+
+def load_vocabulary(path: str = None) -> List[str]:
+    """
+    Vocabulario configurado: Config.SKILL_KEYWORDS más los términos del archivo
+    Config.SKILL_KEYWORDS_FILE (uno por línea)
+    """
+    vocabulario = list(Config.SKILL_KEYWORDS)
+    path = path if path is not None else Config.SKILL_KEYWORDS_FILE
+    if path:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                vocabulario.extend(
+                    linea.strip() for linea in f if linea.strip() and not linea.lstrip().startswith('#')
+                )
+        except OSError as e:
+            logging.getLogger(__name__).warning(f"No se pudo leer el vocabulario {path}: {e}")
+    return vocabulario
+
+
+_default: Optional[KeywordMatcher] = None
+_default_lock = threading.Lock()
+
+
+def default_matcher() -> KeywordMatcher:
+    """KeywordMatcher del vocabulario configurado (se compila una vez por proceso)"""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = KeywordMatcher(load_vocabulary())
+    return _default
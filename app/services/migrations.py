@@ -0,0 +1,266 @@
+"""
+Migraciones versionadas del esquema de MongoDB
+Los índices se definen aquí y se aplican con `python manage.py db migrate`,
+de modo que la aplicación web arranca sin ejecutar comandos DDL
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from app.services.stats_counters import StatsCounters
+from app.utils.helpers import build_search_fields
+
+# Tamaño de lote para las migraciones de datos
+LOTE_MIGRACION = 1000
+
+
+@dataclass
+class IndexSpec:
+    """Definición de un índice de una colección"""
+    collection: str
+    keys: List[Tuple[str, object]]
+    name: str
+    options: Dict = field(default_factory=dict)
+
+
+@dataclass
+class Migration:
+    """Paso de migración identificado por un número de versión"""
+    version: int
+    descripcion: str
+    create_indexes: List[IndexSpec] = field(default_factory=list)
+    drop_indexes: List[Tuple[str, str]] = field(default_factory=list)
+    run: Optional[Callable] = None
+
+
+def _bulk_update(collection, documentos, construir_update):
+    """Aplica construir_update(doc) a cada documento en lotes de bulk_write"""
+    operaciones = []
+    for doc in documentos:
+        operaciones.append(UpdateOne({'_id': doc['_id']}, construir_update(doc)))
+        if len(operaciones) >= LOTE_MIGRACION:
+            collection.bulk_write(operaciones, ordered=False)
+            operaciones = []
+    if operaciones:
+        collection.bulk_write(operaciones, ordered=False)
+
+
+def _backfill_campos_busqueda(db):
+    """Calcula los campos normalizados (sin tildes) de las ofertas existentes"""
+    campos = {'titulo_oferta': 1, 'puesto': 1, 'empresa': 1,
+              'conocimientos_clave': 1, 'responsabilidades_breve': 1}
+    _bulk_update(
+        db['ofertas'],
+        db['ofertas'].find({}, campos),
+        lambda doc: {'$set': build_search_fields(doc)}
+    )
+
+
+def _crear_estadisticas(db):
+    """Crea el documento de estadísticas materializadas a partir de las ofertas existentes"""
+    StatsCounters(db['stats']).rebuild(db['ofertas'])
+
+
+# ========================================
+# REGISTRO DE MIGRACIONES (orden ascendente de versión)
+# ========================================
+MIGRATIONS: List[Migration] = [
+    Migration(
+        version=1,
+        descripcion='Índices iniciales de ofertas y usuarios',
+        create_indexes=[
+            IndexSpec('ofertas', [('id', ASCENDING)], 'id_1', {'unique': True}),
+            IndexSpec('ofertas', [('empresa', ASCENDING)], 'empresa_1'),
+            IndexSpec('ofertas', [('nivel_academico', ASCENDING)], 'nivel_academico_1'),
+            IndexSpec('ofertas', [('modalidad', ASCENDING)], 'modalidad_1'),
+            IndexSpec('ofertas', [('fuente', ASCENDING)], 'fuente_1'),
+            IndexSpec('ofertas', [('fecha_publicacion', DESCENDING)], 'fecha_publicacion_-1'),
+            IndexSpec('ofertas', [('created_at', DESCENDING)], 'created_at_-1'),
+            IndexSpec('ofertas', [
+                ('titulo_oferta', 'text'),
+                ('puesto', 'text'),
+                ('conocimientos_clave', 'text'),
+                ('responsabilidades_breve', 'text')
+            ], 'titulo_oferta_text_puesto_text_conocimientos_clave_text_responsabilidades_breve_text'),
+            IndexSpec('usuarios', [('username', ASCENDING)], 'username_1', {'unique': True}),
+        ]
+    ),
+    Migration(
+        version=2,
+        descripcion='Índices compuestos para paginación por cursor (created_at, _id)',
+        drop_indexes=[
+            ('ofertas', 'created_at_-1'),
+            ('ofertas', 'nivel_academico_1'),
+            ('ofertas', 'modalidad_1'),
+        ],
+        create_indexes=[
+            IndexSpec('ofertas', [('created_at', DESCENDING), ('_id', DESCENDING)],
+                      'created_at_-1__id_-1'),
+            IndexSpec('ofertas', [('nivel_academico', ASCENDING), ('created_at', DESCENDING),
+                                  ('_id', DESCENDING)], 'nivel_academico_1_created_at_-1__id_-1'),
+            IndexSpec('ofertas', [('modalidad', ASCENDING), ('created_at', DESCENDING),
+                                  ('_id', DESCENDING)], 'modalidad_1_created_at_-1__id_-1'),
+        ]
+    ),
+    Migration(
+        version=3,
+        descripcion='Índice de texto en español sobre campos normalizados sin tildes',
+        drop_indexes=[
+            ('ofertas', 'titulo_oferta_text_puesto_text_conocimientos_clave_text_responsabilidades_breve_text'),
+        ],
+        run=_backfill_campos_busqueda,
+        create_indexes=[
+            IndexSpec('ofertas', [('busqueda_principal', 'text'), ('busqueda_detalle', 'text')],
+                      'busqueda_texto_es', {
+                          'default_language': 'spanish',
+                          'language_override': 'idioma_busqueda',
+                          'weights': {'busqueda_principal': 5, 'busqueda_detalle': 1}
+                      }),
+        ]
+    ),
+    Migration(
+        version=4,
+        descripcion='Estadísticas materializadas en la colección stats',
+        run=_crear_estadisticas
+    ),
+    Migration(
+        version=5,
+        descripcion='Índice cubierto de IDs conocidos por portal para el scraping',
+        create_indexes=[
+            IndexSpec('ofertas', [('fuente', ASCENDING), ('id', ASCENDING), ('hash_contenedor', ASCENDING)],
+                      'fuente_1_id_1_hash_contenedor_1'),
+        ]
+    ),
+    Migration(
+        version=6,
+        descripcion='Un solo trabajo de extracción activo a la vez (POST /extraer)',
+        create_indexes=[
+            IndexSpec('scraping_jobs', [('activo', ASCENDING)], 'activo_1_unico',
+                      {'unique': True, 'partialFilterExpression': {'activo': True}}),
+        ]
+    ),
+]
+
+
+class MigrationRunner:
+    """Aplica las migraciones pendientes y registra la versión en schema_migrations"""
+
+    COLLECTION = 'schema_migrations'
+
+    def __init__(self, db, migrations: List[Migration] = None):
+        """
+        Args:
+            db: Base de datos de pymongo
+            migrations: Registro de migraciones (por defecto MIGRATIONS)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db = db
+        self.migrations = sorted(migrations if migrations is not None else MIGRATIONS,
+                                 key=lambda m: m.version)
+        self.migrations_collection = db[self.COLLECTION]
+
+    def applied_versions(self) -> List[int]:
+        """Retorna las versiones ya aplicadas"""
+        return sorted(doc['_id'] for doc in self.migrations_collection.find({}, {'_id': 1}))
+
+    def current_version(self) -> int:
+        """Retorna la versión más alta aplicada (0 si no hay ninguna)"""
+        applied = self.applied_versions()
+        return applied[-1] if applied else 0
+
+    def pending(self, target: int = None) -> List[Migration]:
+        """
+        Retorna las migraciones que faltan aplicar
+        Args:
+            target: Versión máxima a considerar (por defecto la última)
+        """
+        applied = set(self.applied_versions())
+        return [
+            m for m in self.migrations
+            if m.version not in applied and (target is None or m.version <= target)
+        ]
+
+    def migrate(self, target: int = None) -> List[int]:
+        """
+        Aplica en orden las migraciones pendientes
+        Args:
+            target: Versión máxima a aplicar (por defecto la última)
+        Returns:
+            Lista de versiones aplicadas
+        """
+        applied = []
+        for migration in self.pending(target):
+            start = time.time()
+            self.logger.info(f"Aplicando migración {migration.version}: {migration.descripcion}")
+
+            for collection, name in migration.drop_indexes:
+                self._drop_index(collection, name)
+
+            # Los datos se migran antes de crear los índices que dependen de ellos
+            if migration.run:
+                migration.run(self.db)
+
+            for spec in migration.create_indexes:
+                self.db[spec.collection].create_index(spec.keys, name=spec.name, **spec.options)
+
+            self.migrations_collection.insert_one({
+                '_id': migration.version,
+                'descripcion': migration.descripcion,
+                'applied_at': datetime.now(),
+                'duracion_ms': int((time.time() - start) * 1000)
+            })
+            applied.append(migration.version)
+
+        return applied
+
+    def declared_indexes(self) -> Dict[str, set]:
+        """
+        Calcula los índices que deben existir según el registro completo
+        Returns:
+            Diccionario colección -> nombres de índices
+        """
+        declared: Dict[str, set] = {}
+        for migration in self.migrations:
+            for collection, name in migration.drop_indexes:
+                declared.get(collection, set()).discard(name)
+            for spec in migration.create_indexes:
+                declared.setdefault(spec.collection, set()).add(spec.name)
+        return declared
+
+    def stale_indexes(self) -> List[Tuple[str, str]]:
+        """
+        Retorna los índices existentes que no están declarados en el registro
+        Returns:
+            Lista de tuplas (colección, nombre del índice)
+        """
+        stale = []
+        existing_collections = set(self.db.list_collection_names())
+        for collection, names in self.declared_indexes().items():
+            if collection not in existing_collections:
+                continue
+            for index in self.db[collection].list_indexes():
+                if index['name'] != '_id_' and index['name'] not in names:
+                    stale.append((collection, index['name']))
+        return stale
+
+    def drop_stale_indexes(self, dry_run: bool = False) -> List[Tuple[str, str]]:
+        """
+        Elimina los índices que ya no están declarados
+        Args:
+            dry_run: Si es True solo lista los índices sin eliminarlos
+        Returns:
+            Lista de tuplas (colección, nombre del índice)
+        """
+        stale = self.stale_indexes()
+        if not dry_run:
+            for collection, name in stale:
+                self._drop_index(collection, name)
+        return stale
+
+    def _drop_index(self, collection: str, name: str):
+        """Elimina un índice si existe"""
+        if name in self.db[collection].index_information():
+            self.logger.info(f"Eliminando índice {collection}.{name}")
+            self.db[collection].drop_index(name)
@@ -2,8 +2,10 @@
 Datos de simulación para el sistema cuando MongoDB no está disponible
 o para pruebas y desarrollo
 """
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import List, Dict
+from app.utils.helpers import normalize_text
 
 class MockData:
     """Clase que proporciona datos de simulación para el sistema"""
@@ -836,6 +838,21 @@ class MockData:
             }
         }
     
+    @staticmethod
+    def compute_estadisticas(ofertas: List[Dict], top_empresas: int = 10) -> Dict:
+        """Calcula estadísticas en el formato del dashboard a partir de una lista de ofertas"""
+        def contar(campo):
+            return dict(Counter(o.get(campo) for o in ofertas))
+        
+        empresas = Counter(o.get('empresa') for o in ofertas).most_common(top_empresas)
+        return {
+            'total_ofertas': len(ofertas),
+            'por_nivel': contar('nivel_academico'),
+            'por_modalidad': contar('modalidad'),
+            'por_fuente': contar('fuente'),
+            'top_empresas': dict(empresas)
+        }
+    
     @staticmethod
     def get_mock_usuario() -> Dict:
         """Retorna un usuario mock para modo offline"""
@@ -858,8 +875,8 @@ class MockData:
         
         # Filtro por empresa
         if filtros.get('empresa'):
-            empresa_filter = filtros['empresa'].lower()
-            filtered = [o for o in filtered if empresa_filter in o.get('empresa', '').lower()]
+            empresa_filter = normalize_text(filtros['empresa'])
+            filtered = [o for o in filtered if empresa_filter in normalize_text(o.get('empresa', ''))]
         
         # Filtro por nivel académico
         if filtros.get('nivel_academico'):
@@ -869,14 +886,14 @@ class MockData:
         if filtros.get('modalidad'):
             filtered = [o for o in filtered if o.get('modalidad') == filtros['modalidad']]
         
-        # Búsqueda de texto
+        # Búsqueda de texto (sin distinguir tildes, igual que el índice de texto)
         if filtros.get('busqueda'):
-            busqueda = filtros['busqueda'].lower()
+            busqueda = normalize_text(filtros['busqueda'])
             filtered = [o for o in filtered if (
-                busqueda in o.get('titulo_oferta', '').lower() or
-                busqueda in o.get('empresa', '').lower() or
-                busqueda in o.get('puesto', '').lower() or
-                busqueda in o.get('conocimientos_clave', '').lower()
+                busqueda in normalize_text(o.get('titulo_oferta', '')) or
+                busqueda in normalize_text(o.get('empresa', '')) or
+                busqueda in normalize_text(o.get('puesto', '')) or
+                busqueda in normalize_text(o.get('conocimientos_clave', ''))
             )]
         
         return filtered
@@ -0,0 +1,112 @@
+"""
+Circuit breaker por portal de scraping
+Un portal caído o que nos bloquea cuesta varios intentos con esperas en cada
+ejecución. Tras SCRAPING_BREAKER_THRESHOLD ejecuciones seguidas con fallo el portal
+se omite durante SCRAPING_BREAKER_COOLDOWN segundos; pasado ese tiempo la siguiente
+ejecución lo vuelve a probar (half-open) y un éxito lo cierra. El estado se guarda en
+la colección portal_breakers para que lo compartan las ejecuciones y los procesos
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from config.settings import Config
+
+
+class PortalBreaker:
+    """Estados closed / open / half-open de cada portal, guardados en MongoDB"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, db_manager, failure_threshold: int = None, cooldown: float = None):
+        """
+        Args:
+            db_manager: MongoDBManager donde se guarda el estado
+            failure_threshold: Ejecuciones seguidas con fallo que abren el circuito
+                               (por defecto Config.SCRAPING_BREAKER_THRESHOLD)
+            cooldown: Segundos que el portal se omite con el circuito abierto
+                      (por defecto Config.SCRAPING_BREAKER_COOLDOWN)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_manager = db_manager
+        self.failure_threshold = max(1, failure_threshold or Config.SCRAPING_BREAKER_THRESHOLD)
+        self.cooldown = cooldown if cooldown is not None else Config.SCRAPING_BREAKER_COOLDOWN
+        self._lock = threading.Lock()
+        self._estados: Dict[str, Dict] = {}
+
+    def load(self):
+        """Lee el estado guardado de todos los portales (al inicio de cada ejecución)"""
+        try:
+            estados = self.db_manager.get_portal_breakers()
+        except Exception as e:
+            self.logger.warning(f"No se pudo leer el estado de los portales: {e}")
+            estados = {}
+        with self._lock:
+            self._estados = estados
+
+    def state(self, portal: str, ahora: datetime = None) -> str:
+        """Estado del circuito de un portal"""
+        with self._lock:
+            estado = self._estados.get(portal)
+        if not estado or estado.get('fallos_consecutivos', 0) < self.failure_threshold:
+            return self.CLOSED
+        abierto_hasta = estado.get('abierto_hasta')
+        if isinstance(abierto_hasta, datetime) and (ahora or datetime.now()) < abierto_hasta:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self, portal: str) -> Tuple[bool, Optional[str]]:
+        """
+        Indica si el portal se puede extraer en esta ejecución
+        Returns:
+            Tupla (permitido, motivo si se omite)
+        """
+        if self.state(portal) != self.OPEN:
+            return True, None
+        with self._lock:
+            estado = self._estados[portal]
+        return False, (f"circuito abierto hasta {estado['abierto_hasta']:%Y-%m-%d %H:%M} tras "
+                       f"{estado['fallos_consecutivos']} fallos ({estado.get('ultimo_error')})")
+
+    def record_success(self, portal: str):
+        """Cierra el circuito del portal"""
+        if self.state(portal) != self.CLOSED:
+            self.logger.info(f"Portal {portal} recuperado, circuito cerrado")
+        with self._lock:
+            if not (self._estados.get(portal) or {}).get('fallos_consecutivos'):
+                # Sin fallos previos no hay nada que actualizar
+                return
+            self._estados[portal] = {'estado': self.CLOSED, 'fallos_consecutivos': 0,
+                                     'abierto_hasta': None, 'ultimo_error': None}
+            estado = dict(self._estados[portal])
+        self._save(portal, estado)
+
+    def record_failure(self, portal: str, error: str):
+        """
+        Suma un fallo del portal y abre el circuito al llegar al umbral
+        (un fallo en half-open lo vuelve a abrir)
+        """
+        ahora = datetime.now()
+        with self._lock:
+            fallos = (self._estados.get(portal) or {}).get('fallos_consecutivos', 0) + 1
+            abierto = fallos >= self.failure_threshold
+            self._estados[portal] = {
+                'estado': self.OPEN if abierto else self.CLOSED,
+                'fallos_consecutivos': fallos,
+                'abierto_hasta': ahora + timedelta(seconds=self.cooldown) if abierto else None,
+                'ultimo_error': str(error)[:200]
+            }
+            estado = dict(self._estados[portal])
+        if abierto:
+            self.logger.warning(f"Portal {portal}: {fallos} fallos seguidos, se omitirá hasta "
+                                f"{estado['abierto_hasta']:%Y-%m-%d %H:%M}")
+        self._save(portal, estado)
+
+    def _save(self, portal: str, estado: Dict):
+        try:
+            self.db_manager.save_portal_breaker(portal, estado)
+        except Exception as e:
+            self.logger.warning(f"No se pudo guardar el estado del portal {portal}: {e}")
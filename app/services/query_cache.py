@@ -0,0 +1,137 @@
+"""
+Caché en memoria (LRU + TTL) para resultados de consultas de ofertas
+Las entradas se invalidan por tiempo y por un número de generación de datos que
+se incrementa cada vez que se guardan o eliminan ofertas
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+from app.utils.helpers import normalize_text
+
+
+class QueryCache:
+    """Caché LRU con expiración por tiempo y contadores de aciertos/fallos"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 30.0):
+        """
+        Args:
+            max_entries: Número máximo de entradas (se descartan las menos usadas)
+            ttl: Segundos de validez de cada entrada (0 desactiva la caché)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._external_generation = None
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Indica si la caché está activa"""
+        return self.ttl > 0 and self.max_entries > 0
+
+    @staticmethod
+    def make_key(operacion: str, filtros: Dict = None, **params) -> Tuple:
+        """
+        Construye la clave de una consulta con los filtros normalizados
+        Args:
+            operacion: Nombre de la consulta (ofertas, pagina, conteo)
+            filtros: Filtros de la consulta
+            params: Parámetros adicionales (limit, offset, cursor)
+        Returns:
+            Tupla usable como clave
+        """
+        normalizados = []
+        for campo, valor in (filtros or {}).items():
+            if not valor:
+                continue
+            if campo == 'busqueda':
+                # La búsqueda de texto ignora tildes y mayúsculas
+                valor = normalize_text(valor)
+            elif campo == 'empresa':
+                # La empresa se filtra con una regex que ignora mayúsculas pero no tildes
+                valor = str(valor).strip().lower()
+            else:
+                valor = str(valor).strip()
+            if valor:
+                normalizados.append((campo, valor))
+        return (operacion, tuple(sorted(normalizados)), tuple(sorted(params.items())))
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Busca una entrada vigente
+        Args:
+            key: Clave generada con make_key
+        Returns:
+            Tupla (encontrado, copia del valor)
+        """
+        if not self.enabled:
+            return False, None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != self._generation or entry[1] <= time.monotonic():
+                self._entries.pop(key, None)
+                self._misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            value = entry[2]
+        # Copia para que el llamador no modifique el valor guardado
+        return True, copy.deepcopy(value)
+
+    def set(self, key: Hashable, value: Any):
+        """
+        Guarda una entrada
+        Args:
+            key: Clave generada con make_key
+            value: Valor a guardar (se guarda una copia)
+        """
+        if not self.enabled:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (self._generation, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def bump_generation(self):
+        """Invalida todas las entradas (los datos cambiaron)"""
+        with self._lock:
+            self._generation += 1
+            self._invalidations += 1
+            self._entries.clear()
+
+    def sync_generation(self, external_generation):
+        """
+        Invalida las entradas si la generación compartida cambió (escrituras
+        hechas por otro proceso, por ejemplo el scraping desde la línea de comandos)
+        Args:
+            external_generation: Generación leída de la base de datos
+        """
+        if external_generation == self._external_generation:
+            return
+        if self._external_generation is not None:
+            self.bump_generation()
+        self._external_generation = external_generation
+
+    def stats(self) -> Dict:
+        """Retorna los contadores de la caché para monitoreo"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'habilitada': self.enabled,
+                'entradas': len(self._entries),
+                'max_entradas': self.max_entries,
+                'ttl': self.ttl,
+                'aciertos': self._hits,
+                'fallos': self._misses,
+                'tasa_aciertos': round(self._hits / total, 3) if total else 0.0,
+                'invalidaciones': self._invalidations,
+                'generacion': self._generation
+            }
@@ -0,0 +1,200 @@
+"""
+Trabajos de extracción en segundo plano
+POST /extraer crea un trabajo y responde de inmediato con su ID; un hilo del proceso
+ejecuta ScrapingService.run_scraping y va guardando el avance por portal en la
+colección scraping_jobs, que se consulta con GET /extraer/<job_id>. Solo hay un
+trabajo activo a la vez (índice activo_1_unico): los clics repetidos, también desde
+otros procesos, reciben el trabajo en curso en vez de lanzar otra extracción. Mientras
+corre, un hilo renueva su lease (lease_until) aunque la extracción no avance (esperas,
+Retry-After); solo un lease vencido indica que el proceso que lo ejecutaba terminó
+"""
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.settings import Config
+
+PENDIENTE = 'pendiente'
+EN_CURSO = 'en_curso'
+COMPLETADO = 'completado'
+ERROR = 'error'
+ABANDONADO = 'abandonado'
+
+
+def resumen_stats(stats: Dict) -> Dict:
+    """Campos del resultado de una extracción que se muestran al usuario"""
+    return {
+        'nuevas_ofertas': stats.get('nuevas', 0),
+        'actualizadas': stats.get('actualizadas', 0),
+        'sin_cambios': stats.get('sin_cambios', 0),
+        'errores': stats.get('errores', 0),
+        'total_procesadas': stats.get('total_encontradas', 0),
+        'por_fuente': stats.get('por_fuente', {}),
+        'portales_omitidos': stats.get('portales_omitidos', []),
+        'tiempo_agotado': stats.get('tiempo_agotado', False)
+    }
+
+
+def serialize_job(job: Dict) -> Dict:
+    """Convierte un documento de scraping_jobs en la respuesta JSON de GET /extraer/<job_id>"""
+    datos = {
+        'job_id': job['_id'],
+        'estado': job.get('estado'),
+        'portales': job.get('portales'),
+        'progreso': job.get('progreso', {}),
+        'resultado': job.get('resultado'),
+        'error': job.get('error'),
+        'terminado': job.get('estado') in (COMPLETADO, ERROR, ABANDONADO)
+    }
+    for campo in ('creado_at', 'iniciado_at', 'finalizado_at', 'updated_at'):
+        valor = job.get(campo)
+        datos[campo] = valor.isoformat() if isinstance(valor, datetime) else valor
+    return datos
+
+
+class ScrapingJobManager:
+    """Crea, ejecuta y consulta trabajos de extracción guardados en MongoDB"""
+
+    def __init__(self, db_manager, service_factory: Callable = None, lease: float = None,
+                 progress_interval: float = None):
+        """
+        Args:
+            db_manager: MongoDBManager con la colección scraping_jobs
+            service_factory: Función que recibe db_manager y retorna un ScrapingService
+                             (por defecto uno con Config.SCRAPING_JOB_PARSE_WORKERS procesos de parseo)
+            lease: Segundos de vigencia del lease de un trabajo activo; se renueva cada
+                   tercio de ese tiempo (por defecto Config.SCRAPING_JOB_LEASE)
+            progress_interval: Segundos mínimos entre escrituras del avance
+                               (por defecto Config.SCRAPING_JOB_PROGRESS_INTERVAL)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_manager = db_manager
+        self.service_factory = service_factory or self._default_service
+        self.lease = lease if lease is not None else Config.SCRAPING_JOB_LEASE
+        self.progress_interval = (progress_interval if progress_interval is not None
+                                  else Config.SCRAPING_JOB_PROGRESS_INTERVAL)
+        self._lock = threading.Lock()
+        self._threads: Dict[str, threading.Thread] = {}
+
+    @staticmethod
+    def _default_service(db_manager):
+        from app.services.scraping_service import ScrapingService
+        return ScrapingService(db_manager, parse_workers=Config.SCRAPING_JOB_PARSE_WORKERS)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Retorna el documento de un trabajo (None si no existe)"""
+        return self.db_manager.get_scraping_job(job_id)
+
+    def submit(self, portals: List[str] = None, usuario: str = None) -> Tuple[Optional[Dict], bool]:
+        """
+        Lanza un trabajo de extracción, o retorna el que ya está activo
+        Args:
+            portals: Portales a extraer (None: todos)
+            usuario: Usuario que lo solicitó
+        Returns:
+            Tupla (trabajo, creado); trabajo es None si no se pudo registrar
+        """
+        with self._lock:
+            for _ in range(2):
+                activo = self._activo()
+                if activo is not None:
+                    self.logger.info(f"Extracción ya en curso ({activo['_id']}), se reutiliza")
+                    return activo, False
+
+                ahora = datetime.now()
+                job = {
+                    '_id': uuid.uuid4().hex,
+                    'activo': True,
+                    'estado': PENDIENTE,
+                    'portales': portals,
+                    'usuario': usuario,
+                    'progreso': {},
+                    'creado_at': ahora,
+                    'updated_at': ahora,
+                    'lease_until': ahora + timedelta(seconds=self.lease)
+                }
+                if self.db_manager.create_scraping_job(job):
+                    break
+                # Otro proceso lo creó entre la consulta y la inserción (o no hay conexión)
+                job = None
+            if job is None:
+                return self._activo(), False
+
+            hilo = threading.Thread(target=self._run, args=(job['_id'], portals),
+                                    name=f"scraping-job-{job['_id'][:8]}", daemon=True)
+            self._threads[job['_id']] = hilo
+            self.logger.info(f"Trabajo de extracción {job['_id']} encolado")
+            hilo.start()
+        return job, True
+
+    def _activo(self) -> Optional[Dict]:
+        """Trabajo activo; uno con el lease vencido se marca abandonado"""
+        activo = self.db_manager.get_scraping_job()
+        if activo is None:
+            return None
+        vivo = activo['_id'] in self._threads and self._threads[activo['_id']].is_alive()
+        lease_until = activo.get('lease_until')
+        if not vivo and isinstance(lease_until, datetime) and datetime.now() > lease_until:
+            self.logger.warning(f"Trabajo de extracción {activo['_id']} con el lease vencido, se marca abandonado")
+            self.db_manager.update_scraping_job(activo['_id'], {
+                'estado': ABANDONADO, 'finalizado_at': datetime.now(),
+                'error': 'El proceso que lo ejecutaba dejó de renovar su lease'
+            }, finalizar=True)
+            return None
+        return activo
+    
+    def _renovar_lease(self, job_id: str, detener: threading.Event):
+        """Renueva el lease del trabajo cada tercio de su vigencia hasta que termina"""
+        while not detener.wait(self.lease / 3):
+            self.db_manager.update_scraping_job(job_id, {
+                'lease_until': datetime.now() + timedelta(seconds=self.lease)
+            })
+
+    def _run(self, job_id: str, portals: Optional[List[str]]):
+        """Ejecuta la extracción de un trabajo (en su propio hilo)"""
+        ultimo = [0.0]
+        escritura = threading.Lock()
+
+        def progreso(stats: Dict):
+            # El avance llega desde varios hilos; se escribe como máximo cada progress_interval
+            with escritura:
+                ahora = time.monotonic()
+                if ahora - ultimo[0] < self.progress_interval:
+                    return
+                ultimo[0] = ahora
+                self.db_manager.update_scraping_job(job_id, {
+                    'progreso': stats.get('progreso', {}), 'resultado': resumen_stats(stats)
+                })
+
+        self.db_manager.update_scraping_job(job_id, {
+            'estado': EN_CURSO, 'iniciado_at': datetime.now(),
+            'lease_until': datetime.now() + timedelta(seconds=self.lease)
+        })
+        detener = threading.Event()
+        threading.Thread(target=self._renovar_lease, args=(job_id, detener),
+                         name=f"scraping-lease-{job_id[:8]}", daemon=True).start()
+        try:
+            service = self.service_factory(self.db_manager)
+            stats = service.run_scraping(portals, progress=progreso)
+            with escritura:
+                # Ninguna escritura de avance tardía pisa el resultado final
+                ultimo[0] = float('inf')
+                self.db_manager.update_scraping_job(job_id, {
+                    'estado': COMPLETADO, 'finalizado_at': datetime.now(),
+                    'progreso': stats.get('progreso', {}), 'resultado': resumen_stats(stats)
+                }, finalizar=True)
+            self.logger.info(f"Trabajo de extracción {job_id} completado: {stats}")
+        except Exception as e:
+            self.logger.error(f"Error en el trabajo de extracción {job_id}: {e}", exc_info=True)
+            with escritura:
+                ultimo[0] = float('inf')
+                self.db_manager.update_scraping_job(job_id, {
+                    'estado': ERROR, 'finalizado_at': datetime.now(), 'error': str(e)
+                }, finalizar=True)
+        finally:
+            detener.set()
+            with self._lock:
+                self._threads.pop(job_id, None)
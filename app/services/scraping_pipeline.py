@@ -0,0 +1,116 @@
+"""
+Guardado en streaming de las ofertas extraídas
+Los portales entregan sus ofertas página por página en una cola acotada y un hilo de
+guardado las agrupa en lotes que se validan y se escriben en MongoDB mientras los demás
+portales siguen descargándose. Con la cola llena los portales esperan (contrapresión),
+así que la memoria depende del tamaño de la cola y del lote, no de las páginas recorridas
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from config.settings import Config
+
+# Marca de fin de la cola
+_FIN = object()
+
+
+class PaginaExtraida:
+    """Resultado de una página de listado listo para guardar"""
+
+    __slots__ = ('portal', 'url', 'ofertas', 'omitidas', 'cache')
+
+    def __init__(self, portal: str, url: str, ofertas: List[Dict], omitidas: List[str] = None,
+                 cache: Dict = None):
+        """
+        Args:
+            portal: Clave del portal
+            url: URL de la página
+            ofertas: Ofertas extraídas (nuevas o con cambios)
+            omitidas: IDs de ofertas conocidas que no se volvieron a extraer
+            cache: Entrada de la caché HTTP que se confirma al guardar la página
+        """
+        self.portal = portal
+        self.url = url
+        self.ofertas = ofertas
+        self.omitidas = omitidas or []
+        self.cache = cache
+
+
+class StorePipeline:
+    """Cola acotada de páginas extraídas y el hilo que las guarda por lotes"""
+
+    def __init__(self, guardar: Callable[[List[PaginaExtraida]], None], batch_size: int = None,
+                 queue_size: int = None, flush_interval: float = None):
+        """
+        Args:
+            guardar: Función que guarda un lote de páginas (se llama desde el hilo de guardado)
+            batch_size: Ofertas por lote (por defecto Config.BULK_BATCH_SIZE)
+            queue_size: Páginas en espera como máximo (por defecto Config.SCRAPING_QUEUE_SIZE)
+            flush_interval: Segundos sin páginas nuevas tras los que se guarda un lote
+                            incompleto (por defecto Config.SCRAPING_FLUSH_INTERVAL)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.guardar = guardar
+        self.batch_size = max(1, batch_size or Config.BULK_BATCH_SIZE)
+        self.flush_interval = flush_interval if flush_interval is not None else Config.SCRAPING_FLUSH_INTERVAL
+        self._cola: queue.Queue = queue.Queue(maxsize=max(1, queue_size or Config.SCRAPING_QUEUE_SIZE))
+        self._hilo: Optional[threading.Thread] = None
+        self.lotes = 0
+
+    def start(self) -> 'StorePipeline':
+        """Inicia el hilo de guardado"""
+        self._hilo = threading.Thread(target=self._run, name='scraping-store', daemon=True)
+        self._hilo.start()
+        return self
+
+    def put(self, pagina: PaginaExtraida):
+        """Encola una página; bloquea mientras la cola está llena"""
+        self._cola.put(pagina)
+
+    def close(self):
+        """Guarda lo pendiente y espera a que termine el hilo de guardado"""
+        if self._hilo is None:
+            return
+        self._cola.put(_FIN)
+        self._hilo.join()
+        self._hilo = None
+
+    def __enter__(self) -> 'StorePipeline':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self):
+        """Agrupa páginas hasta completar un lote, agotar la espera o recibir el fin"""
+        lote: List[PaginaExtraida] = []
+        ofertas = 0
+        ultimo = time.monotonic()
+        while True:
+            try:
+                pagina = self._cola.get(timeout=self.flush_interval or None)
+            except queue.Empty:
+                pagina = None
+            if pagina is not None and pagina is not _FIN:
+                lote.append(pagina)
+                ofertas += len(pagina.ofertas)
+            vencido = time.monotonic() - ultimo >= self.flush_interval
+            if lote and (pagina is _FIN or ofertas >= self.batch_size or vencido):
+                self._guardar(lote)
+                lote, ofertas = [], 0
+                ultimo = time.monotonic()
+            elif not lote:
+                ultimo = time.monotonic()
+            if pagina is _FIN:
+                return
+
+    def _guardar(self, lote: List[PaginaExtraida]):
+        """Guarda un lote sin detener el hilo si falla (los portales seguirían esperando)"""
+        self.lotes += 1
+        try:
+            self.guardar(lote)
+        except Exception as e:
+            self.logger.error(f"Error en la etapa de guardado: {e}", exc_info=True)
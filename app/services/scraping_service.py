@@ -5,18 +5,36 @@ Extrae ofertas laborales de múltiples portales usando contenedores
 Puede ejecutarse de forma independiente del backend Flask
 """
 
-import requests
 from bs4 import BeautifulSoup
 import re
 import hashlib
 import logging
+import multiprocessing
 import time
-import random
 import argparse
+import copy
+import threading
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-from urllib.parse import urljoin, urlparse
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
+from urllib.parse import urljoin, urlparse, urlencode, parse_qsl, urlunparse
 from app.services.database_service import MongoDBManager
+from app.services.detail_enricher import CAMPOS_ENRIQUECIDOS, DetailEnricher
+from app.services.http_cache import HttpCache
+from app.services.extraction import (
+    derive_features, extract_experience, extract_jornada, extract_modalidad, extract_salary,
+    is_tacna_location, normalize_academic_level
+)
+from app.services.keyword_matcher import default_matcher
+from app.services.portal_breaker import PortalBreaker
+from app.services.html_parser import parse_html
+from app.services.scraping_pipeline import PaginaExtraida, StorePipeline
+from app.services.seen_index import SeenIndex
+from app.services.selector_plans import SelectorPlans
+from app.services.http_fetcher import AsyncFetcher, FetchResult, get_shared_fetcher
+from app.utils.validators import validate_oferta_data
+from config.settings import Config
 
 # Configuración de logging
 logging.basicConfig(
@@ -28,92 +46,369 @@ logging.basicConfig(
     ]
 )
 
+# Definición de los portales: nombre visible, URL de búsqueda y selectores de contenedores
+PORTALES = {
+    'computrabajo': {
+        'nombre': 'Computrabajo',
+        'url': Config.PORTALS['computrabajo'],
+        # Parámetro de página: valor = inicio + (página - 1) * paso
+        'paginacion': {'param': 'p', 'inicio': 1, 'paso': 1},
+        'container_selectors': [
+            'article[data-id]',  # Artículos con data-id
+            'div.box_border',  # Contenedores con clase box_border
+            'div[class*="box_border"]',  # Variaciones
+            'article.box_border',  # Artículos con box_border
+            'div.o_oferta',  # Clase específica de ofertas
+            'article.o_oferta'  # Artículos de ofertas
+        ]
+    },
+    'indeed': {
+        'nombre': 'Indeed',
+        'url': Config.PORTALS['indeed'],
+        'paginacion': {'param': 'start', 'inicio': 0, 'paso': 10},
+        'container_selectors': [
+            'div[data-jk]',  # Contenedores con data-jk (Indeed)
+            'div.job_seen_beacon',  # Clase específica de Indeed
+            'div[class*="job_seen"]',  # Variaciones
+            'div.resultWithShelf',  # Resultados con estante
+            'div[class*="result"]',  # Resultados genéricos
+            'div.jobsearch-SerpJobCard'  # Tarjeta de trabajo
+        ]
+    },
+    'bumeran': {
+        'nombre': 'Bumeran',
+        'url': Config.PORTALS['bumeran'],
+        'paginacion': {'param': 'page', 'inicio': 1, 'paso': 1},
+        'container_selectors': [
+            'div[class*="sc-"]',  # Componentes styled-components
+            'div.card-vacancy',  # Tarjetas de vacantes
+            'div[class*="card"]',  # Cualquier tarjeta
+            'li.list-group-item',  # Items de lista
+            'div[class*="vacancy"]',  # Contenedores de vacantes
+            'article[class*="job"]'  # Artículos de trabajo
+        ]
+    },
+    'trabajos': {
+        'nombre': 'Trabajos.pe',
+        'url': Config.PORTALS['trabajos_pe'],
+        'paginacion': {'param': 'page', 'inicio': 1, 'paso': 1},
+        'container_selectors': [
+            'div.content-jobs__item',  # Items de contenido de trabajos
+            'div[class*="content-jobs"]',  # Contenedores de trabajos
+            'div.job-card',  # Tarjetas de trabajo
+            'div[class*="job-card"]',  # Variaciones
+            'div.oferta-item',  # Items de ofertas
+            'article[class*="oferta"]'  # Artículos de ofertas
+        ]
+    }
+}
+
+
+# Cascadas de selectores por campo de la oferta (orden de prueba original)
+SELECTORES_CAMPOS = {
+    'titulo': [
+        'h2 a', 'h3 a', 'h4 a',  # Títulos con enlaces
+        'a[title]',  # Enlaces con atributo title
+        'a[data-jk]',  # Indeed
+        'a.job-title', 'a.title',  # Clases comunes
+        '.title a', '.job-title a',  # Contenedores con clase title
+    ],
+    'empresa': [
+        '.company-name', '.empresa', '.company', '[class*="company"]',
+        '[class*="empresa"]', '.employer', '[data-company]',
+        'span.company', 'div.company', 'a.company'
+    ],
+    'ubicacion': [
+        '.location', '.ubicacion', '[class*="location"]', '[class*="ubicacion"]',
+        '.city', '.ciudad', '[data-location]', 'span.location', 'div.location'
+    ],
+    'descripcion': [
+        '.description', '.snippet', '.summary', '[class*="description"]',
+        '[class*="snippet"]', 'p.description', 'div.description'
+    ],
+    'salario': [
+        '.salary', '.salario', '[class*="salary"]', '[class*="salario"]',
+        '[data-salary]', 'span.salary', 'div.salary'
+    ],
+}
+
+
+class _PlanPagina:
+    """Orden de selectores usado en una página y sus intentos/aciertos"""
+    
+    def __init__(self, plans: Optional[SelectorPlans], portal_name: str, cascadas: Dict[str, List[str]]):
+        self.orden = {
+            campo: plans.order(portal_name, campo, cascada) if plans else list(cascada)
+            for campo, cascada in cascadas.items()
+        }
+        self.intentos = Counter()
+        self.aciertos = Counter()
+    
+    def primero(self, container, campo: str, valor: Callable):
+        """
+        Retorna el primer valor válido de los selectores del campo (plan aprendido primero)
+        Args:
+            container: Contenedor de la oferta
+            campo: Campo en SELECTORES_CAMPOS
+            valor: Función que recibe el elemento y retorna el valor o None
+        """
+        for selector in self.orden[campo]:
+            self.intentos[(campo, selector)] += 1
+            elem = container.select_one(selector)
+            if elem:
+                resultado = valor(elem)
+                if resultado:
+                    self.aciertos[(campo, selector)] += 1
+                    return resultado
+        return None
+
+
+class PortalNoDisponible(Exception):
+    """No se pudo descargar la primera página de un portal"""
+
+
+class ScrapingStats:
+    """Acumulador de estadísticas de extracción seguro entre hilos"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {
+            'total_encontradas': 0,
+            'nuevas': 0,
+            'actualizadas': 0,
+            'sin_cambios': 0,
+            'omitidas': 0,
+            'enriquecidas': 0,
+            'invalidas': 0,
+            'errores': 0,
+            'por_fuente': {},
+            'portales_omitidos': [],
+            'tiempo_agotado': False,
+            # Avance por portal: estado (en_curso, completado, error, omitido), páginas y ofertas
+            'progreso': {}
+        }
+    
+    def registrar_inicio_portal(self, portal: str):
+        """Marca un portal como en curso"""
+        with self._lock:
+            self._data['progreso'][portal] = {'estado': 'en_curso', 'paginas': 0, 'ofertas': 0}
+    
+    def registrar_pagina(self, portal: str, cantidad: int):
+        """Suma una página recorrida de un portal y sus ofertas extraídas"""
+        with self._lock:
+            progreso = self._data['progreso'].setdefault(portal, {'estado': 'en_curso', 'paginas': 0, 'ofertas': 0})
+            progreso['paginas'] += 1
+            progreso['ofertas'] += cantidad
+    
+    def registrar_portal(self, portal: str, cantidad: int):
+        """Registra las ofertas extraídas de un portal"""
+        with self._lock:
+            self._data['por_fuente'][portal] = cantidad
+            self._data['total_encontradas'] += cantidad
+            self._data['progreso'].setdefault(portal, {'paginas': 0, 'ofertas': cantidad})['estado'] = 'completado'
+    
+    def registrar_fallo_portal(self, portal: str):
+        """Suma un error y marca el portal como fallido"""
+        with self._lock:
+            self._data['errores'] += 1
+            self._data['progreso'].setdefault(portal, {'paginas': 0, 'ofertas': 0})['estado'] = 'error'
+    
+    def registrar_omitidas(self, cantidad: int):
+        """Suma ofertas conocidas que no se volvieron a extraer"""
+        with self._lock:
+            self._data['omitidas'] += cantidad
+    
+    def registrar_invalidas(self, cantidad: int):
+        """Suma ofertas descartadas por la validación"""
+        with self._lock:
+            self._data['invalidas'] += cantidad
+    
+    def registrar_enriquecidas(self, cantidad: int):
+        """Suma ofertas completadas con su página de detalle"""
+        with self._lock:
+            self._data['enriquecidas'] += cantidad
+    
+    def registrar_portal_omitido(self, portal: str):
+        """Registra un portal omitido por su circuit breaker"""
+        with self._lock:
+            self._data['portales_omitidos'].append(portal)
+            self._data['progreso'][portal] = {'estado': 'omitido', 'paginas': 0, 'ofertas': 0}
+    
+    def registrar_tiempo_agotado(self):
+        """Marca que la ejecución alcanzó su tiempo límite"""
+        with self._lock:
+            self._data['tiempo_agotado'] = True
+    
+    def registrar_error(self, cantidad: int = 1):
+        """Suma errores"""
+        with self._lock:
+            self._data['errores'] += cantidad
+    
+    def registrar_guardado(self, resultado: Dict):
+        """Registra el resultado de upsert_ofertas_bulk"""
+        with self._lock:
+            self._data['nuevas'] += resultado['nuevas']
+            self._data['actualizadas'] += resultado['actualizadas']
+            self._data['sin_cambios'] += resultado['sin_cambios']
+            self._data['errores'] += resultado['errores']
+    
+    def as_dict(self) -> Dict:
+        """Retorna una copia de las estadísticas"""
+        with self._lock:
+            return copy.deepcopy(self._data)
+
+
 class ScrapingService:
     """Servicio independiente de scraping de ofertas laborales"""
     
-    def __init__(self, db_manager: MongoDBManager = None):
+    def __init__(self, db_manager: MongoDBManager = None, fetcher: AsyncFetcher = None,
+                 http_cache: HttpCache = None, enricher: DetailEnricher = None,
+                 selector_plans: SelectorPlans = None, parse_workers: int = None,
+                 breaker: PortalBreaker = None):
         """
         Inicializa el servicio de scraping
         Args:
             db_manager: Instancia de MongoDBManager (opcional)
+            fetcher: Motor de descarga HTTP (por defecto el compartido del proceso)
+            http_cache: Caché HTTP en disco (por defecto Config.HTTP_CACHE_PATH; vacío la desactiva)
+            enricher: Etapa de páginas de detalle (por defecto una con el mismo fetcher)
+            selector_plans: Planes de selectores aprendidos (por defecto Config.SELECTOR_PLANS_PATH)
+            parse_workers: Procesos que parsean y extraen las páginas en run_scraping
+                           (por defecto Config.SCRAPING_PARSE_WORKERS; 0 los extrae en los hilos)
+            breaker: Circuit breaker por portal (por defecto uno guardado en db_manager)
         """
-        self.session = requests.Session()
-        self.user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Firefox/120.0',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        ]
         self.logger = logging.getLogger(__name__)
         self.db_manager = db_manager or MongoDBManager()
+        self.fetcher = fetcher or get_shared_fetcher()
+        if http_cache is None and Config.HTTP_CACHE_PATH:
+            http_cache = HttpCache(Config.HTTP_CACHE_PATH, Config.HTTP_CACHE_MAX_ENTRIES)
+        self.http_cache = http_cache
+        self.enricher = enricher or DetailEnricher(self.fetcher)
+        self.breaker = breaker or PortalBreaker(self.db_manager)
+        if selector_plans is None:
+            selector_plans = SelectorPlans(Config.SELECTOR_PLANS_PATH or None)
+        self.selector_plans = selector_plans
         
-        # Estadísticas de extracción
-        self.stats = {
-            'total_encontradas': 0,
-            'nuevas': 0,
-            'actualizadas': 0,
-            'errores': 0,
-            'por_fuente': {}
-        }
+        # Pool de procesos para el parseo y la extracción (solo durante run_scraping)
+        self.parse_workers = Config.SCRAPING_PARSE_WORKERS if parse_workers is None else parse_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        
+        # Índices de ofertas guardadas por portal (se cargan al inicio de cada ejecución)
+        self._seen: Dict[str, SeenIndex] = {}
+        self._seen_lock = threading.Lock()
+        
+        # Ofertas que aún se pueden enriquecer en la ejecución en curso
+        self._enrich_restante = 0
+        
+        # Hora límite (time.monotonic) de la ejecución en curso; None sin límite
+        self._deadline_at: Optional[float] = None
+        # Función que recibe el avance de la ejecución en curso (ver run_scraping)
+        self._progreso: Optional[Callable[[Dict], None]] = None
+        
+        # Estadísticas de la última extracción
+        self.stats = ScrapingStats().as_dict()
     
-    def _get_random_user_agent(self) -> str:
-        """Retorna un User-Agent aleatorio"""
-        return random.choice(self.user_agents)
+    @classmethod
+    def solo_extraccion(cls) -> 'ScrapingService':
+        """
+        Servicio que solo parsea y extrae ofertas de páginas ya descargadas: no crea el
+        fetcher, la base de datos, la caché HTTP, el breaker ni planes de selectores propios
+        (lo usan los procesos del pool, que reciben el plan de cada página)
+        """
+        service = cls.__new__(cls)
+        service.logger = logging.getLogger(__name__)
+        service.selector_plans = None
+        return service
     
-    def _make_request(self, url: str, retries: int = 3) -> Optional[BeautifulSoup]:
+    def _fetch(self, url: str) -> Optional[FetchResult]:
         """
-        Realiza una solicitud HTTP con reintentos
+        Descarga una URL (sin parsear) con el motor asíncrono
         Args:
             url: URL a consultar
-            retries: Número de reintentos
         Returns:
-            BeautifulSoup object o None si falla
+            FetchResult (not_modified=True si no cambió) o None si falla o no es HTML
         """
-        for attempt in range(retries):
-            try:
-                self.session.headers.update({
-                    'User-Agent': self._get_random_user_agent(),
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Referer': 'https://www.google.com/'
-                })
-                
-                self.logger.info(f"Realizando request a: {url} (Intento {attempt + 1}/{retries})")
-                response = self.session.get(url, timeout=20, allow_redirects=True)
-                response.raise_for_status()
-                
-                # Verificar que sea HTML
-                if 'text/html' not in response.headers.get('Content-Type', ''):
-                    self.logger.warning(f"Respuesta no es HTML: {response.headers.get('Content-Type')}")
-                    continue
-                
-                self.logger.info(f"✓ Request exitoso a {url} ({len(response.content)} bytes)")
-                return BeautifulSoup(response.content, 'html.parser')
-                
-            except requests.exceptions.HTTPError as e:
-                self.logger.error(f"Error HTTP {e.response.status_code}: {url}")
-                if e.response.status_code == 403:
-                    self.logger.warning("Acceso denegado (403). Esperando antes de reintentar...")
-                    time.sleep(random.uniform(15, 25))
-                elif e.response.status_code == 429:
-                    self.logger.warning("Rate limit (429). Esperando más tiempo...")
-                    time.sleep(random.uniform(30, 60))
-                    
-            except requests.exceptions.RequestException as e:
-                self.logger.error(f"Error de conexión: {e}")
-                
-            # Espera entre reintentos
-            if attempt < retries - 1:
-                wait_time = random.uniform(5 * (attempt + 1), 10 * (attempt + 1))
-                self.logger.info(f"Esperando {wait_time:.1f}s antes del siguiente intento...")
-                time.sleep(wait_time)
+        return self._fetch_many([url])[0]
+    
+    def _fetch_many(self, urls: List[str]) -> List[Optional[FetchResult]]:
+        """
+        Descarga varias URLs a la vez con solicitudes condicionales según la caché HTTP
+        Returns:
+            Resultados en el mismo orden que las URLs
+        """
+        restante = self._tiempo_restante()
+        if restante is not None and restante <= 0:
+            return [None] * len(urls)
+        entradas = [self.http_cache.get(url) if self.http_cache else None for url in urls]
+        headers = [self.http_cache.conditional_headers(e) if self.http_cache else None for e in entradas]
+        if restante is None:
+            resultados = self.fetcher.fetch_many_sync(urls, headers)
+        else:
+            # Las descargas que no terminan antes del tiempo límite se cancelan
+            resultados = self.fetcher.fetch_many_sync(urls, headers, timeout=restante)
+        return [self._procesar_respuesta(url, entrada, result)
+                for url, entrada, result in zip(urls, entradas, resultados)]
+    
+    def _tiempo_restante(self) -> Optional[float]:
+        """Segundos hasta el tiempo límite de la ejecución (None si no tiene)"""
+        if self._deadline_at is None:
+            return None
+        return self._deadline_at - time.monotonic()
+    
+    def _vencido(self) -> bool:
+        """Indica si la ejecución en curso alcanzó su tiempo límite"""
+        restante = self._tiempo_restante()
+        return restante is not None and restante <= 0
+    
+    def _procesar_respuesta(self, url: str, entrada: Optional[Dict],
+                            result: Optional[FetchResult]) -> Optional[FetchResult]:
+        """Descarta respuestas que no son HTML y detecta contenido sin cambios"""
+        if result is None or result.not_modified:
+            return result
         
-        self.logger.error(f"✗ Falló la extracción de {url} después de {retries} intentos")
-        return None
+        # Verificar que sea HTML
+        if 'text/html' not in result.headers.get('Content-Type', ''):
+            self.logger.warning(f"Respuesta no es HTML: {result.headers.get('Content-Type')}")
+            return None
+        
+        if entrada and entrada['content_hash'] == HttpCache.content_hash(result.content):
+            self.logger.info(f"✓ {url} sin cambios (mismo contenido)")
+            result.not_modified = True
+        return result
+    
+    @staticmethod
+    def _entrada_cache(result: FetchResult) -> Dict:
+        """Entrada de la caché HTTP de una página ya extraída (se guarda al confirmar su lote)"""
+        return {
+            'content_hash': HttpCache.content_hash(result.content),
+            'etag': result.headers.get('ETag'),
+            'last_modified': result.headers.get('Last-Modified')
+        }
+    
+    def _confirmar_cache(self, paginas: List[PaginaExtraida]):
+        """Guarda en la caché HTTP las páginas cuyas ofertas ya están en MongoDB"""
+        for pagina in paginas:
+            if pagina.cache:
+                self.http_cache.put(pagina.url, **pagina.cache)
+    
+    def _parse(self, content: bytes) -> BeautifulSoup:
+        """Parsea el HTML descargado con el backend configurado (Config.HTML_PARSER)"""
+        return parse_html(content)
+    
+    def _make_request(self, url: str) -> Optional[BeautifulSoup]:
+        """
+        Descarga y parsea una página
+        Los reintentos y el timeout se toman de Config (MAX_RETRIES, REQUEST_TIMEOUT)
+        Args:
+            url: URL a consultar
+        Returns:
+            BeautifulSoup object o None si falla o la página no cambió
+        """
+        result = self._fetch(url)
+        if result is None or result.not_modified:
+            # Una página sin cambios no se vuelve a parsear
+            return None
+        return self._parse(result.content)
     
     def _generate_id(self, url: str, titulo: str) -> str:
         """Genera un ID único para la oferta"""
@@ -123,189 +418,129 @@ class ScrapingService:
     
     def _is_tacna_location(self, text: str) -> bool:
         """Verifica si la ubicación menciona Tacna"""
-        if not text:
-            return False
-        
-        text_lower = text.lower()
-        tacna_patterns = [
-            r'\btacna\b', r'\btacneñ[oa]s?\b', 
-            r'provincia de tacna', r'departamento de tacna',
-            r'región tacna', r'tacna,', r', tacna', r'tacna\s*perú'
-        ]
-        
-        return any(re.search(pattern, text_lower) for pattern in tacna_patterns)
+        return is_tacna_location(text)
     
     def _extract_salary(self, text: str) -> str:
         """Extrae información de salario del texto"""
-        if not text:
-            return "No especificado"
-        
-        text_clean = text.replace(' ', '').replace(',', '')
-        
-        # Buscar rangos (1000-1500, S/1000-1500)
-        range_match = re.search(r'(?:s/|soles?|pen)?(\d+\.?\d*)(?:[-–—])(?:s/|soles?|pen)?(\d+\.?\d*)', text_clean, re.IGNORECASE)
-        if range_match:
-            val1 = float(range_match.group(1))
-            val2 = float(range_match.group(2))
-            return f"S/ {min(val1, val2):,.2f} - S/ {max(val1, val2):,.2f}"
-        
-        # Buscar valor único
-        single_match = re.search(r'(?:s/|soles?|pen)(\d+\.?\d*)', text_clean, re.IGNORECASE)
-        if single_match:
-            return f"S/ {float(single_match.group(1)):,.2f}"
-        
-        # Buscar "desde" o "hasta"
-        desde_match = re.search(r'desde\s*(?:s/|soles?|pen)?(\d+\.?\d*)', text, re.IGNORECASE)
-        hasta_match = re.search(r'hasta\s*(?:s/|soles?|pen)?(\d+\.?\d*)', text, re.IGNORECASE)
-        
-        if desde_match and hasta_match:
-            return f"S/ {float(desde_match.group(1)):,.2f} - S/ {float(hasta_match.group(1)):,.2f}"
-        elif desde_match:
-            return f"Desde S/ {float(desde_match.group(1)):,.2f}"
-        elif hasta_match:
-            return f"Hasta S/ {float(hasta_match.group(1)):,.2f}"
-        
-        return "No especificado"
+        return extract_salary(text)
     
     def _extract_experience(self, text: str) -> int:
         """Extrae años de experiencia requeridos"""
-        if not text:
-            return 0
-        
-        patterns = [
-            r'(\d+)\s*(?:a[ñn]os?|years?)\s*(?:de\s*)?(?:experiencia|exp)',
-            r'experiencia\s*(?:de\s*)?(\d+)\s*(?:a[ñn]os?|years?)',
-            r'mínimo\s*(\d+)\s*(?:a[ñn]os?|years?)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text.lower())
-            if match:
-                return int(match.group(1))
-        
-        return 0
+        return extract_experience(text.lower()) if text else 0
     
     def _normalize_academic_level(self, text: str) -> str:
         """Normaliza el nivel académico"""
-        if not text:
-            return "Bachiller"
-        
-        text_lower = text.lower()
-        
-        # Practicantes
-        if any(word in text_lower for word in ['practicante', 'prácticas', 'pasantía', 'estudiante', 'pre-profesional']):
-            return "Practicante"
-        
-        # Profesionales
-        elif any(word in text_lower for word in ['universitario', 'título', 'licenciado', 'profesional', 'técnico superior', 'egresado universitario']):
-            return "Profesional"
-        
-        # Bachilleres
-        elif any(word in text_lower for word in ['bachiller', 'bachillerato', 'secundaria completa', 'egresado']):
-            return "Bachiller"
-        
-        return "Bachiller"
+        return normalize_academic_level(text.lower()) if text else "Bachiller"
     
     def _extract_keywords(self, text: str, max_keywords: int = 10) -> str:
-        """Extrae palabras clave técnicas y relevantes"""
+        """
+        Extrae palabras clave técnicas y relevantes
+        El vocabulario (Config.SKILL_KEYWORDS y SKILL_KEYWORDS_FILE) se compila una sola vez
+        """
         if not text:
             return ""
         
-        keywords_list = [
-            'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node.js', 'php', 'ruby',
-            'sql', 'mysql', 'postgresql', 'mongodb', 'oracle', 'sql server', 'database',
-            'html', 'css', 'bootstrap', 'jquery', 'ajax', 'json', 'xml', 'rest', 'api',
-            'git', 'github', 'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'cloud', 'devops',
-            'linux', 'windows', 'unix', 'bash', 'powershell',
-            'excel', 'word', 'powerpoint', 'office', 'google workspace', 'microsoft office',
-            'sap', 'erp', 'crm', 'salesforce',
-            'marketing digital', 'seo', 'sem', 'redes sociales', 'content marketing',
-            'ventas', 'negociación', 'atención al cliente', 'comercial',
-            'comunicación', 'liderazgo', 'trabajo en equipo', 'gestión de proyectos',
-            'agile', 'scrum', 'planificación', 'organización',
-            'administración', 'contabilidad', 'finanzas', 'auditoría', 'tributación',
-            'recursos humanos', 'rrhh', 'selección', 'capacitación',
-            'logística', 'cadena de suministro', 'almacén', 'inventario',
-            'ingeniería', 'mantenimiento', 'producción', 'calidad',
-            'enfermería', 'salud', 'medicina', 'farmacia',
-            'diseño gráfico', 'autocad', 'solidworks', 'photoshop', 'illustrator',
-            'inglés', 'english', 'portugués', 'francés'
-        ]
-        
-        found_keywords = set()
-        text_lower = text.lower()
-        
-        for keyword in keywords_list:
-            if re.search(r'\b' + re.escape(keyword) + r'\b', text_lower):
-                found_keywords.add(keyword)
-                if len(found_keywords) >= max_keywords:
-                    break
-        
-        return ', '.join(sorted(list(found_keywords)))
+        return default_matcher().extract(text, max_keywords)
     
     def _extract_modalidad(self, text: str) -> str:
         """Extrae la modalidad de trabajo"""
-        if not text:
-            return "Presencial"
-        
-        text_lower = text.lower()
-        
-        if any(word in text_lower for word in ['remoto', 'remote', 'home office', 'teletrabajo']):
-            return "Remoto"
-        elif any(word in text_lower for word in ['híbrido', 'hybrid', 'mixto']):
-            return "Híbrido"
-        elif any(word in text_lower for word in ['presencial', 'oficina', 'on-site']):
-            return "Presencial"
-        
-        return "Presencial"
+        return extract_modalidad(text.lower()) if text else "Presencial"
     
     def _extract_jornada(self, text: str) -> str:
         """Extrae el tipo de jornada"""
-        if not text:
-            return "Tiempo completo"
-        
-        text_lower = text.lower()
+        return extract_jornada(text.lower()) if text else "Tiempo completo"
+    
+    @staticmethod
+    def _extract_title_link(container, plan: _PlanPagina = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Busca el enlace con el título de la oferta en un contenedor
+        Args:
+            container: Contenedor de la oferta
+            plan: Plan de selectores de la página (por defecto la cascada original)
+        Returns:
+            Tupla (título, href sin normalizar)
+        """
+        partes = {}
         
-        if any(word in text_lower for word in ['tiempo completo', 'full time', 'jornada completa']):
-            return "Tiempo completo"
-        elif any(word in text_lower for word in ['medio tiempo', 'part time', 'parcial']):
-            return "Medio tiempo"
-        elif any(word in text_lower for word in ['por horas', 'freelance', 'temporal']):
-            return "Por horas"
+        def enlace(elem):
+            # Un título sin enlace se conserva por si ningún otro selector da ambos
+            partes['titulo'] = elem.get('title', '').strip() or elem.get_text(strip=True)
+            partes['url'] = elem.get('href', '')
+            return (partes['titulo'], partes['url']) if partes['titulo'] and partes['url'] else None
         
-        return "Tiempo completo"
+        plan = plan or _PlanPagina(None, '', {'titulo': SELECTORES_CAMPOS['titulo']})
+        return plan.primero(container, 'titulo', enlace) or (partes.get('titulo'), partes.get('url'))
+    
+    def _known_container_id(self, container, base_url: str, seen: SeenIndex,
+                            plan: _PlanPagina = None) -> Tuple[Optional[str], str, Tuple[Optional[str], Optional[str]]]:
+        """
+        Comprobación barata de un contenedor de Tacna antes de la extracción completa
+        Args:
+            container: Contenedor de la oferta
+            base_url: URL de la página
+            seen: Índice de ofertas ya guardadas del portal
+            plan: Plan de selectores de la página
+        Returns:
+            Tupla (ID si la oferta ya está guardada y su contenedor no cambió, hash del contenedor,
+            (título, href) para reutilizar en la extracción)
+        """
+        hash_contenedor = hashlib.md5(str(container).encode('utf-8')).hexdigest()[:16]
+        titulo_link = self._extract_title_link(container, plan)
+        titulo, url_oferta = titulo_link
+        if not (titulo and url_oferta):
+            return None, hash_contenedor, titulo_link
+        if not url_oferta.startswith('http'):
+            url_oferta = urljoin(base_url, url_oferta)
+        oferta_id = self._generate_id(url_oferta, titulo)
+        if seen.unchanged(oferta_id, hash_contenedor):
+            return oferta_id, hash_contenedor, titulo_link
+        return None, hash_contenedor, titulo_link
+    
+    def _ubicacion_tacna(self, container, plan: _PlanPagina) -> Optional[str]:
+        """
+        Ubicación del contenedor si es de Tacna; es lo primero que se revisa, de modo que
+        los contenedores de otras ciudades se descartan sin hash ni búsqueda de título
+        Returns:
+            Texto de la ubicación, o None si la oferta no es de Tacna
+        """
+        ubicacion = plan.primero(container, 'ubicacion', lambda e: e.get_text(strip=True)) or ""
+        if not is_tacna_location(ubicacion):
+            self.logger.debug(f"Oferta descartada - no es de Tacna: {ubicacion}")
+            return None
+        return ubicacion
+    
+    @staticmethod
+    def _valor_especificado(valor: str) -> Optional[str]:
+        """Retorna el valor, o None si está vacío o es 'No especificado'"""
+        return valor if valor and valor != "No especificado" else None
     
-    def _extract_from_container(self, container, portal_name: str, base_url: str) -> Optional[Dict]:
+    def _extract_from_container(self, container, portal_name: str, base_url: str,
+                                plan: _PlanPagina = None, ubicacion: str = None,
+                                titulo_link: Tuple[Optional[str], Optional[str]] = None) -> Optional[Dict]:
         """
         Extrae datos de una oferta desde un contenedor
         Args:
             container: BeautifulSoup element del contenedor
             portal_name: Nombre del portal
             base_url: URL base del portal
+            plan: Plan de selectores de la página (por defecto las cascadas originales)
+            ubicacion: Ubicación ya verificada con _ubicacion_tacna (si no, se verifica aquí)
+            titulo_link: (título, href) ya buscados por _known_container_id (si no, se buscan aquí)
         Returns:
             Diccionario con datos de la oferta o None si no es válida
         """
+        plan = plan or _PlanPagina(None, portal_name, SELECTORES_CAMPOS)
         try:
-            # Extraer título y URL - múltiples estrategias
-            titulo = None
-            url_oferta = None
+            # Extraer ubicación primero: los contenedores que no son de Tacna se
+            # descartan antes de buscar el resto de los campos
+            if ubicacion is None:
+                ubicacion = self._ubicacion_tacna(container, plan)
+                if ubicacion is None:
+                    return None
             
+            # Extraer título y URL - múltiples estrategias
             # Estrategia 1: Buscar enlaces con título
-            title_selectors = [
-                'h2 a', 'h3 a', 'h4 a',  # Títulos con enlaces
-                'a[title]',  # Enlaces con atributo title
-                'a[data-jk]',  # Indeed
-                'a.job-title', 'a.title',  # Clases comunes
-                '.title a', '.job-title a',  # Contenedores con clase title
-            ]
-            
-            for selector in title_selectors:
-                title_elem = container.select_one(selector)
-                if title_elem:
-                    titulo = title_elem.get('title', '').strip() or title_elem.get_text(strip=True)
-                    url_oferta = title_elem.get('href', '')
-                    if titulo and url_oferta:
-                        break
+            titulo, url_oferta = titulo_link or self._extract_title_link(container, plan)
             
             # Estrategia 2: Si no hay enlace, buscar título directo
             if not titulo:
@@ -332,19 +567,9 @@ class ScrapingService:
                 url_oferta = f"{base_url}#{hashlib.md5(titulo.encode()).hexdigest()[:8]}"
             
             # Extraer empresa - múltiples estrategias
-            empresa = "No especificado"
-            empresa_selectors = [
-                '.company-name', '.empresa', '.company', '[class*="company"]',
-                '[class*="empresa"]', '.employer', '[data-company]',
-                'span.company', 'div.company', 'a.company'
-            ]
-            
-            for selector in empresa_selectors:
-                emp_elem = container.select_one(selector)
-                if emp_elem:
-                    empresa = emp_elem.get_text(strip=True)
-                    if empresa and empresa != "No especificado":
-                        break
+            empresa = plan.primero(
+                container, 'empresa', lambda e: self._valor_especificado(e.get_text(strip=True))
+            ) or "No especificado"
             
             # Si no se encuentra, buscar en atributos data
             if empresa == "No especificado":
@@ -352,76 +577,40 @@ class ScrapingService:
                 if emp_attr:
                     empresa = emp_attr if isinstance(emp_attr, str) else emp_attr.get('data-company', '')
             
-            # Extraer ubicación - múltiples estrategias
-            ubicacion = ""
-            location_selectors = [
-                '.location', '.ubicacion', '[class*="location"]', '[class*="ubicacion"]',
-                '.city', '.ciudad', '[data-location]', 'span.location', 'div.location'
-            ]
-            
-            for selector in location_selectors:
-                loc_elem = container.select_one(selector)
-                if loc_elem:
-                    ubicacion = loc_elem.get_text(strip=True)
-                    if ubicacion:
-                        break
-            
-            # Validar que sea de Tacna
-            if not self._is_tacna_location(ubicacion):
-                self.logger.debug(f"Oferta descartada - no es de Tacna: {ubicacion}")
-                return None
-            
             # Extraer descripción/snippet
-            descripcion = ""
-            desc_selectors = [
-                '.description', '.snippet', '.summary', '[class*="description"]',
-                '[class*="snippet"]', 'p.description', 'div.description'
-            ]
-            
-            for selector in desc_selectors:
-                desc_elem = container.select_one(selector)
-                if desc_elem:
-                    descripcion = desc_elem.get_text(strip=True)
-                    if descripcion:
-                        break
+            descripcion = plan.primero(container, 'descripcion', lambda e: e.get_text(strip=True)) or ""
             
             # Si no hay descripción, usar todo el texto del contenedor (limitado)
             if not descripcion:
                 descripcion = container.get_text(separator=' ', strip=True)[:300]
             
             # Extraer salario
-            salario = "No especificado"
-            salary_selectors = [
-                '.salary', '.salario', '[class*="salary"]', '[class*="salario"]',
-                '[data-salary]', 'span.salary', 'div.salary'
-            ]
-            
-            for selector in salary_selectors:
-                sal_elem = container.select_one(selector)
-                if sal_elem:
-                    salario_text = sal_elem.get_text(strip=True)
-                    salario = self._extract_salary(salario_text)
-                    if salario != "No especificado":
-                        break
+            salario = plan.primero(
+                container, 'salario',
+                lambda e: self._valor_especificado(extract_salary(e.get_text(strip=True)))
+            ) or "No especificado"
             
             # Si no se encuentra salario, buscar en el texto completo
             if salario == "No especificado":
                 full_text = container.get_text()
-                salario = self._extract_salary(full_text)
+                salario = extract_salary(full_text)
+            
+            # Nivel, experiencia, conocimientos, modalidad y jornada desde el texto normalizado una vez
+            atributos = derive_features(descripcion, titulo)
             
             # Crear oferta
             oferta = {
                 'id': self._generate_id(url_oferta, titulo),
                 'titulo_oferta': titulo[:80] if titulo else "Sin título",
                 'empresa': empresa[:100] if empresa else "No especificado",
-                'nivel_academico': self._normalize_academic_level(descripcion + " " + titulo),
+                'nivel_academico': atributos['nivel_academico'],
                 'puesto': titulo[:100] if titulo else "Sin especificar",
-                'experiencia_minima_anios': self._extract_experience(descripcion + " " + titulo),
-                'conocimientos_clave': self._extract_keywords(descripcion + " " + titulo),
+                'experiencia_minima_anios': atributos['experiencia_minima_anios'],
+                'conocimientos_clave': atributos['conocimientos_clave'],
                 'responsabilidades_breve': descripcion[:200] if descripcion else "Ver detalles en la oferta",
-                'modalidad': self._extract_modalidad(descripcion + " " + titulo),
+                'modalidad': atributos['modalidad'],
                 'ubicacion': f"Tacna — {ubicacion}" if ubicacion and ubicacion.lower() != 'tacna' else "Tacna",
-                'jornada': self._extract_jornada(descripcion),
+                'jornada': atributos['jornada'],
                 'salario': salario,
                 'fecha_publicacion': datetime.now().strftime('%Y-%m-%d'),
                 'fecha_cierre': None,
@@ -450,65 +639,78 @@ class ScrapingService:
         Returns:
             Lista de ofertas extraídas
         """
-        ofertas = []
         soup = self._make_request(url)
         
         if not soup:
             self.logger.error(f"No se pudo obtener contenido de {portal_name}")
-            return ofertas
+            return []
         
-        # Intentar con diferentes selectores de contenedores
+        ofertas, _, _ = self._extract_from_soup(soup, portal_name, url, container_selectors)
+        return ofertas
+    
+    def _plan_pagina(self, portal_name: str, container_selectors: List[str]) -> _PlanPagina:
+        """Plan de selectores de una página: estrategias aprendidas del portal primero y luego la cascada completa"""
+        return _PlanPagina(self.selector_plans, portal_name, {
+            'contenedor': self._estrategias_contenedor(container_selectors),
+            **SELECTORES_CAMPOS
+        })
+    
+    def _extract_from_soup(self, soup: BeautifulSoup, portal_name: str, url: str,
+                           container_selectors: List[str], seen: SeenIndex = None,
+                           plan: _PlanPagina = None) -> Tuple[List[Dict], int, List[str]]:
+        """
+        Extrae las ofertas de una página ya parseada
+        Args:
+            soup: Página parseada
+            portal_name: Nombre del portal
+            url: URL de la página
+            container_selectors: Lista de selectores CSS para contenedores de ofertas
+            seen: Índice de ofertas guardadas; sus contenedores sin cambios se omiten
+            plan: Plan de selectores de la página (por defecto el aprendido del portal)
+        Returns:
+            Tupla (ofertas válidas, número de contenedores encontrados, IDs omitidos por conocidos)
+        """
+        ofertas = []
+        omitidas = []
+        
+        plan = plan or self._plan_pagina(portal_name, container_selectors)
         job_containers = []
-        for selector in container_selectors:
-            try:
-                # Intentar como selector CSS
-                containers = soup.select(selector)
-                if containers:
-                    job_containers = containers
-                    self.logger.info(f"✓ Encontrados {len(containers)} contenedores en {portal_name} usando selector CSS: {selector}")
-                    break
-            except Exception as e:
-                self.logger.debug(f"Selector CSS falló: {selector} - {e}")
-            
-            # Intentar como búsqueda por clase
-            try:
-                if '.' in selector:
-                    class_name = selector.replace('.', '')
-                    containers = soup.find_all(['div', 'article', 'li', 'section'], class_=re.compile(class_name, re.IGNORECASE))
-                    if containers:
-                        job_containers = containers
-                        self.logger.info(f"✓ Encontrados {len(containers)} contenedores en {portal_name} usando clase: {class_name}")
-                        break
-            except Exception as e:
-                self.logger.debug(f"Búsqueda por clase falló: {selector} - {e}")
-            
-            # Intentar como búsqueda por atributo
-            try:
-                if '[' in selector:
-                    # Selector de atributo como [data-id]
-                    containers = soup.find_all(attrs={'data-id': True}) or soup.find_all(attrs={'data-job': True})
-                    if containers:
-                        job_containers = containers
-                        self.logger.info(f"✓ Encontrados {len(containers)} contenedores en {portal_name} usando atributos")
-                        break
-            except Exception as e:
-                self.logger.debug(f"Búsqueda por atributo falló: {selector} - {e}")
+        for estrategia in plan.orden['contenedor']:
+            plan.intentos[('contenedor', estrategia)] += 1
+            job_containers = self._buscar_contenedores(soup, estrategia)
+            if job_containers:
+                plan.aciertos[('contenedor', estrategia)] += 1
+                self.logger.info(f"✓ Encontrados {len(job_containers)} contenedores en {portal_name} "
+                                 f"usando {estrategia}")
+                break
         
         if not job_containers:
             self.logger.warning(f"No se encontraron contenedores en {portal_name} con ningún selector")
-            # Intentar búsqueda genérica de contenedores comunes
-            generic_containers = soup.find_all(['article', 'div'], class_=re.compile(r'job|oferta|vacante|card', re.IGNORECASE))
-            if generic_containers:
-                job_containers = generic_containers
-                self.logger.info(f"✓ Encontrados {len(generic_containers)} contenedores genéricos en {portal_name}")
-            else:
-                return ofertas
+            self._registrar_plan(portal_name, plan)
+            return ofertas, 0, omitidas
         
         # Procesar cada contenedor
         for idx, container in enumerate(job_containers, 1):
             try:
-                oferta = self._extract_from_container(container, portal_name, url)
+                # Los contenedores de otras ciudades se descartan antes del hash y del título
+                ubicacion = self._ubicacion_tacna(container, plan)
+                if ubicacion is None:
+                    self.logger.debug(f"✗ Contenedor {idx}/{len(job_containers)} descartado")
+                    continue
+                
+                hash_contenedor = titulo_link = None
+                if seen is not None:
+                    # Ofertas ya guardadas cuyo contenedor no cambió: no se vuelven a extraer
+                    conocida, hash_contenedor, titulo_link = self._known_container_id(container, url, seen, plan)
+                    if conocida:
+                        omitidas.append(conocida)
+                        continue
+                
+                oferta = self._extract_from_container(container, portal_name, url, plan,
+                                                      ubicacion, titulo_link)
                 if oferta:
+                    if hash_contenedor:
+                        oferta['hash_contenedor'] = hash_contenedor
                     ofertas.append(oferta)
                     self.logger.debug(f"✓ Oferta {idx}/{len(job_containers)} extraída: {oferta['titulo_oferta'][:50]}")
                 else:
@@ -516,148 +718,468 @@ class ScrapingService:
             except Exception as e:
                 self.logger.error(f"Error procesando contenedor {idx} de {portal_name}: {e}")
                 continue
-            
-            # Pequeña pausa entre ofertas
-            if idx % 10 == 0:
-                time.sleep(0.5)
         
-        self.logger.info(f"✓ {portal_name}: {len(ofertas)} ofertas válidas extraídas de {len(job_containers)} contenedores")
+        self._registrar_plan(portal_name, plan)
+        self.logger.info(f"✓ {portal_name}: {len(ofertas)} ofertas válidas extraídas de {len(job_containers)} contenedores"
+                         f"{f' ({len(omitidas)} conocidas sin cambios)' if omitidas else ''}")
+        return ofertas, len(job_containers), omitidas
+    
+    @staticmethod
+    def _estrategias_contenedor(container_selectors: List[str]) -> List[str]:
+        """
+        Cascada de búsqueda de contenedores: por cada selector se prueba como CSS, como
+        clase (regex) y como atributo data-id/data-job; al final, la búsqueda genérica
+        """
+        estrategias = []
+        for selector in container_selectors:
+            estrategias.append(f"css:{selector}")
+            if '.' in selector:
+                estrategias.append(f"clase:{selector.replace('.', '')}")
+            if '[' in selector and 'atributo:data-id' not in estrategias:
+                estrategias.append('atributo:data-id')
+        estrategias.append('generica')
+        return estrategias
+    
+    def _buscar_contenedores(self, soup: BeautifulSoup, estrategia: str) -> List:
+        """
+        Busca los contenedores de ofertas con una estrategia de _estrategias_contenedor
+        Returns:
+            Lista de contenedores (vacía si la estrategia no encuentra nada)
+        """
+        tipo, _, valor = estrategia.partition(':')
+        try:
+            if tipo == 'css':
+                return soup.select(valor)
+            if tipo == 'clase':
+                return soup.find_all(['div', 'article', 'li', 'section'], class_=re.compile(valor, re.IGNORECASE))
+            if tipo == 'atributo':
+                # Selector de atributo como [data-id]
+                return soup.find_all(attrs={'data-id': True}) or soup.find_all(attrs={'data-job': True})
+            # Búsqueda genérica de contenedores comunes
+            return soup.find_all(['article', 'div'], class_=re.compile(r'job|oferta|vacante|card', re.IGNORECASE))
+        except Exception as e:
+            self.logger.debug(f"Búsqueda de contenedores falló: {estrategia} - {e}")
+            return []
+    
+    def _registrar_plan(self, portal_name: str, plan: _PlanPagina):
+        """Suma los intentos y aciertos de selectores de una página al plan del portal"""
+        if self.selector_plans:
+            self.selector_plans.record(portal_name, plan.intentos, plan.aciertos)
+    
+    def _seen_index(self, portal_key: str) -> SeenIndex:
+        """
+        Índice de las ofertas ya guardadas de un portal (se carga una vez por ejecución)
+        Args:
+            portal_key: Clave del portal en PORTALES
+        """
+        with self._seen_lock:
+            seen = self._seen.get(portal_key)
+        if seen is None:
+            try:
+                seen = SeenIndex(self.db_manager.get_seen_pairs(PORTALES[portal_key]['nombre']))
+            except Exception as e:
+                self.logger.warning(f"No se pudo cargar el índice de ofertas conocidas: {e}")
+                seen = SeenIndex()
+            with self._seen_lock:
+                self._seen[portal_key] = seen
+            self.logger.info(f"{PORTALES[portal_key]['nombre']}: {len(seen)} ofertas conocidas")
+        return seen
+    
+    @staticmethod
+    def _page_url(portal: Dict, pagina: int) -> str:
+        """
+        Construye la URL de una página del listado de un portal
+        Args:
+            portal: Definición del portal (PORTALES)
+            pagina: Número de página (1 = URL base)
+        """
+        if pagina <= 1 or not portal.get('paginacion'):
+            return portal['url']
+        paginacion = portal['paginacion']
+        partes = urlparse(portal['url'])
+        query = [(k, v) for k, v in parse_qsl(partes.query, keep_blank_values=True) if k != paginacion['param']]
+        query.append((paginacion['param'], str(paginacion['inicio'] + (pagina - 1) * paginacion['paso'])))
+        return urlunparse(partes._replace(query=urlencode(query)))
+    
+    def _enviar_extraccion(self, portal: Dict, url: str, result: Optional[FetchResult]) -> Optional[Future]:
+        """
+        Envía el parseo y la extracción de una página al pool de procesos
+        Returns:
+            Future con el resultado de _extraer_pagina, o None si no hay pool o no hay nada que parsear
+        """
+        if self._pool is None or result is None or result.not_modified:
+            return None
+        try:
+            return self._pool.submit(_extraer_pagina, result.content, portal['nombre'], url,
+                                     portal['container_selectors'])
+        except RuntimeError as e:
+            # Pool cerrado o roto: la página se extrae en el hilo
+            self.logger.warning(f"No se pudo usar el pool de procesos: {e}")
+            return None
+    
+    def _resultado_extraccion(self, portal: Dict, url: str, result: FetchResult, seen: SeenIndex,
+                              extraccion: Optional[Future]) -> Tuple[List[Dict], int, List[str]]:
+        """
+        Resultado de extraer una página: el del pool de procesos si se envió, o se parsea
+        y extrae en el hilo actual
+        Returns:
+            Tupla (ofertas válidas, número de contenedores encontrados, IDs omitidos por conocidos)
+        """
+        if extraccion is not None:
+            try:
+                ofertas, contenedores, omitidas, intentos, aciertos = extraccion.result()
+                if self.selector_plans:
+                    self.selector_plans.record(portal['nombre'], intentos, aciertos)
+                return ofertas, contenedores, omitidas
+            except Exception as e:
+                self.logger.warning(f"Falló la extracción en el pool de procesos, se extrae en el hilo: {e}")
+        return self._extract_from_soup(
+            self._parse(result.content), portal['nombre'], url, portal['container_selectors'], seen
+        )
+    
+    def iter_portal(self, portal_key: str, max_pages: int = None) -> Iterator[PaginaExtraida]:
+        """
+        Recorre las páginas de un portal definido en PORTALES entregando una a una sus ofertas
+        Las páginas se descargan en ventanas de SCRAPING_PAGE_CONCURRENCY y el recorrido
+        se detiene al llegar al final del listado, al agotar max_pages o cuando una
+        página solo contiene ofertas ya guardadas en MongoDB
+        Args:
+            portal_key: Clave del portal (computrabajo, indeed, bumeran, trabajos)
+            max_pages: Páginas máximas a recorrer (por defecto Config.SCRAPING_MAX_PAGES)
+        Returns:
+            Generador de PaginaExtraida (ofertas nuevas de la página e IDs conocidos omitidos)
+        Raises:
+            PortalNoDisponible: Si no se pudo descargar la primera página
+        """
+        portal = PORTALES[portal_key]
+        portal_name = portal['nombre']
+        max_pages = max(1, max_pages or Config.SCRAPING_MAX_PAGES)
+        ventana = max(1, Config.SCRAPING_PAGE_CONCURRENCY)
+        self.logger.info(f"=== Extrayendo de {portal_name} (hasta {max_pages} páginas) ===")
+        
+        seen = self._seen_index(portal_key)
+        vistos = set()
+        pagina = 1
+        while pagina <= max_pages:
+            if self._vencido():
+                self.logger.warning(f"{portal_name}: tiempo límite alcanzado, se detiene el recorrido")
+                return
+            paginas = list(range(pagina, min(pagina + ventana, max_pages + 1)))
+            urls = [self._page_url(portal, n) for n in paginas]
+            resultados = self._fetch_many(urls)
+            # Con el pool de procesos todas las páginas de la ventana se parsean en paralelo
+            extracciones = [self._enviar_extraccion(portal, url, result)
+                            for url, result in zip(urls, resultados)]
+            
+            for n, url, result, extraccion in zip(paginas, urls, resultados, extracciones):
+                if result is None:
+                    if self._vencido():
+                        self.logger.warning(f"{portal_name}: tiempo límite alcanzado en la página {n}")
+                        return
+                    self.logger.error(f"No se pudo obtener la página {n} de {portal_name}")
+                    if n == 1:
+                        raise PortalNoDisponible(f"No se pudo obtener la primera página de {portal_name}")
+                    return
+                if result.not_modified:
+                    # Sus ofertas ya se guardaron en una ejecución anterior
+                    self.logger.info(f"{portal_name}: página {n} sin cambios, se detiene el recorrido")
+                    return
+                
+                nuevas, contenedores, conocidas = self._resultado_extraccion(portal, url, result, seen, extraccion)
+                cache = self._entrada_cache(result)
+                if contenedores == 0:
+                    self.logger.info(f"{portal_name}: página {n} sin ofertas, fin del listado")
+                    yield PaginaExtraida(portal_key, url, [], cache=cache)
+                    return
+                
+                ids = {o['id'] for o in nuevas} - vistos
+                omitidas_pagina = set(conocidas) - vistos
+                vistos.update(ids, omitidas_pagina)
+                yield PaginaExtraida(portal_key, url, [o for o in nuevas if o['id'] in ids],
+                                     list(omitidas_pagina), cache)
+                
+                if (nuevas or conocidas) and not (ids or omitidas_pagina):
+                    # El portal repite la última página al pasar del final
+                    self.logger.info(f"{portal_name}: página {n} repetida, fin del listado")
+                    return
+                pendientes = [i for i in ids if i not in seen]
+                if (ids or omitidas_pagina) and (
+                        not pendientes or len(self.db_manager.get_existing_ids(pendientes)) == len(pendientes)):
+                    self.logger.info(f"{portal_name}: página {n} solo tiene ofertas conocidas, se detiene el recorrido")
+                    return
+            
+            pagina += ventana
+    
+    def extract_portal(self, portal_key: str, max_pages: int = None) -> List[Dict]:
+        """
+        Extrae ofertas de un portal definido en PORTALES (sin guardarlas)
+        Args:
+            portal_key: Clave del portal (computrabajo, indeed, bumeran, trabajos)
+            max_pages: Páginas máximas a recorrer (por defecto Config.SCRAPING_MAX_PAGES)
+        Returns:
+            Lista de ofertas extraídas
+        """
+        ofertas = []
+        try:
+            for pagina in self.iter_portal(portal_key, max_pages):
+                ofertas.extend(pagina.ofertas)
+        except PortalNoDisponible:
+            pass
         return ofertas
     
+    def _stream_portal(self, portal_name: str, max_pages: int, pipeline: StorePipeline,
+                       stats: 'ScrapingStats') -> int:
+        """
+        Extrae un portal enviando cada página a la etapa de guardado
+        Returns:
+            Número de ofertas extraídas
+        """
+        total = 0
+        stats.registrar_inicio_portal(portal_name)
+        self._notificar(stats)
+        for pagina in self.iter_portal(portal_name.lower(), max_pages):
+            total += len(pagina.ofertas)
+            stats.registrar_pagina(portal_name, len(pagina.ofertas))
+            self._notificar(stats)
+            pipeline.put(pagina)
+        return total
+    
+    def _notificar(self, stats: 'ScrapingStats'):
+        """Envía el avance de la ejecución en curso a su función de progreso (si la tiene)"""
+        if self._progreso is None:
+            return
+        try:
+            self._progreso(stats.as_dict())
+        except Exception as e:
+            self.logger.warning(f"No se pudo informar el progreso: {e}")
+    
     def extract_computrabajo(self) -> List[Dict]:
         """Extrae ofertas de Computrabajo usando contenedores"""
-        self.logger.info("=== Extrayendo de Computrabajo ===")
-        return self._extract_from_portal(
-            portal_name="Computrabajo",
-            url="https://pe.computrabajo.com/empleos-en-tacna",
-            container_selectors=[
-                'article[data-id]',  # Artículos con data-id
-                'div.box_border',  # Contenedores con clase box_border
-                'div[class*="box_border"]',  # Variaciones
-                'article.box_border',  # Artículos con box_border
-                'div.o_oferta',  # Clase específica de ofertas
-                'article.o_oferta'  # Artículos de ofertas
-            ]
-        )
+        return self.extract_portal('computrabajo')
     
     def extract_indeed(self) -> List[Dict]:
         """Extrae ofertas de Indeed usando contenedores"""
-        self.logger.info("=== Extrayendo de Indeed ===")
-        return self._extract_from_portal(
-            portal_name="Indeed",
-            url="https://pe.indeed.com/jobs?q=&l=Tacna%2C+Tacna",
-            container_selectors=[
-                'div[data-jk]',  # Contenedores con data-jk (Indeed)
-                'div.job_seen_beacon',  # Clase específica de Indeed
-                'div[class*="job_seen"]',  # Variaciones
-                'div.resultWithShelf',  # Resultados con estante
-                'div[class*="result"]',  # Resultados genéricos
-                'div.jobsearch-SerpJobCard'  # Tarjeta de trabajo
-            ]
-        )
+        return self.extract_portal('indeed')
     
     def extract_bumeran(self) -> List[Dict]:
         """Extrae ofertas de Bumeran usando contenedores"""
-        self.logger.info("=== Extrayendo de Bumeran ===")
-        return self._extract_from_portal(
-            portal_name="Bumeran",
-            url="https://www.bumeran.com.pe/en-tacna/empleos.html",
-            container_selectors=[
-                'div[class*="sc-"]',  # Componentes styled-components
-                'div.card-vacancy',  # Tarjetas de vacantes
-                'div[class*="card"]',  # Cualquier tarjeta
-                'li.list-group-item',  # Items de lista
-                'div[class*="vacancy"]',  # Contenedores de vacantes
-                'article[class*="job"]'  # Artículos de trabajo
-            ]
-        )
+        return self.extract_portal('bumeran')
     
     def extract_trabajos_pe(self) -> List[Dict]:
         """Extrae ofertas de Trabajos.pe usando contenedores"""
-        self.logger.info("=== Extrayendo de Trabajos.pe ===")
-        return self._extract_from_portal(
-            portal_name="Trabajos.pe",
-            url="https://www.trabajos.pe/trabajo-tacna",
-            container_selectors=[
-                'div.content-jobs__item',  # Items de contenido de trabajos
-                'div[class*="content-jobs"]',  # Contenedores de trabajos
-                'div.job-card',  # Tarjetas de trabajo
-                'div[class*="job-card"]',  # Variaciones
-                'div.oferta-item',  # Items de ofertas
-                'article[class*="oferta"]'  # Artículos de ofertas
-            ]
-        )
+        return self.extract_portal('trabajos')
+    
+    def _crear_pool(self, portals: List[str]) -> Optional[ProcessPoolExecutor]:
+        """
+        Pool de procesos para parsear y extraer páginas (None si está desactivado)
+        Cada proceso recibe una sola vez, al iniciarse, el índice de ofertas guardadas y el
+        orden de selectores de cada portal; las páginas solo llevan sus bytes
+        Args:
+            portals: Portales de la ejecución
+        """
+        if self.parse_workers <= 0:
+            return None
+        portales = {}
+        for portal_name in portals:
+            portal = PORTALES[portal_name.lower()]
+            portales[portal['nombre']] = (
+                self._seen_index(portal_name.lower()),
+                self._plan_pagina(portal['nombre'], portal['container_selectors']).orden
+            )
+        try:
+            # spawn: el proceso ya tiene hilos (event loop del fetcher, monitores de pymongo,
+            # guardado) y un fork podría heredar locks tomados y el MongoClient
+            return ProcessPoolExecutor(max_workers=self.parse_workers,
+                                       mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=_iniciar_proceso, initargs=(portales,))
+        except (OSError, ValueError, NotImplementedError) as e:
+            self.logger.warning(f"No se pudo crear el pool de procesos, se extrae en los hilos: {e}")
+            return None
+    
+    def _enriquecer(self, ofertas: List[Dict], enrich: bool) -> int:
+        """
+        Prepara las ofertas para la etapa de páginas de detalle
+        Las ofertas ya enriquecidas no llevan los campos provisionales del listado (para no
+        sobrescribir los reales); si enrich es True se descarga el detalle de las demás
+        hasta agotar el máximo de la ejecución
+        Args:
+            ofertas: Ofertas extraídas de los listados (se modifican en el lugar)
+            enrich: Descargar las páginas de detalle pendientes
+        Returns:
+            Número de ofertas enriquecidas
+        """
+        try:
+            enriquecidas = self.db_manager.get_enriched_ids([o['id'] for o in ofertas])
+        except Exception as e:
+            self.logger.warning(f"No se pudo consultar las ofertas enriquecidas: {e}")
+            enriquecidas = set()
+        
+        pendientes = []
+        for oferta in ofertas:
+            if oferta['id'] in enriquecidas:
+                for campo in CAMPOS_ENRIQUECIDOS:
+                    oferta.pop(campo, None)
+            else:
+                pendientes.append(oferta)
+        
+        if not enrich or not pendientes or self._enrich_restante <= 0:
+            return 0
+        if self._vencido():
+            self.logger.info("Tiempo límite alcanzado: el detalle queda para la próxima ejecución")
+            return 0
+        self.logger.info(f"\n=== Descargando el detalle de {len(pendientes)} ofertas ===")
+        limite = self._enrich_restante
+        self._enrich_restante -= min(limite, len(pendientes))
+        return self.enricher.enrich(pendientes, max_ofertas=limite)
+    
+    def _guardar_lote(self, paginas: List[PaginaExtraida], stats: 'ScrapingStats', enrich: bool):
+        """
+        Etapa de guardado: valida, enriquece y guarda en MongoDB las ofertas de un lote
+        de páginas, actualiza last_seen de las conocidas y confirma su caché HTTP
+        Args:
+            paginas: Páginas extraídas (de uno o varios portales)
+            stats: Estadísticas de la ejecución
+            enrich: Descargar las páginas de detalle pendientes
+        """
+        ofertas = []
+        for pagina in paginas:
+            for oferta in pagina.ofertas:
+                valido, error = validate_oferta_data(oferta)
+                if valido:
+                    ofertas.append(oferta)
+                else:
+                    self.logger.warning(f"Oferta {oferta.get('id')} descartada: {error}")
+                    stats.registrar_invalidas(1)
+        omitidas = [i for pagina in paginas for i in pagina.omitidas]
+        
+        # Etapa opcional: página de detalle de las ofertas aún no enriquecidas
+        if ofertas:
+            stats.registrar_enriquecidas(self._enriquecer(ofertas, enrich))
+        
+        errores = 0
+        if ofertas:
+            self.logger.info(f"Guardando lote de {len(ofertas)} ofertas en MongoDB")
+            try:
+                resultado = self.db_manager.upsert_ofertas_bulk(ofertas)
+                stats.registrar_guardado(resultado)
+                errores = resultado['errores']
+            except Exception as e:
+                self.logger.error(f"Error guardando ofertas: {e}")
+                stats.registrar_error(len(ofertas))
+                errores = len(ofertas)
+        
+        # Las ofertas conocidas sin cambios solo actualizan su last_seen
+        stats.registrar_omitidas(len(omitidas))
+        try:
+            self.db_manager.touch_ofertas(
+                omitidas + [o['id'] for o in ofertas],
+                {o['id']: o['hash_contenedor'] for o in ofertas if o.get('hash_contenedor')}
+            )
+        except Exception as e:
+            self.logger.warning(f"No se pudo actualizar last_seen: {e}")
+        
+        # Solo las páginas ya guardadas se omiten en la próxima ejecución
+        if self.http_cache and errores == 0:
+            self._confirmar_cache(paginas)
+        self._notificar(stats)
     
-    def run_scraping(self, portals: List[str] = None) -> Dict:
+    def run_scraping(self, portals: List[str] = None, concurrency: int = None,
+                     max_pages: int = None, enrich: bool = None, deadline: float = None,
+                     progress: Callable[[Dict], None] = None) -> Dict:
         """
         Ejecuta el scraping de todos los portales especificados
+        Los portales son hosts independientes y se extraen en paralelo; la cortesía
+        por host (HostPolicy) regula las solicitudes a cada uno. Cada página extraída
+        pasa por una cola acotada (StorePipeline) a la etapa de guardado, que escribe
+        en MongoDB por lotes mientras los demás portales siguen descargándose.
+        Los portales con el circuito abierto (PortalBreaker) se omiten, y al alcanzar
+        el tiempo límite se cancelan las descargas pendientes y se guarda lo extraído
         Args:
             portals: Lista de portales a extraer. Si es None, extrae de todos
+            concurrency: Portales extraídos a la vez (por defecto Config.SCRAPING_CONCURRENCY)
+            max_pages: Páginas máximas por portal (por defecto Config.SCRAPING_MAX_PAGES)
+            enrich: Completar las ofertas nuevas con su página de detalle
+                    (por defecto Config.SCRAPING_ENRICH_DETAILS)
+            deadline: Segundos máximos de la ejecución (por defecto Config.SCRAPING_DEADLINE; 0 sin límite)
+            progress: Función que recibe una copia de las estadísticas (con el avance por portal
+                      en 'progreso') cada vez que avanza la extracción; se llama desde varios hilos
         Returns:
             Diccionario con estadísticas de extracción
         """
         start_time = time.time()
-        
-        # Resetear estadísticas
-        self.stats = {
-            'total_encontradas': 0,
-            'nuevas': 0,
-            'actualizadas': 0,
-            'errores': 0,
-            'por_fuente': {}
-        }
-        
-        # Portales disponibles
-        available_portals = {
-            'computrabajo': self.extract_computrabajo,
-            'indeed': self.extract_indeed,
-            'bumeran': self.extract_bumeran,
-            'trabajos': self.extract_trabajos_pe
-        }
+        deadline = Config.SCRAPING_DEADLINE if deadline is None else deadline
+        self._deadline_at = time.monotonic() + deadline if deadline and deadline > 0 else None
+        self._progreso = progress
+        stats = ScrapingStats()
+        with self._seen_lock:
+            self._seen = {}
+        self._enrich_restante = self.enricher.max_ofertas
+        enrich = Config.SCRAPING_ENRICH_DETAILS if enrich is None else enrich
         
         # Si no se especifican portales, extraer de todos
         if not portals:
-            portals = list(available_portals.keys())
-        
-        all_ofertas = []
+            portals = list(PORTALES.keys())
         
+        validos = []
+        self.breaker.load()
         for portal_name in portals:
-            if portal_name.lower() not in available_portals:
+            if portal_name.lower() not in PORTALES:
                 self.logger.warning(f"Portal no reconocido: {portal_name}")
                 continue
-            
-            try:
-                extractor_func = available_portals[portal_name.lower()]
-                ofertas = extractor_func()
-                all_ofertas.extend(ofertas)
-                
-                self.stats['por_fuente'][portal_name] = len(ofertas)
-                self.stats['total_encontradas'] += len(ofertas)
-                
-                self.logger.info(f"✓ {portal_name}: {len(ofertas)} ofertas extraídas")
-                
-                # Pausa entre portales
-                if portal_name != portals[-1]:  # No pausar después del último
-                    time.sleep(random.uniform(5, 10))
-                
-            except Exception as e:
-                self.logger.error(f"✗ Error en {portal_name}: {e}", exc_info=True)
-                self.stats['errores'] += 1
+            permitido, motivo = self.breaker.allow(portal_name.lower())
+            if permitido:
+                validos.append(portal_name)
+            else:
+                self.logger.warning(f"⏸ {portal_name} omitido: {motivo}")
+                stats.registrar_portal_omitido(portal_name)
         
-        # Guardar en base de datos
-        self.logger.info(f"\n=== Guardando {len(all_ofertas)} ofertas en MongoDB ===")
+        pipeline = StorePipeline(lambda paginas: self._guardar_lote(paginas, stats, enrich))
+        # Descargas en hilos (y el event loop del fetcher); parseo y extracción en el pool de procesos
+        self._pool = self._crear_pool(validos) if validos else None
+        try:
+            with pipeline:
+                if validos:
+                    workers = max(1, min(concurrency or Config.SCRAPING_CONCURRENCY, len(validos)))
+                    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scraping') as executor:
+                        futures = {
+                            executor.submit(self._stream_portal, portal_name, max_pages, pipeline, stats): portal_name
+                            for portal_name in validos
+                        }
+                        for future in as_completed(futures):
+                            portal_name = futures[future]
+                            try:
+                                cantidad = future.result()
+                                stats.registrar_portal(portal_name, cantidad)
+                                self.logger.info(f"✓ {portal_name}: {cantidad} ofertas extraídas")
+                                # Un recorrido cortado por el tiempo límite no prueba que el portal esté sano
+                                if not self._vencido():
+                                    self.breaker.record_success(portal_name.lower())
+                            except Exception as e:
+                                self.logger.error(f"✗ Error en {portal_name}: {e}",
+                                                  exc_info=not isinstance(e, PortalNoDisponible))
+                                stats.registrar_fallo_portal(portal_name)
+                                self.breaker.record_failure(portal_name.lower(), e)
+                            self._notificar(stats)
+        finally:
+            if self._pool is not None:
+                # Las páginas que quedaron sin consumir (recorrido detenido) se descartan
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+            if self._vencido():
+                self.logger.warning("Tiempo límite de la ejecución alcanzado; se guardó lo extraído hasta ese momento")
+                stats.registrar_tiempo_agotado()
+            self._deadline_at = None
+            self._progreso = None
         
-        for oferta in all_ofertas:
-            try:
-                if self.db_manager.insert_oferta(oferta):
-                    self.stats['nuevas'] += 1
-                else:
-                    self.stats['actualizadas'] += 1
-            except Exception as e:
-                self.logger.error(f"Error guardando oferta: {e}")
-                self.stats['errores'] += 1
+        if self.selector_plans:
+            self.selector_plans.save()
+        # Tasas por host aprendidas en esta ejecución (AIMD), para la próxima
+        host_policy = getattr(self.fetcher, 'host_policy', None)
+        if host_policy:
+            host_policy.save()
         
         duration = time.time() - start_time
+        self.stats = stats.as_dict()
         
         # Registrar log de extracción
         try:
@@ -666,6 +1188,7 @@ class ScrapingService:
                 'ofertas_encontradas': self.stats['total_encontradas'],
                 'ofertas_nuevas': self.stats['nuevas'],
                 'ofertas_actualizadas': self.stats['actualizadas'],
+                'ofertas_sin_cambios': self.stats['sin_cambios'],
                 'errores': self.stats['errores'],
                 'duracion_segundos': int(duration),
                 'detalles': str(self.stats)
@@ -681,6 +1204,14 @@ class ScrapingService:
         self.logger.info(f"Total encontradas: {self.stats['total_encontradas']}")
         self.logger.info(f"Nuevas: {self.stats['nuevas']}")
         self.logger.info(f"Actualizadas: {self.stats['actualizadas']}")
+        self.logger.info(f"Sin cambios: {self.stats['sin_cambios']}")
+        self.logger.info(f"Conocidas omitidas: {self.stats['omitidas']}")
+        self.logger.info(f"Enriquecidas con detalle: {self.stats['enriquecidas']}")
+        self.logger.info(f"Descartadas por validación: {self.stats['invalidas']}")
+        if self.stats['portales_omitidos']:
+            self.logger.info(f"Portales omitidos (circuito abierto): {', '.join(self.stats['portales_omitidos'])}")
+        if self.stats['tiempo_agotado']:
+            self.logger.info("Tiempo límite alcanzado: extracción incompleta")
         self.logger.info(f"Errores: {self.stats['errores']}")
         self.logger.info(f"Duración: {duration:.2f} segundos")
         self.logger.info(f"\nPor fuente:")
@@ -691,21 +1222,102 @@ class ScrapingService:
         return self.stats
 
 
+# Servicio de extracción de cada proceso del pool y, por portal, su índice de ofertas
+# guardadas y el orden de selectores de la ejecución (los recibe _iniciar_proceso)
+_servicio_proceso: Optional[ScrapingService] = None
+_portales_proceso: Dict[str, Tuple[SeenIndex, Dict[str, List[str]]]] = {}
+
+
+def _iniciar_proceso(portales: Dict[str, Tuple[SeenIndex, Dict[str, List[str]]]]):
+    """
+    Inicializador de cada proceso del pool: crea una sola vez su servicio de extracción y
+    guarda los índices y órdenes de selectores, que así no viajan con cada página
+    Args:
+        portales: {nombre del portal: (índice de ofertas guardadas, orden de selectores por campo)}
+    """
+    global _servicio_proceso, _portales_proceso
+    _servicio_proceso = ScrapingService.solo_extraccion()
+    _portales_proceso = portales
+
+
+def _extraer_pagina(content: bytes, portal_name: str, url: str,
+                    container_selectors: List[str]) -> Tuple[List[Dict], int, List[str], Counter, Counter]:
+    """
+    Parsea y extrae una página en un proceso del pool: recibe los bytes descargados y
+    retorna diccionarios de ofertas
+    Args:
+        content: HTML de la página
+        portal_name: Nombre del portal
+        url: URL de la página
+        container_selectors: Selectores CSS de contenedores del portal
+    Returns:
+        Tupla (ofertas, contenedores, IDs omitidos, intentos y aciertos de los selectores)
+    """
+    seen, orden = _portales_proceso[portal_name]
+    plan = _PlanPagina(None, portal_name, orden)
+    ofertas, contenedores, omitidas = _servicio_proceso._extract_from_soup(
+        parse_html(content), portal_name, url, container_selectors, seen, plan
+    )
+    return ofertas, contenedores, omitidas, plan.intentos, plan.aciertos
+
+
+def parse_duracion(valor: str) -> float:
+    """
+    Convierte una duración ("120", "120s", "5m", "1h") a segundos
+    Raises:
+        argparse.ArgumentTypeError: Si el formato no es válido
+    """
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*', str(valor).lower())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Duración inválida: {valor} (use p. ej. 120s, 5m o 1h)")
+    return float(match.group(1)) * {'': 1, 's': 1, 'm': 60, 'h': 3600}[match.group(2)]
+
+
 def main():
     """Función principal para ejecutar el servicio"""
     parser = argparse.ArgumentParser(description='Servicio de Scraping de Ofertas Laborales')
     parser.add_argument(
         '--portals',
         nargs='+',
-        choices=['computrabajo', 'indeed', 'bumeran', 'trabajos', 'all'],
+        choices=list(PORTALES.keys()) + ['all'],
         default=['all'],
         help='Portales a extraer (por defecto: all)'
     )
     parser.add_argument(
         '--mongodb-uri',
         type=str,
-        default='mongodb://localhost:27017/',
-        help='URI de conexión a MongoDB'
+        default=Config.MONGODB_URI,
+        help='URI de conexión a MongoDB (por defecto: MONGODB_URI)'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=Config.SCRAPING_CONCURRENCY,
+        help=f'Portales extraídos en paralelo (por defecto: {Config.SCRAPING_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--max-pages',
+        type=int,
+        default=Config.SCRAPING_MAX_PAGES,
+        help=f'Páginas máximas por portal (por defecto: {Config.SCRAPING_MAX_PAGES})'
+    )
+    parser.add_argument(
+        '--deadline',
+        type=parse_duracion,
+        default=Config.SCRAPING_DEADLINE,
+        help='Tiempo máximo de la ejecución, p. ej. 120s, 5m o 1h (por defecto: sin límite)'
+    )
+    parser.add_argument(
+        '--parse-workers',
+        type=int,
+        default=Config.SCRAPING_PARSE_WORKERS,
+        help=f'Procesos que parsean las páginas; 0 las parsea en los hilos (por defecto: {Config.SCRAPING_PARSE_WORKERS})'
+    )
+    parser.add_argument(
+        '--enrich',
+        action='store_true',
+        default=Config.SCRAPING_ENRICH_DETAILS,
+        help='Completar las ofertas nuevas con su página de detalle'
     )
     
     args = parser.parse_args()
@@ -713,12 +1325,13 @@ def main():
     # Inicializar servicio
     try:
         db_manager = MongoDBManager(args.mongodb_uri)
-        service = ScrapingService(db_manager)
+        service = ScrapingService(db_manager, parse_workers=args.parse_workers)
         
         portals = None if 'all' in args.portals else args.portals
         
         # Ejecutar scraping
-        service.run_scraping(portals)
+        service.run_scraping(portals, concurrency=args.concurrency, max_pages=args.max_pages,
+                             enrich=args.enrich, deadline=args.deadline)
         
     except Exception as e:
         logging.error(f"Error ejecutando el servicio: {e}", exc_info=True)
@@ -0,0 +1,62 @@
+"""
+Índice compacto de ofertas ya guardadas
+Guarda los IDs (16 dígitos hexadecimales) y el hash de su contenedor HTML como
+enteros de 64 bits en arreglos ordenados, para decidir con una búsqueda binaria
+si un contenedor ya se extrajo y no cambió
+"""
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Optional, Tuple
+
+
+def _to_int(valor: Optional[str]) -> Optional[int]:
+    """Convierte un hash hexadecimal de 16 dígitos a entero (None si no es válido)"""
+    if not valor or len(valor) != 16:
+        return None
+    try:
+        return int(valor, 16)
+    except ValueError:
+        return None
+
+
+class SeenIndex:
+    """Conjunto ordenado de IDs conocidos con el hash de contenedor de cada uno"""
+
+    def __init__(self, pares: Iterable[Tuple[str, Optional[str]]] = ()):
+        """
+        Args:
+            pares: Tuplas (id de la oferta, hash del contenedor o None)
+        """
+        entradas = []
+        for oferta_id, hash_contenedor in pares:
+            clave = _to_int(oferta_id)
+            if clave is not None:
+                entradas.append((clave, _to_int(hash_contenedor) or 0))
+        entradas.sort()
+        self._ids = array('Q', (clave for clave, _ in entradas))
+        self._hashes = array('Q', (h for _, h in entradas))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _position(self, oferta_id: str) -> int:
+        clave = _to_int(oferta_id)
+        if clave is None:
+            return -1
+        pos = bisect_left(self._ids, clave)
+        if pos < len(self._ids) and self._ids[pos] == clave:
+            return pos
+        return -1
+
+    def __contains__(self, oferta_id: str) -> bool:
+        return self._position(oferta_id) >= 0
+
+    def unchanged(self, oferta_id: str, hash_contenedor: str) -> bool:
+        """
+        Indica si la oferta ya está guardada con el mismo contenedor
+        Args:
+            oferta_id: ID de la oferta
+            hash_contenedor: Hash del contenedor HTML actual
+        """
+        pos = self._position(oferta_id)
+        return pos >= 0 and self._hashes[pos] != 0 and self._hashes[pos] == _to_int(hash_contenedor)
@@ -0,0 +1,106 @@
+"""
+Planes de selectores aprendidos por portal
+Registra qué selectores (de contenedores y de cada campo) dieron resultado en cada
+portal, para probarlos primero en las siguientes páginas y ejecuciones. Los demás
+selectores de la cascada se prueban después, solo cuando el plan no encuentra nada.
+Se guarda en un archivo JSON local junto con los intentos y aciertos de cada selector
+"""
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from typing import Dict, List, Tuple
+
+
+class SelectorPlans:
+    """Intentos y aciertos por portal, campo y selector"""
+
+    def __init__(self, path: str = None):
+        """
+        Args:
+            path: Archivo JSON de los planes (None los mantiene solo en memoria)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self._lock = threading.Lock()
+        # {portal: {campo: {selector: [intentos, aciertos]}}}
+        self._planes: Dict[str, Dict[str, Dict[str, List[int]]]] = {}
+        self._load()
+
+    def _load(self):
+        """Carga los planes guardados (un archivo dañado se ignora)"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._planes = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"No se pudieron cargar los planes de selectores: {e}")
+            self._planes = {}
+
+    def save(self):
+        """Guarda los planes en el archivo (escritura atómica)"""
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self._planes, ensure_ascii=False, indent=2, sort_keys=True)
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            self.logger.warning(f"No se pudieron guardar los planes de selectores: {e}")
+
+    def order(self, portal: str, campo: str, cascada: List[str]) -> List[str]:
+        """
+        Ordena una cascada de selectores: primero los que ya acertaron en el portal
+        (plan aprendido) y luego el resto, ambos en el orden original
+        Args:
+            portal: Nombre del portal
+            campo: Campo extraído (contenedor, titulo, empresa, ...)
+            cascada: Selectores en el orden de prueba original
+        """
+        with self._lock:
+            conteos = self._planes.get(portal, {}).get(campo, {})
+            aprendidos = [s for s in cascada if conteos.get(s, (0, 0))[1] > 0]
+        if not aprendidos:
+            return list(cascada)
+        return aprendidos + [s for s in cascada if s not in aprendidos]
+
+    def record(self, portal: str, intentos: Counter, aciertos: Counter):
+        """
+        Suma los resultados de una página
+        Args:
+            portal: Nombre del portal
+            intentos: Veces que se probó cada (campo, selector)
+            aciertos: Veces que cada (campo, selector) dio el valor
+        """
+        with self._lock:
+            plan = self._planes.setdefault(portal, {})
+            for (campo, selector), veces in intentos.items():
+                conteo = plan.setdefault(campo, {}).setdefault(selector, [0, 0])
+                conteo[0] += veces
+                conteo[1] += aciertos.get((campo, selector), 0)
+
+    def hit_rates(self, portal: str = None) -> Dict[str, Dict[str, List[Tuple[str, int, int, float]]]]:
+        """
+        Tasa de aciertos de cada selector
+        Args:
+            portal: Limitar a un portal (por defecto todos)
+        Returns:
+            {portal: {campo: [(selector, intentos, aciertos, tasa), ...]}} ordenado por aciertos
+        """
+        with self._lock:
+            planes = {p: c for p, c in self._planes.items() if portal is None or p == portal}
+            resultado = {}
+            for nombre, campos in planes.items():
+                resultado[nombre] = {}
+                for campo, selectores in campos.items():
+                    filas = [
+                        (selector, intentos, aciertos, round(aciertos / intentos, 3) if intentos else 0.0)
+                        for selector, (intentos, aciertos) in selectores.items()
+                    ]
+                    resultado[nombre][campo] = sorted(filas, key=lambda f: (-f[2], f[0]))
+        return resultado
@@ -0,0 +1,210 @@
+"""
+Contadores de estadísticas materializados
+Mantiene un único documento en la colección 'stats' con los conteos por
+nivel académico, modalidad, fuente y empresa, actualizado de forma incremental
+al insertar, modificar o eliminar ofertas
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import unquote
+
+# Campo de la oferta -> clave del documento de estadísticas
+DIMENSIONES = {
+    'nivel_academico': 'por_nivel',
+    'modalidad': 'por_modalidad',
+    'fuente': 'por_fuente',
+    'empresa': 'por_empresa'
+}
+
+# Proyección con los campos necesarios para calcular los deltas
+PROYECCION_DIMENSIONES = {campo: 1 for campo in DIMENSIONES}
+
+
+def encode_key(valor) -> str:
+    """
+    Codifica un valor para usarlo como nombre de campo en MongoDB
+    ('.' y '$' no están permitidos; None y '' se representan aparte)
+    """
+    if valor is None:
+        return '%null'
+    texto = str(valor)
+    if not texto:
+        return '%empty'
+    return texto.replace('%', '%25').replace('.', '%2E').replace('$', '%24')
+
+
+def decode_key(clave: str) -> Optional[str]:
+    """Decodifica un nombre de campo generado por encode_key"""
+    if clave == '%null':
+        return None
+    if clave == '%empty':
+        return ''
+    return unquote(clave)
+
+
+def aggregate_estadisticas(collection, query: Dict = None, top_empresas: int = 10) -> Dict:
+    """
+    Calcula todas las estadísticas en un único recorrido con $facet
+    Args:
+        collection: Colección de ofertas
+        query: Consulta para limitar las estadísticas a un subconjunto
+        top_empresas: Número de empresas a incluir (None = todas)
+    Returns:
+        Diccionario con estadísticas
+    """
+    empresas = [
+        {'$group': {'_id': '$empresa', 'count': {'$sum': 1}}},
+        {'$sort': {'count': -1}}
+    ]
+    if top_empresas:
+        empresas.append({'$limit': top_empresas})
+
+    pipeline = []
+    if query:
+        # $text debe ser la primera etapa del pipeline
+        pipeline.append({'$match': query})
+    pipeline.append({'$facet': {
+        'total': [{'$count': 'n'}],
+        'por_nivel': [{'$group': {'_id': '$nivel_academico', 'count': {'$sum': 1}}}],
+        'por_modalidad': [{'$group': {'_id': '$modalidad', 'count': {'$sum': 1}}}],
+        'por_fuente': [{'$group': {'_id': '$fuente', 'count': {'$sum': 1}}}],
+        'top_empresas': empresas
+    }})
+
+    resultado = next(collection.aggregate(pipeline), {})
+    total = resultado.get('total') or [{'n': 0}]
+
+    return {
+        'total_ofertas': total[0]['n'],
+        'por_nivel': {item['_id']: item['count'] for item in resultado.get('por_nivel', [])},
+        'por_modalidad': {item['_id']: item['count'] for item in resultado.get('por_modalidad', [])},
+        'por_fuente': {item['_id']: item['count'] for item in resultado.get('por_fuente', [])},
+        'top_empresas': {item['_id']: item['count'] for item in resultado.get('top_empresas', [])}
+    }
+
+
+class StatsCounters:
+    """Lectura y mantenimiento del documento de estadísticas materializadas"""
+
+    DOCUMENT_ID = 'ofertas'
+
+    def __init__(self, collection):
+        """
+        Args:
+            collection: Colección 'stats' de pymongo
+        """
+        self.collection = collection
+
+    @staticmethod
+    def delta(antes: Optional[Dict], despues: Optional[Dict]) -> Counter:
+        """
+        Calcula los incrementos que produce un cambio de una oferta
+        Args:
+            antes: Oferta antes del cambio (None si es nueva)
+            despues: Oferta después del cambio (None si se eliminó)
+        Returns:
+            Counter ruta -> incremento (por ejemplo 'por_nivel.Bachiller': 1)
+        """
+        cambios = Counter()
+        if antes is None and despues is not None:
+            cambios['total'] += 1
+        elif antes is not None and despues is None:
+            cambios['total'] -= 1
+
+        for campo, clave in DIMENSIONES.items():
+            if antes is not None:
+                cambios[f"{clave}.{encode_key(antes.get(campo))}"] -= 1
+            if despues is not None:
+                cambios[f"{clave}.{encode_key(despues.get(campo))}"] += 1
+        return cambios
+
+    @staticmethod
+    def delta_from_estadisticas(stats: Dict, signo: int = 1) -> Counter:
+        """
+        Convierte estadísticas agregadas (formato de _aggregate_estadisticas) en incrementos
+        Args:
+            stats: Estadísticas con total_ofertas, por_nivel, ... y top_empresas completo
+            signo: 1 para sumar, -1 para restar
+        """
+        cambios = Counter({'total': signo * stats.get('total_ofertas', 0)})
+        origen = dict(stats, por_empresa=stats.get('top_empresas', {}))
+        for clave in DIMENSIONES.values():
+            for valor, cantidad in origen.get(clave, {}).items():
+                cambios[f"{clave}.{encode_key(valor)}"] += signo * cantidad
+        return cambios
+
+    def apply(self, cambios: Counter):
+        """
+        Aplica los incrementos al documento de estadísticas
+        Si el documento aún no existe (sin `stats rebuild`) no se crea, para no
+        guardar conteos parciales; get_estadisticas usa la agregación mientras tanto
+        Args:
+            cambios: Counter ruta -> incremento
+        """
+        incrementos = {ruta: valor for ruta, valor in cambios.items() if valor}
+        if not incrementos:
+            return
+        self.collection.update_one(
+            {'_id': self.DOCUMENT_ID},
+            {'$inc': incrementos, '$set': {'updated_at': datetime.now()}}
+        )
+
+    def read(self, top_empresas: int = 10) -> Optional[Dict]:
+        """
+        Lee las estadísticas materializadas
+        Args:
+            top_empresas: Número de empresas a incluir
+        Returns:
+            Estadísticas en el formato del dashboard o None si no existen
+        """
+        doc = self.collection.find_one({'_id': self.DOCUMENT_ID})
+        if not doc:
+            return None
+
+        def decodificar(mapa: Dict) -> Dict:
+            return {decode_key(k): v for k, v in (mapa or {}).items() if v > 0}
+
+        empresas = decodificar(doc.get('por_empresa'))
+        return {
+            'total_ofertas': max(0, doc.get('total', 0)),
+            'por_nivel': decodificar(doc.get('por_nivel')),
+            'por_modalidad': decodificar(doc.get('por_modalidad')),
+            'por_fuente': decodificar(doc.get('por_fuente')),
+            'top_empresas': dict(Counter(empresas).most_common(top_empresas))
+        }
+
+    def rebuild(self, ofertas_collection) -> Dict:
+        """
+        Recalcula el documento desde la colección de ofertas (corrige desvíos)
+        Args:
+            ofertas_collection: Colección de ofertas
+        Returns:
+            Estadísticas recalculadas (con todas las empresas)
+        """
+        stats = aggregate_estadisticas(ofertas_collection, top_empresas=None)
+        self.replace(stats)
+        return stats
+
+    def replace(self, stats: Dict):
+        """
+        Reemplaza el documento con estadísticas recalculadas (corrige desvíos)
+        Args:
+            stats: Estadísticas completas (top_empresas con todas las empresas)
+        """
+        def codificar(mapa: Dict) -> Dict:
+            return {encode_key(k): v for k, v in mapa.items()}
+
+        self.collection.replace_one(
+            {'_id': self.DOCUMENT_ID},
+            {
+                '_id': self.DOCUMENT_ID,
+                'total': stats.get('total_ofertas', 0),
+                'por_nivel': codificar(stats.get('por_nivel', {})),
+                'por_modalidad': codificar(stats.get('por_modalidad', {})),
+                'por_fuente': codificar(stats.get('por_fuente', {})),
+                'por_empresa': codificar(stats.get('top_empresas', {})),
+                'updated_at': datetime.now()
+            },
+            upsert=True
+        )
@@ -2,7 +2,8 @@
 Módulo de utilidades
 """
 from .validators import validate_oferta_data, validate_user_data
-from .helpers import format_date, generate_oferta_id
+from .helpers import format_date, generate_oferta_id, normalize_text, build_search_fields
 
-__all__ = ['validate_oferta_data', 'validate_user_data', 'format_date', 'generate_oferta_id']
+__all__ = ['validate_oferta_data', 'validate_user_data', 'format_date', 'generate_oferta_id',
+           'normalize_text', 'build_search_fields']
 
@@ -3,7 +3,8 @@ Funciones auxiliares
 """
 from datetime import datetime
 import hashlib
-from typing import Optional
+import unicodedata
+from typing import Dict, Optional
 
 
 def format_date(date_value) -> Optional[str]:
@@ -60,3 +61,36 @@ def truncate_text(text: str, max_length: int = 200) -> str:
     
     return text[:max_length - 3] + "..."
 
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza un texto para búsquedas: minúsculas y sin tildes
+    ("Técnico" -> "tecnico", "Diseño" -> "diseno")
+    Args:
+        text: Texto a normalizar
+    Returns:
+        Texto normalizado
+    """
+    if not text:
+        return ""
+    
+    descompuesto = unicodedata.normalize('NFKD', str(text))
+    sin_tildes = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(sin_tildes.lower().split())
+
+
+def build_search_fields(oferta: Dict) -> Dict:
+    """
+    Construye los campos normalizados que usa el índice de texto
+    Args:
+        oferta: Diccionario con los datos de la oferta
+    Returns:
+        Diccionario con busqueda_principal y busqueda_detalle
+    """
+    principal = ' '.join(str(oferta.get(campo) or '') for campo in ('titulo_oferta', 'puesto', 'empresa'))
+    detalle = ' '.join(str(oferta.get(campo) or '') for campo in ('conocimientos_clave', 'responsabilidades_breve'))
+    return {
+        'busqueda_principal': normalize_text(principal),
+        'busqueda_detalle': normalize_text(detalle)
+    }
@@ -24,7 +24,31 @@ class Config:
     
     # MongoDB Configuration (Base de datos principal)
     MONGODB_URI = os.environ.get('MONGODB_URI') or 'mongodb://localhost:27017/'
-    MONGODB_DATABASE = 'ofertas_laborales'
+    MONGODB_DATABASE = os.environ.get('MONGODB_DATABASE') or 'ofertas_laborales'
+    
+    # Pool de conexiones compartido por proceso (un único MongoClient)
+    MONGODB_MAX_POOL_SIZE = int(os.environ.get('MONGODB_MAX_POOL_SIZE', 50))
+    MONGODB_MIN_POOL_SIZE = int(os.environ.get('MONGODB_MIN_POOL_SIZE', 0))
+    MONGODB_MAX_IDLE_TIME_MS = int(os.environ.get('MONGODB_MAX_IDLE_TIME_MS', 60000))
+    # Compresión de red: lista separada por comas (zlib, snappy, zstd). Vacío = sin compresión
+    MONGODB_COMPRESSORS = os.environ.get('MONGODB_COMPRESSORS', 'zlib')
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    MONGODB_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGODB_CONNECT_TIMEOUT_MS', 5000))
+    MONGODB_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGODB_SOCKET_TIMEOUT_MS', 20000))
+    
+    # Circuit breaker de la conexión: heartbeat en segundo plano en lugar de ping por consulta
+    MONGODB_HEALTH_PROBE_INTERVAL = float(os.environ.get('MONGODB_HEALTH_PROBE_INTERVAL', 10))
+    MONGODB_HEALTH_FAILURE_THRESHOLD = int(os.environ.get('MONGODB_HEALTH_FAILURE_THRESHOLD', 1))
+    
+    # Datos de simulación: 'auto' = sin conexión o con la base de datos vacía,
+    # 'offline' = solo cuando MongoDB no está disponible
+    MOCK_DATA_MODE = os.environ.get('MOCK_DATA_MODE', 'auto').lower()
+    
+    # Caché de consultas de ofertas (LRU + TTL en segundos; 0 la desactiva)
+    QUERY_CACHE_SIZE = int(os.environ.get('QUERY_CACHE_SIZE', 256))
+    QUERY_CACHE_TTL = float(os.environ.get('QUERY_CACHE_TTL', 30))
+    # Segundos entre lecturas de la generación de datos compartida entre procesos
+    QUERY_CACHE_SYNC_INTERVAL = float(os.environ.get('QUERY_CACHE_SYNC_INTERVAL', 5))
     
     # ========================================
     # CONFIGURACIÓN DE WEB SCRAPING
@@ -32,11 +56,88 @@ class Config:
     USER_AGENT = os.environ.get('USER_AGENT') or 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     REQUEST_TIMEOUT = int(os.environ.get('REQUEST_TIMEOUT', 30))
     MAX_RETRIES = int(os.environ.get('MAX_RETRIES', 3))
+    # Tamaño de lote para guardar ofertas con bulk_write
+    BULK_BATCH_SIZE = int(os.environ.get('BULK_BATCH_SIZE', 500))
+    # Portales extraídos en paralelo y cortesía por host (solicitudes simultáneas y
+    # segundos entre el inicio de dos solicitudes al mismo host)
+    SCRAPING_CONCURRENCY = int(os.environ.get('SCRAPING_CONCURRENCY', 4))
+    SCRAPING_HOST_CONCURRENCY = int(os.environ.get('SCRAPING_HOST_CONCURRENCY', 1))
+    SCRAPING_HOST_DELAY_MIN = float(os.environ.get('SCRAPING_HOST_DELAY_MIN', 2))
+    SCRAPING_HOST_DELAY_MAX = float(os.environ.get('SCRAPING_HOST_DELAY_MAX', 5))
+    # Tasa adaptativa por host (token bucket con AIMD): solicitudes acumulables, aumento de la
+    # tasa (solicitudes/segundo) por respuesta correcta, pausa máxima que se espera ante un
+    # 429/403 con Retry-After y archivo JSON de las tasas aprendidas (vacío: solo en memoria)
+    SCRAPING_HOST_BURST = int(os.environ.get('SCRAPING_HOST_BURST', 1))
+    SCRAPING_HOST_RATE_STEP = float(os.environ.get('SCRAPING_HOST_RATE_STEP', 0.05))
+    SCRAPING_HOST_MAX_COOLDOWN = float(os.environ.get('SCRAPING_HOST_MAX_COOLDOWN', 120))
+    SCRAPING_HOST_RATES_PATH = os.environ.get('SCRAPING_HOST_RATES_PATH', 'host_rates.json')
+    # Recorrido de listados: páginas máximas por portal y páginas descargadas a la vez
+    SCRAPING_MAX_PAGES = int(os.environ.get('SCRAPING_MAX_PAGES', 10))
+    SCRAPING_PAGE_CONCURRENCY = int(os.environ.get('SCRAPING_PAGE_CONCURRENCY', 2))
+    # Procesos que parsean y extraen las páginas descargadas (0 las procesa en los hilos de descarga)
+    SCRAPING_PARSE_WORKERS = int(os.environ.get('SCRAPING_PARSE_WORKERS', os.cpu_count() or 1))
+    # Tiempo máximo de cada ejecución en segundos (0 sin límite) y circuit breaker por portal:
+    # ejecuciones seguidas con fallo que lo abren y segundos que el portal se omite
+    SCRAPING_DEADLINE = float(os.environ.get('SCRAPING_DEADLINE', 0))
+    SCRAPING_BREAKER_THRESHOLD = int(os.environ.get('SCRAPING_BREAKER_THRESHOLD', 3))
+    SCRAPING_BREAKER_COOLDOWN = float(os.environ.get('SCRAPING_BREAKER_COOLDOWN', 1800))
+    # Trabajos de extracción lanzados desde la web: segundos de vigencia del lease que el
+    # proceso que lo ejecuta renueva periódicamente (vencido, el trabajo se da por abandonado)
+    # y segundos mínimos entre escrituras de su avance
+    SCRAPING_JOB_LEASE = float(os.environ.get('SCRAPING_JOB_LEASE', 120))
+    SCRAPING_JOB_PROGRESS_INTERVAL = float(os.environ.get('SCRAPING_JOB_PROGRESS_INTERVAL', 1))
+    # Procesos de parseo de los trabajos lanzados desde la web (0: en los hilos, sin pool
+    # de procesos por cada clic en el proceso del servidor)
+    SCRAPING_JOB_PARSE_WORKERS = int(os.environ.get('SCRAPING_JOB_PARSE_WORKERS', 0))
+    # Guardado en streaming: páginas extraídas en espera como máximo (los portales esperan
+    # con la cola llena) y segundos sin páginas nuevas tras los que se guarda un lote incompleto
+    SCRAPING_QUEUE_SIZE = int(os.environ.get('SCRAPING_QUEUE_SIZE', 20))
+    SCRAPING_FLUSH_INTERVAL = float(os.environ.get('SCRAPING_FLUSH_INTERVAL', 2))
+    # Motor HTTP asíncrono (aiohttp): conexiones keep-alive totales y por host, caché de DNS (segundos)
+    HTTP_MAX_CONNECTIONS = int(os.environ.get('HTTP_MAX_CONNECTIONS', 20))
+    HTTP_MAX_CONNECTIONS_PER_HOST = int(os.environ.get('HTTP_MAX_CONNECTIONS_PER_HOST', 4))
+    HTTP_DNS_CACHE_TTL = int(os.environ.get('HTTP_DNS_CACHE_TTL', 300))
+    # Caché HTTP en disco (SQLite) con ETag/Last-Modified y hash de contenido; vacío la desactiva
+    HTTP_CACHE_PATH = os.environ.get('HTTP_CACHE_PATH', 'http_cache.sqlite3')
+    HTTP_CACHE_MAX_ENTRIES = int(os.environ.get('HTTP_CACHE_MAX_ENTRIES', 2000))
+    # Parser HTML: 'auto' usa lxml si está instalado y si no html.parser
+    HTML_PARSER = os.environ.get('HTML_PARSER', 'auto')
+    # Planes de selectores aprendidos por portal (JSON local; vacío los mantiene solo en memoria)
+    SELECTOR_PLANS_PATH = os.environ.get('SELECTOR_PLANS_PATH', 'selector_plans.json')
+    # Enriquecimiento con la página de detalle de las ofertas nuevas: activado,
+    # páginas descargadas a la vez y ofertas enriquecidas como máximo por ejecución
+    SCRAPING_ENRICH_DETAILS = os.environ.get('SCRAPING_ENRICH_DETAILS', 'False').lower() == 'true'
+    SCRAPING_ENRICH_CONCURRENCY = int(os.environ.get('SCRAPING_ENRICH_CONCURRENCY', 4))
+    SCRAPING_ENRICH_MAX = int(os.environ.get('SCRAPING_ENRICH_MAX', 50))
     
     # ========================================
     # CONFIGURACIÓN DE BÚSQUEDA
     # ========================================
     TACNA_KEYWORDS = ['tacna', 'tacneño', 'tacneña']
+    # Vocabulario de conocimientos clave que se detecta en las ofertas (en minúsculas;
+    # el orden define cuáles se conservan cuando hay más del máximo por oferta)
+    SKILL_KEYWORDS = [
+        'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node.js', 'php', 'ruby',
+        'sql', 'mysql', 'postgresql', 'mongodb', 'oracle', 'sql server', 'database',
+        'html', 'css', 'bootstrap', 'jquery', 'ajax', 'json', 'xml', 'rest', 'api',
+        'git', 'github', 'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'cloud', 'devops',
+        'linux', 'windows', 'unix', 'bash', 'powershell',
+        'excel', 'word', 'powerpoint', 'office', 'google workspace', 'microsoft office',
+        'sap', 'erp', 'crm', 'salesforce',
+        'marketing digital', 'seo', 'sem', 'redes sociales', 'content marketing',
+        'ventas', 'negociación', 'atención al cliente', 'comercial',
+        'comunicación', 'liderazgo', 'trabajo en equipo', 'gestión de proyectos',
+        'agile', 'scrum', 'planificación', 'organización',
+        'administración', 'contabilidad', 'finanzas', 'auditoría', 'tributación',
+        'recursos humanos', 'rrhh', 'selección', 'capacitación',
+        'logística', 'cadena de suministro', 'almacén', 'inventario',
+        'ingeniería', 'mantenimiento', 'producción', 'calidad',
+        'enfermería', 'salud', 'medicina', 'farmacia',
+        'diseño gráfico', 'autocad', 'solidworks', 'photoshop', 'illustrator',
+        'inglés', 'english', 'portugués', 'francés'
+    ]
+    # Archivo opcional con conocimientos adicionales (uno por línea, # para comentarios)
+    SKILL_KEYWORDS_FILE = os.environ.get('SKILL_KEYWORDS_FILE', '')
     JOB_LEVELS = ['practicante', 'bachiller', 'profesional', 'egresado', 'universitario', 'estudiante']
     VALID_ACADEMIC_LEVELS = ['Practicante', 'Bachiller', 'Profesional']
     
@@ -54,6 +155,8 @@ class Config:
     # CONFIGURACIÓN DE PAGINACIÓN
     # ========================================
     OFERTAS_PER_PAGE = int(os.environ.get('OFERTAS_PER_PAGE', 20))
+    # Límite máximo del parámetro 'limit' en /api/ofertas
+    API_MAX_LIMIT = int(os.environ.get('API_MAX_LIMIT', 100))
     MAX_RESULTS = int(os.environ.get('MAX_RESULTS', 1000))
     
     # ========================================
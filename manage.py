@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Comandos de administración del sistema
+
+Uso:
+    python manage.py db migrate [--target N] [--drop-stale]
+    python manage.py db status
+    python manage.py db drop-stale [--dry-run]
+    python manage.py stats rebuild
+    python manage.py selectors report [--portal NOMBRE]
+"""
+import argparse
+import logging
+import sys
+
+from config.settings import Config
+from app.services.database_service import MongoDBManager
+from app.services.migrations import MigrationRunner
+from app.services.selector_plans import SelectorPlans
+
+
+def get_runner(mongodb_uri: str):
+    """Crea el MigrationRunner sobre la base de datos configurada"""
+    db_manager = MongoDBManager(mongodb_uri)
+    if not db_manager._connected:
+        print("✗ MongoDB no está disponible")
+        return db_manager, None
+    return db_manager, MigrationRunner(db_manager.db)
+
+
+def cmd_db_migrate(args) -> int:
+    """Aplica las migraciones pendientes"""
+    db_manager, runner = get_runner(args.mongodb_uri)
+    if runner is None:
+        return 1
+    try:
+        applied = runner.migrate(args.target)
+        if applied:
+            print(f"✓ Migraciones aplicadas: {', '.join(str(v) for v in applied)}")
+        else:
+            print("✓ El esquema ya está actualizado")
+        print(f"  Versión actual: {runner.current_version()}")
+
+        if args.drop_stale:
+            for collection, name in runner.drop_stale_indexes():
+                print(f"  - Índice eliminado: {collection}.{name}")
+        return 0
+    finally:
+        db_manager.close()
+
+
+def cmd_db_status(args) -> int:
+    """Muestra la versión del esquema y las migraciones pendientes"""
+    db_manager, runner = get_runner(args.mongodb_uri)
+    if runner is None:
+        return 1
+    try:
+        print(f"Versión actual: {runner.current_version()}")
+        pending = runner.pending()
+        if pending:
+            print("Migraciones pendientes:")
+            for migration in pending:
+                print(f"  - {migration.version}: {migration.descripcion}")
+        else:
+            print("No hay migraciones pendientes")
+
+        stale = runner.stale_indexes()
+        if stale:
+            print("Índices no declarados (usar 'db drop-stale'):")
+            for collection, name in stale:
+                print(f"  - {collection}.{name}")
+        return 0
+    finally:
+        db_manager.close()
+
+
+def cmd_db_drop_stale(args) -> int:
+    """Elimina los índices que no están declarados en el registro de migraciones"""
+    db_manager, runner = get_runner(args.mongodb_uri)
+    if runner is None:
+        return 1
+    try:
+        stale = runner.drop_stale_indexes(dry_run=args.dry_run)
+        action = "Se eliminaría" if args.dry_run else "Eliminado"
+        for collection, name in stale:
+            print(f"  - {action}: {collection}.{name}")
+        if not stale:
+            print("✓ No hay índices obsoletos")
+        return 0
+    finally:
+        db_manager.close()
+
+
+def cmd_stats_rebuild(args) -> int:
+    """Recalcula las estadísticas materializadas desde la colección de ofertas"""
+    db_manager = MongoDBManager(args.mongodb_uri)
+    if not db_manager._connected:
+        print("✗ MongoDB no está disponible")
+        return 1
+    try:
+        stats = db_manager.rebuild_estadisticas()
+        print(f"✓ Estadísticas recalculadas: {stats['total_ofertas']} ofertas, "
+              f"{len(stats['top_empresas'])} empresas")
+        return 0
+    finally:
+        db_manager.close()
+
+
+def cmd_selectors_report(args) -> int:
+    """Muestra la tasa de aciertos de los selectores aprendidos por portal"""
+    if not Config.SELECTOR_PLANS_PATH:
+        print("✗ SELECTOR_PLANS_PATH está vacío: los planes no se guardan")
+        return 1
+    planes = SelectorPlans(Config.SELECTOR_PLANS_PATH).hit_rates(args.portal)
+    if not planes:
+        print("No hay planes de selectores registrados")
+        return 0
+    for portal, campos in sorted(planes.items()):
+        print(f"\n{portal}")
+        for campo, filas in sorted(campos.items()):
+            print(f"  {campo}")
+            for selector, intentos, aciertos, tasa in filas:
+                print(f"    {tasa:>6.1%}  {aciertos:>6}/{intentos:<6}  {selector}")
+    return 0
+
+
+def main(argv=None) -> int:
+    """Función principal de la línea de comandos"""
+    parser = argparse.ArgumentParser(description='Administración del Sistema de Ofertas Laborales')
+    parser.add_argument(
+        '--mongodb-uri',
+        type=str,
+        default=Config.MONGODB_URI,
+        help='URI de conexión a MongoDB'
+    )
+    subparsers = parser.add_subparsers(dest='group', required=True)
+
+    db_parser = subparsers.add_parser('db', help='Comandos de base de datos')
+    db_commands = db_parser.add_subparsers(dest='command', required=True)
+
+    migrate_parser = db_commands.add_parser('migrate', help='Aplica las migraciones pendientes')
+    migrate_parser.add_argument('--target', type=int, default=None, help='Versión máxima a aplicar')
+    migrate_parser.add_argument('--drop-stale', action='store_true',
+                                help='Elimina los índices no declarados después de migrar')
+    migrate_parser.set_defaults(func=cmd_db_migrate)
+
+    status_parser = db_commands.add_parser('status', help='Muestra el estado del esquema')
+    status_parser.set_defaults(func=cmd_db_status)
+
+    drop_parser = db_commands.add_parser('drop-stale', help='Elimina índices no declarados')
+    drop_parser.add_argument('--dry-run', action='store_true', help='Solo lista los índices')
+    drop_parser.set_defaults(func=cmd_db_drop_stale)
+
+    stats_parser = subparsers.add_parser('stats', help='Estadísticas materializadas')
+    stats_commands = stats_parser.add_subparsers(dest='command', required=True)
+
+    rebuild_parser = stats_commands.add_parser('rebuild', help='Recalcula los contadores (corrige desvíos)')
+    rebuild_parser.set_defaults(func=cmd_stats_rebuild)
+
+    selectors_parser = subparsers.add_parser('selectors', help='Planes de selectores del scraping')
+    selectors_commands = selectors_parser.add_subparsers(dest='command', required=True)
+
+    report_parser = selectors_commands.add_parser('report', help='Tasa de aciertos por selector y portal')
+    report_parser.add_argument('--portal', default=None, help='Nombre del portal (por ejemplo Computrabajo)')
+    report_parser.set_defaults(func=cmd_selectors_report)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark de la extracción por contenedor
+Mide el costo por contenedor de _extract_from_soup (el camino del recorrido, con el
+índice de ofertas guardadas) para ofertas de Tacna y de otras ciudades (descartadas al
+inicio, antes del hash y del título), y el de derive_features por separado.
+
+Uso:
+    python scripts/benchmark_extraction.py [--contenedores 200] [--repeticiones 10]
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from app.services.extraction import derive_features
+from app.services.scraping_service import ScrapingService
+from app.services.seen_index import SeenIndex
+
+DESCRIPCION = ('Profesional en ingeniería de sistemas con 3 años de experiencia en python, sql server '
+               'y docker. Trabajo híbrido a tiempo completo. Sueldo S/ 3000 - 3500.')
+CONTENEDOR = (
+    '<div class="job"><h2><a href="/oferta/{i}">Desarrollador backend {i}</a></h2>'
+    '<span class="company">Empresa {i} S.A.C.</span><span class="location">{ubicacion}</span>'
+    '<p class="description">{descripcion}</p></div>'
+)
+
+
+def pagina(cantidad: int, ubicacion: str) -> BeautifulSoup:
+    """Genera una página de listado con contenedores de la ubicación indicada"""
+    html = ''.join(CONTENEDOR.format(i=i, ubicacion=ubicacion, descripcion=DESCRIPCION) for i in range(cantidad))
+    return BeautifulSoup(html, 'html.parser')
+
+
+def medir(funcion, elementos: list, repeticiones: int, por: int = 1) -> float:
+    """Retorna los microsegundos promedio por unidad (cada elemento cuenta por unidades)"""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for elemento in elementos:
+            funcion(elemento)
+    return (time.perf_counter() - inicio) * 1e6 / (repeticiones * len(elementos) * por)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmark de extracción por contenedor')
+    parser.add_argument('--contenedores', type=int, default=200, help='Contenedores por caso (por defecto: 200)')
+    parser.add_argument('--repeticiones', type=int, default=10, help='Repeticiones (por defecto: 10)')
+    args = parser.parse_args()
+
+    # La extracción no usa la base de datos ni la red
+    service = ScrapingService(db_manager=object(), http_cache=False, selector_plans=False)
+    service.logger.disabled = True
+    base_url = 'https://pe.computrabajo.com/empleos-en-tacna'
+
+    casos = [
+        ('Contenedor de Tacna', pagina(args.contenedores, 'Tacna, Tacna')),
+        ('Contenedor de otra ciudad', pagina(args.contenedores, 'Lima, Lima')),
+    ]
+    for nombre, soup in casos:
+        # Como en el recorrido: con el índice de ofertas guardadas (vacío, nada se omite)
+        costo = medir(lambda s: service._extract_from_soup(s, 'Computrabajo', base_url, ['div.job'], SeenIndex()),
+                      [soup], args.repeticiones, por=args.contenedores)
+        print(f"{nombre:<28}{costo:>10.1f} µs/contenedor")
+
+    textos = [(DESCRIPCION, f'Desarrollador backend {i}') for i in range(args.contenedores)]
+    costo = medir(lambda t: derive_features(*t), textos, args.repeticiones)
+    print(f"{'derive_features':<28}{costo:>10.1f} µs/oferta")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
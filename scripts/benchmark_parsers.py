@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los backends de parseo HTML del scraping
+Mide, por portal y por backend instalado, el tiempo de parseo y de extracción de
+una página de listado, y verifica que todos los backends extraigan las mismas ofertas.
+
+Uso:
+    python scripts/benchmark_parsers.py                      # páginas de ejemplo generadas
+    python scripts/benchmark_parsers.py --html-dir paginas/  # archivos <portal>*.html guardados
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.html_parser import available_backends, parse_html
+from app.services.scraping_service import PORTALES, ScrapingService
+from app.services.selector_plans import SelectorPlans
+
+# Marcado de un contenedor por portal, según su primer selector en PORTALES
+CONTENEDORES = {
+    'computrabajo': '<article class="box_offer" data-id="{i}">{cuerpo}</article>',
+    'indeed': '<div class="job_seen_beacon" data-jk="{i}">{cuerpo}</div>',
+    'bumeran': '<div class="sc-card card-vacancy">{cuerpo}</div>',
+    'trabajos': '<div class="content-jobs__item">{cuerpo}</div>',
+}
+
+CUERPO = (
+    '<h2><a href="/oferta/{i}" title="Asistente contable {i}">Asistente contable {i}</a></h2>'
+    '<span class="company">Empresa {i} S.A.C.</span>'
+    '<span class="location">Tacna, Tacna</span>'
+    '<p class="description">Bachiller en contabilidad con 2 años de experiencia en Excel y SAP. '
+    'Trabajo presencial a tiempo completo. Sueldo S/ 1500 - 2000.</p>'
+    '<ul><li>Beneficios de ley</li><li>Línea de carrera</li></ul>'
+)
+
+RELLENO = '<div class="nav"><ul>' + ''.join(f'<li><a href="/c/{n}">Categoría {n}</a></li>' for n in range(80)) + '</ul></div>'
+
+
+def pagina_ejemplo(portal_key: str, ofertas: int = 20) -> bytes:
+    """Genera una página de listado con el marcado del portal"""
+    contenedor = CONTENEDORES[portal_key]
+    items = ''.join(contenedor.format(i=i, cuerpo=CUERPO.format(i=i)) for i in range(ofertas))
+    html = (f'<!DOCTYPE html><html><head><title>{portal_key}</title>'
+            f'<script>var datos = {{"a": 1}};</script></head>'
+            f'<body>{RELLENO}<main>{items}</main>{RELLENO}</body></html>')
+    return html.encode('utf-8')
+
+
+def paginas(html_dir: str = None):
+    """Retorna [(portal, nombre, contenido)]"""
+    resultado = []
+    for portal_key in PORTALES:
+        if html_dir:
+            for path in sorted(glob.glob(os.path.join(html_dir, f'{portal_key}*.html'))):
+                with open(path, 'rb') as f:
+                    resultado.append((portal_key, os.path.basename(path), f.read()))
+        else:
+            resultado.append((portal_key, 'ejemplo', pagina_ejemplo(portal_key)))
+    return resultado
+
+
+def medir(service: ScrapingService, portal_key: str, content: bytes, backend: str, repeticiones: int):
+    """Retorna (ms de parseo, ms de extracción, ofertas) promedio por página"""
+    portal = PORTALES[portal_key]
+    parseo = extraccion = 0.0
+    ofertas = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        soup = parse_html(content, backend)
+        medio = time.perf_counter()
+        ofertas, _, _ = service._extract_from_soup(soup, portal['nombre'], portal['url'],
+                                                   portal['container_selectors'])
+        parseo += medio - inicio
+        extraccion += time.perf_counter() - medio
+    return parseo * 1000 / repeticiones, extraccion * 1000 / repeticiones, ofertas
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de parsers HTML del scraping')
+    parser.add_argument('--html-dir', help='Directorio con páginas guardadas (<portal>*.html)')
+    parser.add_argument('--repeticiones', type=int, default=20, help='Repeticiones por página (por defecto: 20)')
+    args = parser.parse_args()
+
+    # La extracción no usa la base de datos ni la red; los planes de selectores se aprenden en memoria
+    service = ScrapingService(db_manager=object(), http_cache=False, selector_plans=SelectorPlans())
+    service.logger.disabled = True
+    backends = available_backends()
+    print(f"Backends instalados: {', '.join(backends)}\n")
+    print(f"{'Portal':<14}{'Página':<20}{'Backend':<13}{'Parseo ms':>10}{'Extracción ms':>15}{'Ofertas':>9}")
+
+    iguales = True
+    for portal_key, nombre, content in paginas(args.html_dir):
+        referencia = None
+        for backend in backends:
+            parseo, extraccion, ofertas = medir(service, portal_key, content, backend, args.repeticiones)
+            print(f"{portal_key:<14}{nombre[:19]:<20}{backend:<13}{parseo:>10.2f}{extraccion:>15.2f}{len(ofertas):>9}")
+            campos = [{k: v for k, v in o.items() if k != 'fecha_publicacion'} for o in ofertas]
+            if referencia is None:
+                referencia = campos
+            elif campos != referencia:
+                iguales = False
+                print(f"  ✗ {backend} extrae ofertas distintas que {backends[0]}")
+
+    print(f"\n{'✓ Todos los backends extraen las mismas ofertas' if iguales else '✗ Hay diferencias entre backends'}")
+    return 0 if iguales else 1
+
+
+if __name__ == '__main__':
+    exit(main())